@@ -0,0 +1,232 @@
+import math
+import numbers
+import threading
+import time
+
+from RecomendationSystem import RecommendationSystem
+
+
+class ReadView:
+    def __init__(self, owner, index):
+        """
+        A pinned, immutable version of the system; every read through it sees the same published state.
+
+        :param owner: The ConcurrentRecommendationSystem the view belongs to.
+        :param index: The replica the view reads from.
+        """
+        self.owner = owner
+        self.index = index
+        self.system = owner._replicas[index]  # The replica; it is not modified while the view is open
+        self.version = owner._versions[index]  # The number of batches published into this state
+    # Time Complexity: O(1) for initialization
+
+    def get_recommendations(self, user_id, k, decay_factor=None, strategy="user", category=None):
+        """
+        Get top-k recommendations from the pinned version, see RecommendationSystem.get_recommendations.
+        """
+        return self.system.get_recommendations(user_id, k, decay_factor, strategy, category)
+
+    def search_products(self, query, search_by="name", limit=None, rank_by=None, max_distance=1):
+        """
+        Search the pinned version, see RecommendationSystem.search_products.
+        """
+        return self.system.search_products(query, search_by, limit, rank_by, max_distance)
+
+    def close(self):
+        """
+        Releases the view so the writer may update its replica again.
+        """
+        if self.system is not None:
+            self.owner._release(self.index)
+            self.system = None
+    # Time Complexity: O(1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ConcurrentRecommendationSystem:
+    def __init__(self, publish_every=1000, **options):
+        """
+        Wraps two RecommendationSystem replicas for many concurrent readers and a single writer (left-right).
+
+        Readers always use the active replica, which is never modified while it is active. Writes are buffered
+        and published in batches: a batch is applied to the inactive replica, the replicas are swapped in one
+        step, and once the last reader of the previous replica has left, the same batch is applied to it as well.
+        Readers therefore never wait for ingestion, at the cost of keeping two copies of the data.
+
+        :param publish_every: The number of buffered writes that triggers a publish.
+        :param options: Constructor options for both RecommendationSystem replicas (the result cache is not
+                        supported, since concurrent readers would share it).
+        """
+        if publish_every <= 0:
+            raise ValueError("publish_every must be a positive integer.")
+        if options.get("cache_size"):
+            raise ValueError("The result cache is not supported by ConcurrentRecommendationSystem.")
+        self.publish_every = publish_every
+        self._replicas = [RecommendationSystem(**options), RecommendationSystem(**options)]
+        self._replicas[1]._set_decay_epoch(self._replicas[0].decay_epoch)  # Identical writes must give identical aggregates
+        self._versions = [0, 0]  # The number of batches applied to each replica
+        self._active = 0  # The replica readers are directed to
+        self._readers = [0, 0]  # The number of open reads per replica
+        self._readers_lock = threading.Condition()  # Guards the reader counts; the writer waits on it for readers to leave
+        self._write_lock = threading.Lock()  # Serializes writers
+        self._pending_products = []  # Buffered add_product calls
+        self._pending_interactions = []  # Buffered add_interaction calls, with their timestamps resolved
+        self._lagging = None  # The previous batch, still to be applied to the inactive replica
+    # Time Complexity: O(1) for initialization
+
+    @property
+    def version(self):
+        """
+        The number of batches published so far.
+        """
+        return self._versions[self._active]
+
+    def reader(self):
+        """
+        Pins the current version for a sequence of consistent reads.
+
+        :return: A ReadView; close it (or use it as a context manager) when done.
+        """
+        with self._readers_lock:
+            index = self._active
+            self._readers[index] += 1  # The active replica cannot change while the lock is held
+        return ReadView(self, index)
+    # Time Complexity: O(1); only the reader count lock is taken, never the write lock
+
+    def _release(self, index):
+        """
+        Ends a read of a replica.
+
+        :param index: The replica that was read.
+        """
+        with self._readers_lock:
+            self._readers[index] -= 1
+            if self._readers[index] == 0:
+                self._readers_lock.notify_all()  # The writer may be waiting for this replica
+    # Time Complexity: O(1)
+
+    def get_recommendations(self, user_id, k, decay_factor=None, strategy="user", category=None):
+        """
+        Get top-k recommendations from the latest published version, see RecommendationSystem.get_recommendations.
+        """
+        with self.reader() as view:
+            return view.get_recommendations(user_id, k, decay_factor, strategy, category)
+
+    def search_products(self, query, search_by="name", limit=None, rank_by=None, max_distance=1):
+        """
+        Search the latest published version, see RecommendationSystem.search_products.
+        """
+        with self.reader() as view:
+            return view.search_products(query, search_by, limit, rank_by, max_distance)
+
+    def add_product(self, product_id, product_name, category):
+        """
+        Buffers a product; it becomes visible with the next published batch.
+
+        :param product_id: The ID of the product.
+        :param product_name: The name of the product.
+        :param category: The category of the product.
+        :raises TypeError: If an ID is unhashable or the name is not a string.
+        """
+        hash((product_id, category))  # Unhashable IDs are rejected here, not halfway through a publish
+        if not isinstance(product_name, str):
+            raise TypeError("product_name must be a string.")
+        with self._write_lock:
+            self._pending_products.append((product_id, product_name, category))
+            if len(self._pending_products) + len(self._pending_interactions) >= self.publish_every:
+                self._publish()
+    # Time Complexity: O(1) amortized, plus a publish every publish_every writes
+
+    def add_interaction(self, user_id, product_id, score, interaction_type, timestamp=None):
+        """
+        Buffers an interaction; it becomes visible with the next published batch.
+
+        The timestamp is fixed when the interaction is buffered, so both replicas store the same values. The
+        record is checked here as well: a write failing while a batch is applied would leave one replica with
+        part of the batch, so the replicas would diverge.
+
+        :param user_id: The ID of the user.
+        :param product_id: The ID of the product.
+        :param score: The score of the interaction.
+        :param interaction_type: The type of interaction (e.g., view, purchase).
+        :param timestamp: The time of the interaction (defaults to the current time).
+        :raises TypeError: If an ID is unhashable or the score or timestamp is not a real number.
+        :raises ValueError: If the timestamp is not finite.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        hash((user_id, product_id, interaction_type))
+        if not isinstance(score, numbers.Real) or not isinstance(timestamp, numbers.Real):
+            raise TypeError("score and timestamp must be real numbers.")
+        if not math.isfinite(timestamp):
+            raise ValueError("timestamp must be finite.")
+        with self._write_lock:
+            self._pending_interactions.append((user_id, product_id, score, interaction_type, timestamp))
+            if len(self._pending_products) + len(self._pending_interactions) >= self.publish_every:
+                self._publish()
+    # Time Complexity: O(1) amortized, plus a publish every publish_every writes
+
+    def publish(self):
+        """
+        Makes every buffered write visible to readers at once.
+
+        :return: The new version.
+        """
+        with self._write_lock:
+            self._publish()
+            return self.version
+    # Time Complexity: O(b), where b is the number of buffered writes (twice, once per replica)
+
+    def _apply(self, index, batch):
+        """
+        Applies a batch of buffered writes to a replica.
+
+        :param index: The replica to update; it must have no readers.
+        :param batch: A (products, interactions) tuple.
+        """
+        replica = self._replicas[index]
+        products, interactions = batch
+        replica.add_products_bulk(products)
+        replica.add_interactions_bulk(interactions)
+        if replica.sparse_engine is not None:
+            replica.sparse_engine._flush()  # Readers must not merge pending rows themselves
+        self._versions[index] += 1
+    # Time Complexity: O(b), where b is the batch size
+
+    def _wait_for_readers(self, index):
+        """
+        Blocks the writer until a replica has no readers.
+
+        :param index: The replica.
+        """
+        with self._readers_lock:
+            while self._readers[index]:
+                self._readers_lock.wait()
+    # Time Complexity: O(1), plus the time the last reader needs to finish
+
+    def _publish(self):
+        """
+        Publishes the buffered writes; the caller holds the write lock.
+        """
+        inactive = 1 - self._active
+        if self._lagging is not None:
+            self._wait_for_readers(inactive)
+            self._apply(inactive, self._lagging)  # Catch up with the batch published last time
+            self._lagging = None
+        if not self._pending_products and not self._pending_interactions:
+            return
+        batch = (self._pending_products, self._pending_interactions)
+        self._pending_products, self._pending_interactions = [], []
+        self._apply(inactive, batch)
+        with self._readers_lock:
+            self._active = inactive  # New readers see the new version from here on
+            previous_idle = not self._readers[1 - inactive]
+        if previous_idle:
+            self._apply(1 - inactive, batch)  # No reader can reach the previous replica any more
+        else:
+            self._lagging = batch  # Applied at the next publish, once the readers have left
+    # Time Complexity: O(b), where b is the batch size
@@ -0,0 +1,256 @@
+import os
+import threading
+import time
+from itertools import groupby
+
+from RecomendationSystem import RecommendationSystem
+from WriteAheadLog import PRODUCT, WriteAheadLog, sync_directory
+
+
+def _base_name(sequence):
+    """
+    Returns the file name of a base snapshot that covers every log segment below a sequence number.
+
+    :param sequence: The first segment not folded into the snapshot.
+    :return: The file name.
+    """
+    return f"base-{sequence:020d}.snap"
+# Time Complexity: O(1)
+
+
+def _replay(system, records):
+    """
+    Applies logged records to a system in log order, in bulk.
+
+    :param system: The RecommendationSystem.
+    :param records: An iterable of (kind, record) tuples from WriteAheadLog.replay.
+    :return: The number of records applied.
+    """
+    count = 0
+    for kind, run in groupby(records, key=lambda entry: entry[0]):
+        if kind == PRODUCT:
+            count += system.add_products_bulk(record for _, record in run)["count"]
+        else:
+            count += system.add_interactions_bulk(record for _, record in run)["count"]
+    return count
+# Time Complexity: O(r), where r is the number of records (times the bulk costs per record)
+
+
+class DurableRecommendationSystem:
+    def __init__(self, directory, sync="always", group_size=256, commit_interval=0.05, sync_interval=1.0,
+                 segment_bytes=64 << 20, compact_segments=4, background=True, **options):
+        """
+        Wraps a RecommendationSystem whose writes are recorded in a write-ahead log in a directory.
+
+        Opening the directory recovers the state: the latest base snapshot is loaded and the log segments written
+        after it are replayed. Compaction folds closed segments into a new base snapshot and deletes them. It
+        builds the snapshot in a separate system from the previous base and the segments, so the live system
+        keeps serving while it runs. A background thread commits idle groups every commit_interval seconds and
+        compacts once compact_segments segments are closed.
+
+        Writes are applied to the live system as soon as they are logged; with group commit, a crash can lose
+        the writes of the group not yet committed (see WriteAheadLog). Call commit() to make every write so far
+        durable. IDs, names, categories and interaction types must be strings.
+
+        :param directory: The directory holding the base snapshot and the log segments.
+        :param sync: The fsync policy of the log: "always", "interval" or "never".
+        :param group_size: The number of writes per group commit.
+        :param commit_interval: The longest time in seconds a write waits in a group before it is committed.
+        :param sync_interval: The minimum time in seconds between two fsyncs under sync="interval".
+        :param segment_bytes: The size after which a log segment is closed.
+        :param compact_segments: The number of closed segments that triggers a background compaction.
+        :param background: Whether to run the commit and compaction thread; without it call commit() and
+                           compact() yourself.
+        :param options: Constructor options for the RecommendationSystem.
+        """
+        if compact_segments <= 0:
+            raise ValueError("compact_segments must be a positive integer.")
+        self.directory = directory
+        self.compact_segments = compact_segments
+        self.options = options
+        os.makedirs(directory, exist_ok=True)
+        self._base = self._latest_base()  # The first segment not folded into the base snapshot
+        self.system = self._load(self._base, options)  # The live system
+        self.log = WriteAheadLog(directory, sync, group_size, commit_interval, sync_interval, segment_bytes)
+        self.log.remove(self._base)  # Segments of a compaction interrupted after its rename
+        self.recovered = _replay(self.system, self.log.replay(self._base))  # The number of records replayed on open
+        self._compact_lock = threading.Lock()  # Serializes compactions
+        self._closed = threading.Event()  # Stops the background thread
+        self.background_error = None  # The exception that stopped the background thread, if any
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._background, name="wal-background", daemon=True)
+            self._thread.start()
+    # Time Complexity: O(p + i + r), where p and i are the products and interactions of the base and r the records replayed
+
+    def _latest_base(self):
+        """
+        Finds the newest base snapshot and removes older ones and leftovers of interrupted compactions.
+
+        :return: The first segment not covered by the newest base snapshot (0 if there is none).
+        """
+        bases = []
+        for name in os.listdir(self.directory):
+            if name.startswith("base-") and name.endswith(".snap.tmp"):
+                os.remove(os.path.join(self.directory, name))  # Never renamed into place
+            elif name.startswith("base-") and name.endswith(".snap"):
+                bases.append(int(name[5:-5]))
+        bases.sort()
+        for base in bases[:-1]:
+            os.remove(os.path.join(self.directory, _base_name(base)))  # Superseded, but not yet removed
+        return bases[-1] if bases else 0
+    # Time Complexity: O(f log f), where f is the number of files in the directory
+
+    def _load(self, base, options):
+        """
+        Creates a system from a base snapshot.
+
+        :param base: The sequence number of the base snapshot (0 means an empty system).
+        :param options: Constructor options for the RecommendationSystem.
+        :return: The RecommendationSystem.
+        """
+        if not base:
+            return RecommendationSystem(**options)
+        # Compaction removes superseded bases, which a mapped file prevents outside POSIX
+        return RecommendationSystem.load_snapshot(os.path.join(self.directory, _base_name(base)), mapped=os.name == "posix", **options)
+    # Time Complexity: O(p + i + n), see RecommendationSystem.load_snapshot
+
+    def get_recommendations(self, user_id, k, decay_factor=None, strategy="user", category=None):
+        """
+        Get top-k recommendations, see RecommendationSystem.get_recommendations.
+        """
+        return self.system.get_recommendations(user_id, k, decay_factor, strategy, category)
+
+    def search_products(self, query, search_by="name", limit=None, rank_by=None, max_distance=1):
+        """
+        Search products, see RecommendationSystem.search_products.
+        """
+        return self.system.search_products(query, search_by, limit, rank_by, max_distance)
+
+    def add_product(self, product_id, product_name, category):
+        """
+        Logs and adds a product.
+
+        :param product_id: The ID of the product.
+        :param product_name: The name of the product.
+        :param category: The category of the product.
+        """
+        self.log.append_product(product_id, product_name, category)
+        self.system.add_product(product_id, product_name, category)
+    # Time Complexity: O(m) amortized plus the cost of RecommendationSystem.add_product
+
+    def add_interaction(self, user_id, product_id, score, interaction_type, timestamp=None):
+        """
+        Logs and adds an interaction.
+
+        The timestamp is fixed before it is logged, so a replay stores the same values.
+
+        :param user_id: The ID of the user.
+        :param product_id: The ID of the product.
+        :param score: The score of the interaction.
+        :param interaction_type: The type of interaction (e.g., view, purchase).
+        :param timestamp: The time of the interaction (defaults to the current time).
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.log.append_interaction(user_id, product_id, score, interaction_type, timestamp)
+        self.system.add_interaction(user_id, product_id, score, interaction_type, timestamp)
+    # Time Complexity: O(m) amortized plus the cost of RecommendationSystem.add_interaction
+
+    def add_products_bulk(self, products, batch_size=10000, on_batch=None):
+        """
+        Logs and adds products from an iterable, see RecommendationSystem.add_products_bulk.
+        """
+        def logged():
+            for product_id, product_name, category in products:
+                self.log.append_product(product_id, product_name, category)
+                yield product_id, product_name, category
+
+        report = self.system.add_products_bulk(logged(), batch_size, on_batch)
+        self.log.commit()
+        return report
+
+    def add_interactions_bulk(self, interactions, batch_size=10000, on_batch=None):
+        """
+        Logs and adds interactions from an iterable, see RecommendationSystem.add_interactions_bulk.
+
+        Records without a timestamp get the time they are logged.
+        """
+        def logged():
+            for record in interactions:
+                user_id, product_id, score, interaction_type = record[:4]
+                timestamp = record[4] if len(record) > 4 and record[4] is not None else time.time()
+                self.log.append_interaction(user_id, product_id, score, interaction_type, timestamp)
+                yield user_id, product_id, score, interaction_type, timestamp
+
+        report = self.system.add_interactions_bulk(logged(), batch_size, on_batch)
+        self.log.commit()
+        return report
+
+    def commit(self):
+        """
+        Makes every write so far durable, regardless of the group and sync policy.
+        """
+        self.log.commit(force_sync=True)
+    # Time Complexity: O(b), where b is the size of the buffered records
+
+    def compact(self, rotate=False):
+        """
+        Folds the closed log segments into a new base snapshot and deletes them.
+
+        The new base is built in a separate system (the previous base plus the closed segments), written to a
+        temporary file, synced and renamed into place; only then are the old base and the segments removed, so
+        a crash at any point leaves a recoverable directory.
+
+        :param rotate: Whether to close the active segment first, so every write so far is folded.
+        :return: The sequence number of the new base, or None if there was nothing to fold.
+        """
+        with self._compact_lock:
+            stop = self.log.rotate() if rotate else self.log.sequence
+            if not any(self._base <= sequence < stop for sequence in self.log.sequences()):
+                return None
+            options = {"popularity_size": 0}  # Only the stored state matters, not the live system's indexes
+            if "decay_factor" in self.options:
+                options["decay_factor"] = self.options["decay_factor"]
+            compacted = self._load(self._base, options)
+            _replay(compacted, self.log.replay(self._base, stop))
+            path = os.path.join(self.directory, _base_name(stop))
+            compacted.save_snapshot(path + ".tmp")
+            with open(path + ".tmp", "rb") as snapshot_file:
+                os.fsync(snapshot_file.fileno())
+            os.replace(path + ".tmp", path)
+            sync_directory(self.directory)
+            previous, self._base = self._base, stop
+            if previous:
+                os.remove(os.path.join(self.directory, _base_name(previous)))
+            self.log.remove(stop)
+            return stop
+    # Time Complexity: O(p + i + r), where p and i are the products and interactions of the base and r the records folded
+
+    def _background(self):
+        """
+        Commits idle groups and compacts closed segments until the system is closed.
+        """
+        try:
+            while not self._closed.wait(self.log.commit_interval):
+                self.log.commit()
+                if len([sequence for sequence in self.log.sequences() if sequence < self.log.sequence]) >= self.compact_segments:
+                    self.compact()
+        except Exception as error:  # Reported through background_error; the writers keep the log consistent
+            self.background_error = error
+
+    def close(self):
+        """
+        Stops the background thread, then commits and closes the log.
+        """
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.log.close()
+    # Time Complexity: O(b), plus the time a running compaction needs to finish
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
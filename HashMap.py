@@ -1,81 +1,228 @@
-import time
+from array import array
+
+_EMPTY = -1  # Index slot that has never held an entry
+_DELETED = -2  # Index slot whose entry was removed (tombstone)
+_DUMMY = object()  # Placeholder key for removed entries in the dense arrays
+_MIN_SIZE = 8  # Smallest number of index slots a map will use
+
+
 class HashMap:
-    def __init__(self, size=100):
+    def __init__(self, size=_MIN_SIZE, load_factor=0.66):
         """
-        Initializes the HashMap with a specified size.
-        
-        :param size: The number of buckets in the hash map.
+        Initializes the HashMap with a specified initial capacity.
+
+        Entries are kept in insertion order in three dense parallel lists (hashes, keys, values).
+        A compact open-addressing index table maps probe slots to positions in those lists,
+        so there are no per-bucket Python lists.
+
+        :param size: The initial number of index slots (rounded up to a power of two).
+        :param load_factor: The fraction of index slots that may be used before the map resizes itself.
         """
-        self.size = size
-        self.buckets = [[] for _ in range(size)]  # Create a list of empty lists (buckets)
-    # Time Complexity: O(n), where n is the size of the hash map
-    # Explanation: Initializing the hash map involves creating a list of empty lists, which takes O(n) time.
+        if not 0 < load_factor < 1:
+            raise ValueError("load_factor must be between 0 and 1.")
+        self.load_factor = load_factor
+        self.size = _MIN_SIZE
+        while self.size < size:
+            self.size <<= 1
+        self._indices = array('q', [_EMPTY]) * self.size  # Probe slots holding positions in the dense arrays
+        self._hashes = []  # Dense array of key hashes
+        self._keys = []  # Dense array of keys (_DUMMY for removed entries)
+        self._values = []  # Dense array of values
+        self._count = 0  # Number of live entries
+    # Time Complexity: O(n), where n is the initial size of the hash map
+    # Explanation: Initializing the hash map allocates the index table, which takes O(n) time.
 
     def _hash(self, key):
         """
         Computes the hash value for a given key.
-        
+
         :param key: The key to be hashed.
         :return: The hash value of the key.
         """
-        return hash(key) % self.size
+        return hash(key)
     # Time Complexity: O(1)
-    # Explanation: Hashing a key and computing the index takes constant time.
+    # Explanation: Hashing a key takes constant time.
+
+    def _lookup(self, key, key_hash):
+        """
+        Probes the index table for a key.
+
+        :param key: The key to be searched.
+        :param key_hash: The hash value of the key.
+        :return: A tuple (slot, entry). entry is the position of the key in the dense arrays, or -1 if the key is absent,
+                 in which case slot is the first reusable slot on the probe path.
+        """
+        indices = self._indices
+        mask = self.size - 1
+        perturb = key_hash & 0xFFFFFFFFFFFFFFFF
+        slot = key_hash & mask
+        free_slot = -1
+        while True:
+            entry = indices[slot]
+            if entry == _EMPTY:
+                return (slot if free_slot < 0 else free_slot), -1
+            if entry == _DELETED:
+                if free_slot < 0:
+                    free_slot = slot
+            elif self._hashes[entry] == key_hash:
+                stored = self._keys[entry]
+                if stored is key or stored == key:
+                    return slot, entry
+            perturb >>= 5
+            slot = (5 * slot + perturb + 1) & mask
+    # Time Complexity: O(1) on average
+    # Explanation: The load factor keeps probe sequences short, so only a constant number of slots are inspected on average.
+
+    def _resize(self):
+        """
+        Rebuilds the index table and compacts the dense arrays.
+
+        The new table is sized so that the live entries fill at most half of the load-factor budget,
+        which both grows a full map and shrinks one that is mostly tombstones.
+        """
+        live = [(h, k, v) for h, k, v in zip(self._hashes, self._keys, self._values) if k is not _DUMMY]
+        new_size = _MIN_SIZE
+        while new_size * self.load_factor < (len(live) + 1) * 2:
+            new_size <<= 1
+        self.size = new_size
+        self._indices = array('q', [_EMPTY]) * new_size
+        self._hashes = [h for h, _, _ in live]
+        self._keys = [k for _, k, _ in live]
+        self._values = [v for _, _, v in live]
+        indices = self._indices
+        mask = new_size - 1
+        for entry, key_hash in enumerate(self._hashes):
+            perturb = key_hash & 0xFFFFFFFFFFFFFFFF
+            slot = key_hash & mask
+            while indices[slot] != _EMPTY:
+                perturb >>= 5
+                slot = (5 * slot + perturb + 1) & mask
+            indices[slot] = entry
+    # Time Complexity: O(n), where n is the number of entries
+    # Explanation: Every live entry is re-inserted once. Because the size at least doubles between growths, the cost is amortized O(1) per insert.
 
     def insert(self, key, value):
         """
         Inserts a key-value pair into the hash map.
-        
+
         :param key: The key to be inserted.
         :param value: The value to be associated with the key.
         """
-        index = self._hash(key)
-        for i, (k, v) in enumerate(self.buckets[index]):
-            if k == key:
-                self.buckets[index][i] = (key, value)  # Update if key exists
-                return
-        self.buckets[index].append((key, value))  # Insert new key-value pair
-    # Time Complexity: O(1) on average, O(n) in the worst case
-    # Explanation: Inserting a key-value pair involves computing the hash value and appending to the bucket, which takes O(1) time on average. In the worst case, all keys hash to the same bucket, making it O(n).
+        key_hash = self._hash(key)
+        slot, entry = self._lookup(key, key_hash)
+        if entry >= 0:
+            self._values[entry] = value  # Update if key exists
+            return
+        if len(self._keys) + 1 > self.size * self.load_factor:
+            self._resize()  # Grow (or drop tombstones) before the table gets too full
+            slot, _ = self._lookup(key, key_hash)
+        self._indices[slot] = len(self._keys)
+        self._hashes.append(key_hash)
+        self._keys.append(key)  # Insert new key-value pair
+        self._values.append(value)
+        self._count += 1
+    # Time Complexity: O(1) amortized
+    # Explanation: Inserting involves a short probe sequence and appends to the dense arrays; occasional resizes are amortized over the inserts that caused them.
 
-    def get(self, key):
+    def get(self, key, default=None):
         """
         Retrieves the value associated with a given key.
-        
+
         :param key: The key to be searched.
-        :return: The value associated with the key, or None if the key is not found.
+        :param default: The value to return if the key is not found.
+        :return: The value associated with the key, or default if the key is not found.
         """
-        index = self._hash(key)
-        for k, v in self.buckets[index]:
-            if k == key:
-                return v
-        return None  # Key not found
-    # Time Complexity: O(1) on average, O(n) in the worst case
-    # Explanation: Retrieving a value involves computing the hash value and searching the bucket, which takes O(1) time on average. In the worst case, all keys hash to the same bucket, making it O(n).
+        _, entry = self._lookup(key, self._hash(key))
+        if entry < 0:
+            return default  # Key not found
+        return self._values[entry]
+    # Time Complexity: O(1) on average
+    # Explanation: Retrieving a value involves computing the hash value and a short probe sequence.
 
     def remove(self, key):
         """
         Removes a key-value pair from the hash map.
-        
+
         :param key: The key to be removed.
         :return: None
         """
-        index = self._hash(key)
-        for i, (k, v) in enumerate(self.buckets[index]):
-            if k == key:
-                del self.buckets[index][i]
-                return
-        return None  # Key not found
-    # Time Complexity: O(1) on average, O(n) in the worst case
-    # Explanation: Removing a key-value pair involves computing the hash value and searching the bucket, which takes O(1) time on average. In the worst case, all keys hash to the same bucket, making it O(n).
+        slot, entry = self._lookup(key, self._hash(key))
+        if entry < 0:
+            return None  # Key not found
+        self._indices[slot] = _DELETED
+        self._keys[entry] = _DUMMY
+        self._values[entry] = None
+        self._count -= 1
+    # Time Complexity: O(1) on average
+    # Explanation: Removing a key-value pair involves a short probe sequence and leaving a tombstone behind.
 
     def contains(self, key):
         """
         Checks if a key exists in the hash map.
-        
+
         :param key: The key to be checked.
         :return: True if the key exists, False otherwise.
         """
-        return self.get(key) is not None
-    # Time Complexity: O(1) on average, O(n) in the worst case
-    # Explanation: Checking if a key exists involves retrieving the value associated with the key, which takes O(1) time on average. In the worst case, all keys hash to the same bucket, making it O(n).
\ No newline at end of file
+        return self._lookup(key, self._hash(key))[1] >= 0
+    # Time Complexity: O(1) on average
+    # Explanation: Checking if a key exists involves a short probe sequence.
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+    def __len__(self):
+        return self._count
+    # Time Complexity: O(1)
+
+    def __iter__(self):
+        return self.keys()
+
+    def __reversed__(self):
+        """
+        Iterates over the keys of the hash map, most recently inserted first.
+
+        :return: An iterator over the keys in reverse insertion order.
+        """
+        keys = self._keys
+        for entry in range(len(keys) - 1, -1, -1):
+            key = keys[entry]
+            if key is not _DUMMY:
+                yield key
+    # Time Complexity: O(1) per key yielded
+    # Explanation: The method walks the dense key array backwards, so taking the first few keys is cheap.
+
+    def keys(self):
+        """
+        Iterates over the keys of the hash map in insertion order.
+
+        :return: An iterator over the keys.
+        """
+        for key in list(self._keys):
+            if key is not _DUMMY:
+                yield key
+    # Time Complexity: O(n), where n is the number of entries
+    # Explanation: The method walks the dense key array once.
+
+    def values(self):
+        """
+        Iterates over the values of the hash map in insertion order.
+
+        :return: An iterator over the values.
+        """
+        for key, value in list(zip(self._keys, self._values)):
+            if key is not _DUMMY:
+                yield value
+    # Time Complexity: O(n), where n is the number of entries
+    # Explanation: The method walks the dense arrays once.
+
+    def items(self):
+        """
+        Iterates over the key-value pairs of the hash map in insertion order.
+
+        :return: An iterator over (key, value) tuples.
+        """
+        for key, value in list(zip(self._keys, self._values)):
+            if key is not _DUMMY:
+                yield key, value
+    # Time Complexity: O(n), where n is the number of entries
+    # Explanation: The method walks the dense arrays once.
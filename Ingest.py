@@ -0,0 +1,63 @@
+import csv
+import json
+
+
+def read_products_csv(path):
+    """
+    Streams products from a CSV file with product_id, product_name and category columns.
+
+    :param path: The path of the CSV file.
+    :return: A generator of (product_id, product_name, category) tuples.
+    """
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            yield row["product_id"], row["product_name"], row["category"]
+# Time Complexity: O(n), where n is the number of rows; memory is O(1)
+
+
+def read_interactions_csv(path):
+    """
+    Streams interactions from a CSV file with user_id, product_id, score, interaction_type and an optional
+    timestamp column (seconds since the epoch; empty means "now").
+
+    :param path: The path of the CSV file.
+    :return: A generator of (user_id, product_id, score, interaction_type, timestamp) tuples.
+    """
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        for row in csv.DictReader(csv_file):
+            timestamp = row.get("timestamp")
+            yield (row["user_id"], row["product_id"], float(row["score"]), row["interaction_type"],
+                   float(timestamp) if timestamp else None)
+# Time Complexity: O(n), where n is the number of rows; memory is O(1)
+
+
+def read_products_jsonl(path):
+    """
+    Streams products from a JSON-lines file of {"product_id", "product_name", "category"} objects.
+
+    :param path: The path of the JSON-lines file.
+    :return: A generator of (product_id, product_name, category) tuples.
+    """
+    with open(path, encoding="utf-8") as jsonl_file:
+        for line in jsonl_file:
+            if line.strip():
+                record = json.loads(line)
+                yield record["product_id"], record["product_name"], record["category"]
+# Time Complexity: O(n), where n is the number of lines; memory is O(1)
+
+
+def read_interactions_jsonl(path):
+    """
+    Streams interactions from a JSON-lines file of {"user_id", "product_id", "score", "interaction_type"}
+    objects with an optional "timestamp" field.
+
+    :param path: The path of the JSON-lines file.
+    :return: A generator of (user_id, product_id, score, interaction_type, timestamp) tuples.
+    """
+    with open(path, encoding="utf-8") as jsonl_file:
+        for line in jsonl_file:
+            if line.strip():
+                record = json.loads(line)
+                yield (record["user_id"], record["product_id"], record["score"], record["interaction_type"],
+                       record.get("timestamp"))
+# Time Complexity: O(n), where n is the number of lines; memory is O(1)
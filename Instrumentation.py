@@ -0,0 +1,212 @@
+import copy
+import math
+import threading
+import time
+
+
+def _bucket(seconds):
+    """
+    Returns the latency histogram bucket of a duration.
+
+    Buckets are powers of two in microseconds: bucket b holds durations in [2 ** (b - 1), 2 ** b) microseconds,
+    and bucket 0 holds everything below one microsecond.
+
+    :param seconds: The duration in seconds.
+    :return: The bucket number.
+    """
+    microseconds = seconds * 1e6
+    if microseconds < 1:
+        return 0
+    return math.frexp(microseconds)[1]
+# Time Complexity: O(1)
+
+
+def _histogram_percentile(histogram, count, fraction):
+    """
+    Estimates a percentile from a latency histogram.
+
+    :param histogram: A dictionary mapping bucket numbers to counts.
+    :param count: The total number of recorded durations.
+    :param fraction: The percentile as a fraction, e.g. 0.95.
+    :return: The upper bound in seconds of the bucket that holds the percentile.
+    """
+    threshold = fraction * count
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= threshold:
+            return 2 ** bucket / 1e6
+    return 0.0
+# Time Complexity: O(b log b), where b is the number of buckets in use
+
+
+class Trace:
+    __slots__ = ("operation", "started", "last", "stages", "counters")
+
+    def __init__(self, operation):
+        """
+        Collects the stage timings and counters of a single instrumented call.
+
+        :param operation: The name of the instrumented operation.
+        """
+        self.operation = operation  # The name of the instrumented operation
+        self.started = self.last = time.perf_counter()  # When the call and the current stage started
+        self.stages = {}  # Maps stage names to seconds spent in them
+        self.counters = {}  # Maps counter names to counts
+    # Time Complexity: O(1) for initialization
+
+    def mark(self, stage):
+        """
+        Ends the current stage, attributing the time since the previous mark to it.
+
+        :param stage: The name of the stage that just ended.
+        """
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self.last
+        self.last = now
+    # Time Complexity: O(1)
+
+    def count(self, counter, amount=1):
+        """
+        Increments a counter of the call.
+
+        :param counter: The name of the counter.
+        :param amount: The amount to add.
+        """
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+    # Time Complexity: O(1)
+
+
+class Instrumentation:
+    def __init__(self, hook=None):
+        """
+        Initializes per-operation timing and counter aggregation.
+
+        Every finished call updates the operation's call count, total time and latency histogram, the
+        total time and histogram of each of its stages, and its counters. Nothing is retained per call,
+        so memory stays bounded by the number of distinct operations, stages and counters. A lock guards the
+        aggregates, so calls may finish on several threads while stats() is read.
+
+        :param hook: Optional function called as hook(operation, record) after every call, where record is a
+                     dictionary with the call's "seconds", "stages" and "counters".
+        """
+        self.hook = hook
+        self.operations = {}  # Maps operation names to their aggregates
+        self._lock = threading.Lock()  # Guards the aggregates against concurrent updates and reads
+    # Time Complexity: O(1) for initialization
+
+    def __getstate__(self):
+        """
+        Returns the state to pickle, e.g. when a batch worker process receives the system; locks cannot be pickled.
+
+        :return: The instance dictionary without the lock, with a consistent copy of the aggregates.
+        """
+        with self._lock:
+            state = dict(self.__dict__)
+            state["operations"] = copy.deepcopy(self.operations)  # Pickled after the lock is released
+        del state["_lock"]
+        return state
+    # Time Complexity: O(o), where o is the number of operations
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled instance with a fresh lock.
+
+        :param state: The state returned by __getstate__.
+        """
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    # Time Complexity: O(1)
+
+    def start(self, operation):
+        """
+        Starts timing a call.
+
+        :param operation: The name of the operation.
+        :return: A Trace to mark stages and count events on.
+        """
+        return Trace(operation)
+    # Time Complexity: O(1)
+
+    def finish(self, trace):
+        """
+        Records a finished call.
+
+        :param trace: The Trace returned by start.
+        """
+        seconds = time.perf_counter() - trace.started
+        with self._lock:
+            self._record(trace, seconds)
+        if self.hook is not None:
+            self.hook(trace.operation, {"seconds": seconds, "stages": dict(trace.stages), "counters": dict(trace.counters)})
+    # Time Complexity: O(s + c), where s is the number of stages and c the number of counters of the call
+
+    def _record(self, trace, seconds):
+        """
+        Helper function that folds a finished call into the aggregates; the caller holds the lock.
+
+        :param trace: The finished Trace.
+        :param seconds: The duration of the call.
+        """
+        aggregate = self.operations.get(trace.operation)
+        if aggregate is None:
+            aggregate = {"calls": 0, "seconds": 0.0, "histogram": {}, "stages": {}, "counters": {}}
+            self.operations[trace.operation] = aggregate
+        aggregate["calls"] += 1
+        aggregate["seconds"] += seconds
+        bucket = _bucket(seconds)
+        aggregate["histogram"][bucket] = aggregate["histogram"].get(bucket, 0) + 1
+        for stage, stage_seconds in trace.stages.items():
+            stage_aggregate = aggregate["stages"].get(stage)
+            if stage_aggregate is None:
+                stage_aggregate = aggregate["stages"][stage] = {"calls": 0, "seconds": 0.0, "histogram": {}}
+            stage_aggregate["calls"] += 1
+            stage_aggregate["seconds"] += stage_seconds
+            bucket = _bucket(stage_seconds)
+            stage_aggregate["histogram"][bucket] = stage_aggregate["histogram"].get(bucket, 0) + 1
+        counters = aggregate["counters"]
+        for counter, amount in trace.counters.items():
+            counters[counter] = counters.get(counter, 0) + amount
+    # Time Complexity: O(s + c), where s is the number of stages and c the number of counters of the call
+
+    def stats(self):
+        """
+        Returns a snapshot of the aggregated measurements.
+
+        :return: A dictionary mapping operation names to their call count, total and mean seconds, estimated
+                 p50/p95/p99 latency in seconds, latency histogram (bucket upper bound in microseconds -> count),
+                 per-stage totals and histograms, and counters.
+        """
+        snapshot = {}
+        with self._lock:
+            for operation, aggregate in self.operations.items():
+                calls = aggregate["calls"]
+                snapshot[operation] = {
+                    "calls": calls,
+                    "seconds": aggregate["seconds"],
+                    "mean_seconds": aggregate["seconds"] / calls,
+                    "p50_seconds": _histogram_percentile(aggregate["histogram"], calls, 0.50),
+                    "p95_seconds": _histogram_percentile(aggregate["histogram"], calls, 0.95),
+                    "p99_seconds": _histogram_percentile(aggregate["histogram"], calls, 0.99),
+                    "histogram": {2 ** bucket: count for bucket, count in sorted(aggregate["histogram"].items())},
+                    "stages": {
+                        stage: {
+                            "calls": stage_aggregate["calls"],
+                            "seconds": stage_aggregate["seconds"],
+                            "mean_seconds": stage_aggregate["seconds"] / stage_aggregate["calls"],
+                            "histogram": {2 ** bucket: count for bucket, count in sorted(stage_aggregate["histogram"].items())},
+                        }
+                        for stage, stage_aggregate in aggregate["stages"].items()
+                    },
+                    "counters": dict(aggregate["counters"]),
+                }
+        return snapshot
+    # Time Complexity: O(o * (s + b log b)), where o is the number of operations, s the stages per operation and b the buckets in use
+
+    def reset(self):
+        """
+        Discards all aggregated measurements.
+        """
+        with self._lock:
+            self.operations = {}
+    # Time Complexity: O(1)
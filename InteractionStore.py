@@ -0,0 +1,475 @@
+import sys
+from array import array
+
+_LOOKUP_THRESHOLD = 32  # Users with more rows than this get a product -> row dictionary instead of a linear scan
+_COLUMNS = (("users", 'I'), ("products", 'I'), ("scores", 'd'), ("types", 'H'), ("timestamps", 'd'), ("decayed", 'd'))
+
+
+def _copy_column(values, typecode):
+    """
+    Copies a column into a new array with one bulk copy.
+
+    :param values: An array or a typed memoryview.
+    :param typecode: The array typecode of the column.
+    :return: The new array.
+    """
+    column = array(typecode)
+    with memoryview(values) as view, view.cast('B') as raw:
+        column.frombytes(raw)
+    return column
+# Time Complexity: O(n), where n is the number of values
+
+
+class InteractionStore:
+    def __init__(self):
+        """
+        Initializes a columnar store holding one row per (user, product) pair.
+
+        User, product and interaction-type IDs are interned to small integer codes, and the pair aggregates
+        live in parallel typed arrays. Each user and each product keeps an array of its row numbers, so both
+        directions are served from the same single copy of the data.
+        """
+        self.user_ids = []  # Maps user codes to user IDs
+        self.user_codes = {}  # Maps user IDs to user codes
+        self.product_ids = []  # Maps product codes to product IDs
+        self.product_codes = {}  # Maps product IDs to product codes
+        self.type_names = []  # Maps interaction type codes to interaction types
+        self.type_codes = {}  # Maps interaction types to interaction type codes
+        self.users = array('I')  # User code of each row
+        self.products = array('I')  # Product code of each row
+        self.scores = array('d')  # Score sum of each row
+        self.types = array('H')  # Latest interaction type code of each row
+        self.timestamps = array('d')  # Latest timestamp of each row
+        self.decayed = array('d')  # Decayed score sum of each row, relative to the system's reference epoch
+        self.user_rows = []  # Maps user codes to arrays of their rows, in insertion order
+        self.product_rows = []  # Maps product codes to arrays of their rows, in insertion order
+        self.user_lookup = {}  # Maps codes of heavy users to dictionaries of product code -> row
+        self.mapped = False  # Whether the columns are read-only views over a snapshot map, copied on the first write
+        self.by_user = InteractionMap(self, True)  # Read-only user -> product -> details view
+        self.by_product = InteractionMap(self, False)  # Read-only product -> user -> details view
+    # Time Complexity: O(1) for initialization
+
+    def __len__(self):
+        return len(self.users)
+    # Time Complexity: O(1)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if self.mapped:  # Memoryviews cannot be pickled, so the copy gets private arrays
+            state.update((name, _copy_column(state[name], typecode)) for name, typecode in _COLUMNS)
+            state["mapped"] = False
+        return state
+    # Time Complexity: O(1), or O(n) for mapped columns, where n is the number of rows
+
+    def _materialize(self):
+        """
+        Helper function that replaces mapped columns with private arrays before they are written to.
+
+        The map is unmapped once the last view over it is dropped.
+        """
+        for name, typecode in _COLUMNS:
+            setattr(self, name, _copy_column(getattr(self, name), typecode))
+        self.mapped = False
+    # Time Complexity: O(n), where n is the number of rows
+
+    def _intern(self, value, codes, values):
+        """
+        Returns the code of a value, assigning the next free code to a new value.
+
+        :param value: The value to be interned.
+        :param codes: The value -> code dictionary.
+        :param values: The code -> value list.
+        :return: The code of the value.
+        """
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+    # Time Complexity: O(1) on average
+
+    def find(self, user_code, product_code):
+        """
+        Finds the row of a (user, product) pair.
+
+        :param user_code: The code of the user.
+        :param product_code: The code of the product.
+        :return: The row number, or -1 if the pair has no row.
+        """
+        lookup = self.user_lookup.get(user_code)
+        if lookup is not None:
+            return lookup.get(product_code, -1)
+        products = self.products
+        for row in self.user_rows[user_code]:
+            if products[row] == product_code:
+                return row
+        return -1
+    # Time Complexity: O(1) on average for heavy users, O(n) otherwise, where n is at most _LOOKUP_THRESHOLD
+
+    def add(self, user_id, product_id, score, interaction_type, timestamp, decayed):
+        """
+        Adds an interaction, accumulating onto the pair's row if it already exists.
+
+        The row keeps the sum of the scores, the latest interaction type and timestamp, and the sum of the decayed scores.
+
+        :param user_id: The ID of the user.
+        :param product_id: The ID of the product.
+        :param score: The score of the interaction.
+        :param interaction_type: The type of the interaction.
+        :param timestamp: The time of the interaction.
+        :param decayed: The decayed score of the interaction, relative to the system's reference epoch.
+        :return: A tuple (row, previous_score), where previous_score is None if the pair is new.
+        """
+        if self.mapped:
+            self._materialize()
+        user_code = self._intern(user_id, self.user_codes, self.user_ids)
+        product_code = self._intern(product_id, self.product_codes, self.product_ids)
+        type_code = self._intern(interaction_type, self.type_codes, self.type_names)
+        if user_code == len(self.user_rows):
+            self.user_rows.append(array('I'))
+        if product_code == len(self.product_rows):
+            self.product_rows.append(array('I'))
+        row = self.find(user_code, product_code)
+        if row >= 0:
+            previous_score = self.scores[row]
+            self.scores[row] = previous_score + score
+            self.types[row] = type_code
+            if timestamp > self.timestamps[row]:
+                self.timestamps[row] = timestamp
+            self.decayed[row] += decayed
+            return row, previous_score
+
+        row = len(self.users)
+        self.users.append(user_code)
+        self.products.append(product_code)
+        self.scores.append(score)
+        self.types.append(type_code)
+        self.timestamps.append(timestamp)
+        self.decayed.append(decayed)
+        user_rows = self.user_rows[user_code]
+        user_rows.append(row)
+        self.product_rows[product_code].append(row)
+        lookup = self.user_lookup.get(user_code)
+        if lookup is not None:
+            lookup[product_code] = row
+        elif len(user_rows) > _LOOKUP_THRESHOLD:
+            products = self.products
+            self.user_lookup[user_code] = {products[user_row]: user_row for user_row in user_rows}
+        return row, None
+    # Time Complexity: O(1) on average (O(_LOOKUP_THRESHOLD) for a light user's pair lookup), plus O(n) for the first write to mapped columns
+
+    def load_columns(self, user_ids, product_ids, type_names, users, products, scores, types, timestamps, decayed, mapped=False):
+        """
+        Fills an empty store from complete interning tables and columns, e.g. those of a snapshot.
+
+        The columns are copied with one bulk copy each, or, if mapped is set, kept as they are: the store then
+        reads the snapshot's pages in place (processes loading the same file share them) and copies the columns
+        into private arrays on its first write. The per-user and per-product row arrays and the lookups of heavy
+        users are derived from the columns either way.
+
+        :param user_ids: The user ID of each user code.
+        :param product_ids: The product ID of each product code.
+        :param type_names: The interaction type of each type code.
+        :param users: The user code of each row.
+        :param products: The product code of each row.
+        :param scores: The score sum of each row.
+        :param types: The latest interaction type code of each row.
+        :param timestamps: The latest timestamp of each row.
+        :param decayed: The decayed score sum of each row, relative to the system's reference epoch.
+        :param mapped: Whether to keep the given columns (read-only views over a map) instead of copying them.
+        """
+        if len(self.users):
+            raise ValueError("load_columns requires an empty store.")
+        # The views hold references to these containers, so they are filled in place
+        for values, codes, table in ((user_ids, self.user_codes, self.user_ids), (product_ids, self.product_codes, self.product_ids),
+                                     (type_names, self.type_codes, self.type_names)):
+            table.extend(values)
+            codes.update((value, code) for code, value in enumerate(table))
+        for (name, typecode), values in zip(_COLUMNS, (users, products, scores, types, timestamps, decayed)):
+            setattr(self, name, values if mapped else _copy_column(values, typecode))
+        self.mapped = mapped
+        self.user_rows.extend(array('I') for _ in range(len(self.user_ids)))
+        self.product_rows.extend(array('I') for _ in range(len(self.product_ids)))
+        user_rows, product_rows = self.user_rows, self.product_rows
+        for row, (user_code, product_code) in enumerate(zip(self.users, self.products)):
+            user_rows[user_code].append(row)
+            product_rows[product_code].append(row)
+        products = self.products
+        for user_code, rows in enumerate(user_rows):
+            if len(rows) > _LOOKUP_THRESHOLD:
+                self.user_lookup[user_code] = {products[row]: row for row in rows}
+    # Time Complexity: O(n + u + p), where n is the number of rows, u the number of users and p the number of products
+
+    def details(self, row):
+        """
+        Returns the aggregate of a row in the (score, interaction_type, timestamp, decayed) form.
+
+        :param row: The row number.
+        :return: The interaction details tuple.
+        """
+        return self.scores[row], self.type_names[self.types[row]], self.timestamps[row], self.decayed[row]
+    # Time Complexity: O(1)
+
+    def rows_of_user(self, user_id):
+        """
+        Returns the rows of a user.
+
+        :param user_id: The ID of the user.
+        :return: An array of row numbers, empty for an unknown user.
+        """
+        user_code = self.user_codes.get(user_id)
+        return self.user_rows[user_code] if user_code is not None else ()
+    # Time Complexity: O(1) on average
+
+    def rows_of_product(self, product_id):
+        """
+        Returns the rows of a product.
+
+        :param product_id: The ID of the product.
+        :return: An array of row numbers, empty for an unknown product.
+        """
+        product_code = self.product_codes.get(product_id)
+        return self.product_rows[product_code] if product_code is not None else ()
+    # Time Complexity: O(1) on average
+
+    def rescale(self, scale):
+        """
+        Multiplies every decayed score by a constant factor.
+
+        :param scale: The factor to multiply by.
+        """
+        if self.mapped:
+            self._materialize()
+        self.decayed = array('d', [value * scale for value in self.decayed])
+    # Time Complexity: O(n), where n is the number of rows
+
+    def nbytes(self):
+        """
+        Returns the memory held by the store's own containers.
+
+        The ID objects themselves are not counted, since they are shared with the rest of the system. Mapped
+        columns count with the size of the pages they view.
+
+        :return: The size in bytes.
+        """
+        total = sum(column.nbytes if isinstance(column, memoryview) else sys.getsizeof(column)
+                    for column in (self.users, self.products, self.scores, self.types, self.timestamps, self.decayed))
+        total += sum(sys.getsizeof(container) for container in (self.user_ids, self.user_codes, self.product_ids, self.product_codes,
+                                                                 self.type_names, self.type_codes, self.user_rows, self.product_rows,
+                                                                 self.user_lookup))
+        total += sum(sys.getsizeof(rows) for rows in self.user_rows) + sum(sys.getsizeof(rows) for rows in self.product_rows)
+        total += sum(sys.getsizeof(lookup) for lookup in self.user_lookup.values())
+        return total
+    # Time Complexity: O(u + p), where u is the number of users and p the number of products
+
+    def bytes_per_interaction(self):
+        """
+        Returns the memory held by the store per stored (user, product) pair.
+
+        :return: The number of bytes per pair, or 0 for an empty store.
+        """
+        return self.nbytes() / len(self.users) if len(self.users) else 0
+    # Time Complexity: O(u + p)
+
+
+class InteractionMap:
+    def __init__(self, store, by_user):
+        """
+        Read-only view of one direction of an InteractionStore with the HashMap interface.
+
+        :param store: The InteractionStore.
+        :param by_user: True for user -> product -> details, False for product -> user -> details.
+        """
+        self.store = store
+        self.by_user = by_user
+        self.codes = store.user_codes if by_user else store.product_codes  # Maps outer IDs to codes
+        self.rows = store.user_rows if by_user else store.product_rows  # Maps outer codes to row arrays
+        self.ids = store.user_ids if by_user else store.product_ids  # Maps outer codes to IDs
+    # Time Complexity: O(1) for initialization
+
+    def get(self, key, default=None):
+        """
+        Returns the interactions of a user (or product).
+
+        :param key: The user (or product) ID.
+        :param default: The value returned for an ID without interactions.
+        :return: An InteractionRows view, or default.
+        """
+        code = self.codes.get(key)
+        if code is None:
+            return default
+        return InteractionRows(self.store, self.by_user, code, self.rows[code])
+    # Time Complexity: O(1) on average
+
+    def contains(self, key):
+        """
+        Checks if a user (or product) has interactions.
+
+        :param key: The user (or product) ID.
+        :return: True if it has at least one interaction, False otherwise.
+        """
+        return key in self.codes
+    # Time Complexity: O(1) on average
+
+    def __contains__(self, key):
+        return key in self.codes
+
+    def __len__(self):
+        return len(self.ids)
+    # Time Complexity: O(1)
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys(self):
+        """
+        Iterates over the user (or product) IDs in order of their first interaction.
+
+        :return: An iterator over the IDs.
+        """
+        return iter(list(self.ids))
+    # Time Complexity: O(n), where n is the number of users (or products)
+
+    def values(self):
+        """
+        Iterates over the per-user (or per-product) views in order of their first interaction.
+
+        :return: An iterator over InteractionRows views.
+        """
+        for code in range(len(self.ids)):
+            yield InteractionRows(self.store, self.by_user, code, self.rows[code])
+    # Time Complexity: O(n), where n is the number of users (or products)
+
+    def items(self):
+        """
+        Iterates over (ID, view) pairs in order of the first interaction.
+
+        :return: An iterator over (ID, InteractionRows) tuples.
+        """
+        for code in range(len(self.ids)):
+            yield self.ids[code], InteractionRows(self.store, self.by_user, code, self.rows[code])
+    # Time Complexity: O(n), where n is the number of users (or products)
+
+
+class InteractionRows:
+    __slots__ = ("store", "by_user", "code", "rows")
+
+    def __init__(self, store, by_user, code, rows):
+        """
+        Read-only view of the interactions of one user (or product) with the HashMap interface.
+
+        Keys are the product (or user) IDs and values are (score, interaction_type, timestamp, decayed) tuples.
+
+        :param store: The InteractionStore.
+        :param by_user: True if this is a user's view, False for a product's view.
+        :param code: The code of the user (or product).
+        :param rows: The row array of the user (or product).
+        """
+        self.store = store
+        self.by_user = by_user
+        self.code = code
+        self.rows = rows
+    # Time Complexity: O(1) for initialization
+
+    def _key(self, row):
+        """
+        Returns the key (the other side's ID) of a row.
+
+        :param row: The row number.
+        :return: The product ID for a user's view, the user ID for a product's view.
+        """
+        store = self.store
+        if self.by_user:
+            return store.product_ids[store.products[row]]
+        return store.user_ids[store.users[row]]
+    # Time Complexity: O(1)
+
+    def _row(self, key):
+        """
+        Finds the row of a key.
+
+        :param key: The product ID for a user's view, the user ID for a product's view.
+        :return: The row number, or -1 if there is none.
+        """
+        store = self.store
+        if self.by_user:
+            other_code = store.product_codes.get(key)
+            return store.find(self.code, other_code) if other_code is not None else -1
+        other_code = store.user_codes.get(key)
+        return store.find(other_code, self.code) if other_code is not None else -1
+    # Time Complexity: O(1) on average, see InteractionStore.find
+
+    def get(self, key, default=None):
+        """
+        Returns the interaction details for a product (or user).
+
+        :param key: The product ID for a user's view, the user ID for a product's view.
+        :param default: The value returned if there is no such interaction.
+        :return: A (score, interaction_type, timestamp, decayed) tuple, or default.
+        """
+        row = self._row(key)
+        return self.store.details(row) if row >= 0 else default
+    # Time Complexity: O(1) on average, see InteractionStore.find
+
+    def contains(self, key):
+        """
+        Checks if there is an interaction with a product (or user).
+
+        :param key: The product ID for a user's view, the user ID for a product's view.
+        :return: True if there is one, False otherwise.
+        """
+        return self._row(key) >= 0
+    # Time Complexity: O(1) on average, see InteractionStore.find
+
+    def __contains__(self, key):
+        return self._row(key) >= 0
+
+    def __len__(self):
+        return len(self.rows)
+    # Time Complexity: O(1)
+
+    def __iter__(self):
+        return self.keys()
+
+    def __reversed__(self):
+        """
+        Iterates over the keys, most recently added first.
+
+        :return: An iterator over the keys in reverse insertion order.
+        """
+        rows = self.rows
+        for index in range(len(rows) - 1, -1, -1):
+            yield self._key(rows[index])
+    # Time Complexity: O(1) per key yielded
+
+    def keys(self):
+        """
+        Iterates over the product (or user) IDs in insertion order.
+
+        :return: An iterator over the keys.
+        """
+        for row in self.rows:
+            yield self._key(row)
+    # Time Complexity: O(n), where n is the number of rows
+
+    def values(self):
+        """
+        Iterates over the interaction details in insertion order.
+
+        :return: An iterator over (score, interaction_type, timestamp, decayed) tuples.
+        """
+        store = self.store
+        for row in self.rows:
+            yield store.details(row)
+    # Time Complexity: O(n), where n is the number of rows
+
+    def items(self):
+        """
+        Iterates over (key, details) pairs in insertion order.
+
+        :return: An iterator over (key, (score, interaction_type, timestamp, decayed)) tuples.
+        """
+        store = self.store
+        for row in self.rows:
+            yield self._key(row), store.details(row)
+    # Time Complexity: O(n), where n is the number of rows
@@ -0,0 +1,112 @@
+from HashMap import HashMap
+
+
+class ItemIndex:
+    def __init__(self, max_neighbors=50):
+        """
+        Initializes an item-to-item co-occurrence index.
+
+        For every pair of products that share a user, the index keeps a co-occurrence count and a score sum
+        (the sum over those users of the mean of their two scores). Each product keeps at most
+        2 * max_neighbors neighbors; when that is exceeded the weakest ones are pruned back to max_neighbors.
+
+        :param max_neighbors: The number of neighbors each product keeps after pruning.
+        """
+        if max_neighbors <= 0:
+            raise ValueError("max_neighbors must be a positive integer.")
+        self.max_neighbors = max_neighbors
+        self.neighbors = HashMap()  # Maps product IDs to HashMaps of neighbor product -> [count, score_sum]
+    # Time Complexity: O(1) for initialization
+
+    def add(self, user_products, product_id, score, previous_score=None):
+        """
+        Updates the index for an interaction.
+
+        :param user_products: The user's map of product -> interaction details (score first), or None for a new user;
+                              an entry for product_id itself is skipped.
+        :param product_id: The ID of the product.
+        :param score: The score of the interaction.
+        :param previous_score: The user's previous score for the product, or None if the pair is new.
+        """
+        if user_products is None:
+            return
+        for other_product, details in user_products.items():
+            if other_product == product_id:
+                continue
+            other_score = details[0]
+            if previous_score is None:
+                pair_score = (score + other_score) / 2
+                self._bump(product_id, other_product, 1, pair_score)
+                self._bump(other_product, product_id, 1, pair_score)
+            else:
+                delta = (score - previous_score) / 2  # Only the changed half of each pair mean moves
+                self._bump(product_id, other_product, 0, delta)
+                self._bump(other_product, product_id, 0, delta)
+    # Time Complexity: O(n), where n is the number of products the user has interacted with
+    # Explanation: Each of the user's other products gets its two pair entries adjusted in O(1) amortized time.
+
+    def _bump(self, product_id, other_product, count, score_delta):
+        """
+        Adjusts the co-occurrence entry of product_id -> other_product.
+
+        :param product_id: The product whose neighbor list is updated.
+        :param other_product: The neighbor product.
+        :param count: The change in co-occurrence count.
+        :param score_delta: The change in score sum.
+        """
+        product_neighbors = self.neighbors.get(product_id)
+        if product_neighbors is None:
+            product_neighbors = HashMap()
+            self.neighbors.insert(product_id, product_neighbors)
+        entry = product_neighbors.get(other_product)
+        if entry is not None:
+            entry[0] += count
+            entry[1] += score_delta
+        elif count:  # An adjustment for a pair that was pruned earlier is dropped
+            product_neighbors.insert(other_product, [count, score_delta])
+            if len(product_neighbors) > 2 * self.max_neighbors:
+                self._prune(product_id, product_neighbors)
+    # Time Complexity: O(1) amortized
+    # Explanation: Pruning costs O(n log n) but only happens after max_neighbors new neighbors have been added.
+
+    def _prune(self, product_id, product_neighbors):
+        """
+        Keeps only the max_neighbors strongest neighbors of a product.
+
+        :param product_id: The product whose neighbor list is pruned.
+        :param product_neighbors: The current neighbor HashMap of the product.
+        """
+        strongest = sorted(product_neighbors.items(), key=lambda item: (-item[1][1], -item[1][0]))[:self.max_neighbors]
+        pruned = HashMap(size=2 * len(strongest))
+        for other_product, entry in strongest:
+            pruned.insert(other_product, entry)
+        self.neighbors.insert(product_id, pruned)
+    # Time Complexity: O(n log n), where n is the number of neighbors of the product
+
+    def neighbors_of(self, product_id):
+        """
+        Returns the neighbors of a product.
+
+        :param product_id: The ID of the product.
+        :return: An iterator of (neighbor product, [count, score_sum]) pairs.
+        """
+        product_neighbors = self.neighbors.get(product_id)
+        if product_neighbors is None:
+            return iter(())
+        return product_neighbors.items()
+    # Time Complexity: O(1) to start, O(n) to iterate, where n is at most 2 * max_neighbors
+
+    def similarity(self, product_id, other_product):
+        """
+        Returns the average pair score of two products over the users they share.
+
+        :param product_id: The ID of the first product.
+        :param other_product: The ID of the second product.
+        :return: The similarity score, or 0 if the products share no user (or the pair was pruned).
+        """
+        product_neighbors = self.neighbors.get(product_id)
+        entry = product_neighbors.get(other_product) if product_neighbors is not None else None
+        if entry is None or entry[0] == 0:
+            return 0
+        return entry[1] / entry[0]
+    # Time Complexity: O(1) on average
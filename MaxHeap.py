@@ -1,13 +1,64 @@
+def _ranks_above(item, other):
+    """
+    Decides whether item ranks above other.
+
+    Items are (score, id) tuples: the higher score ranks above, and ties are broken by the smaller id,
+    so the order is deterministic across runs.
+
+    :param item: The first item.
+    :param other: The second item.
+    :return: True if item ranks above other, False otherwise.
+    """
+    return item[0] > other[0] or (item[0] == other[0] and item[1] < other[1])
+# Time Complexity: O(1)
+
+
 class MaxHeap:
-    def __init__(self):
+    def __init__(self, items=None, reverse=False):
+        """
+        Initializes the heap, optionally from an iterable of items.
+
+        :param items: Optional iterable of (score, id) items; the heap is built from them in O(n).
+        :param reverse: If True, the lowest-ranked item is kept at the root instead (a min-heap),
+                        which is what bounded top-k selection needs.
+        """
         self.heaplist = []  # Initialize with an empty list
         self.currsize = 0  # Initialize the current size to 0
-    # Time Complexity: O(1) for initialization
+        self.reverse = reverse  # Whether the root is the lowest-ranked item
+        if items is not None:
+            self.heapify(items)
+    # Time Complexity: O(1) for initialization, O(n) when built from n items
+
+    def _higher(self, item, other):
+        """
+        Decides whether item belongs closer to the root than other.
+
+        :param item: The first item.
+        :param other: The second item.
+        :return: True if item should be above other in the heap.
+        """
+        if self.reverse:
+            return _ranks_above(other, item)
+        return _ranks_above(item, other)
+    # Time Complexity: O(1)
+
+    def heapify(self, items):
+        """
+        Replace the contents of the heap with the given items using bottom-up heap construction.
+
+        :param items: An iterable of items.
+        """
+        self.heaplist = list(items)
+        self.currsize = len(self.heaplist)
+        for index in range(self.currsize // 2 - 1, -1, -1):
+            self._downheap(index)
+    # Time Complexity: O(n)
+    # Explanation: Sifting down from the last parent to the root does O(n) work in total, because most nodes sit near the bottom of the tree.
 
     def push(self, item):
         """
         Insert a new item into the heap.
-        
+
         :param item: The item to be inserted.
         """
         self.heaplist.append(item)  # Add the item to the end of the list
@@ -18,9 +69,9 @@ class MaxHeap:
 
     def pop(self):
         """
-        Remove and return the largest item from the heap.
-        
-        :return: The largest item from the heap.
+        Remove and return the root item from the heap (the largest one unless the heap is reversed).
+
+        :return: The root item from the heap.
         """
         if self.currsize == 0:
             return None  # Return None if the heap is empty
@@ -33,15 +84,108 @@ class MaxHeap:
     # Time Complexity: O(log n)
     # Explanation: Removing the max item involves removing the root (O(1)) and maintaining the heap property (O(log n)).
 
+    def peek(self):
+        """
+        Return the root item without removing it.
+
+        :return: The root item, or None if the heap is empty.
+        """
+        return self.heaplist[0] if self.currsize else None
+    # Time Complexity: O(1)
+
+    def pushpop(self, item):
+        """
+        Push an item and then pop the root, more efficiently than calling push and pop.
+
+        :param item: The item to be inserted.
+        :return: The root of the heap after the item was added.
+        """
+        if self.currsize == 0 or not self._higher(self.heaplist[0], item):
+            return item  # The new item would be the root, so it is returned straight away
+        root = self.heaplist[0]
+        self.heaplist[0] = item
+        self._downheap(0)
+        return root
+    # Time Complexity: O(log n)
+    # Explanation: At most one sift-down is performed.
+
+    def replace(self, item):
+        """
+        Pop the root and then push an item, more efficiently than calling pop and push.
+
+        :param item: The item to be inserted.
+        :return: The previous root, or None if the heap was empty.
+        """
+        if self.currsize == 0:
+            self.push(item)
+            return None
+        root = self.heaplist[0]
+        self.heaplist[0] = item
+        self._downheap(0)
+        return root
+    # Time Complexity: O(log n)
+    # Explanation: At most one sift-down is performed.
+
+    @staticmethod
+    def bounded(items, k):
+        """
+        Build a min-heap that keeps only the k highest-ranked items.
+
+        The heap never holds more than k items: each further item only replaces the weakest of
+        the current top k if it ranks above it. Ties are broken by the smaller id.
+
+        :param items: An iterable of (score, id) items.
+        :param k: The number of items to keep (must be positive).
+        :return: A reversed MaxHeap holding at most k items, the weakest at the root.
+        """
+        bounded = MaxHeap(reverse=True)  # The root is the weakest of the current top k
+        for item in items:
+            if bounded.currsize < k:
+                bounded.push(item)
+            elif _ranks_above(item, bounded.heaplist[0]):
+                bounded.replace(item)
+        return bounded
+    # Time Complexity: O(n log k), where n is the number of items
+    # Explanation: Each item costs at most one O(log k) replacement, and the heap uses O(k) memory.
+
+    def drain(self):
+        """
+        Remove every item from the heap.
+
+        :return: A list of the items, highest ranked first.
+        """
+        drained = []
+        while not self.is_empty():
+            drained.append(self.pop())
+        if self.reverse:
+            drained.reverse()  # A reversed heap pops the lowest-ranked item first
+        return drained
+    # Time Complexity: O(n log n)
+
+    @staticmethod
+    def top_k(items, k):
+        """
+        Select the k highest-ranked items with a bounded min-heap.
+
+        :param items: An iterable of (score, id) items.
+        :param k: The number of items to select.
+        :return: A list of at most k items, highest ranked first.
+        """
+        if k <= 0:
+            return []
+        return MaxHeap.bounded(items, k).drain()
+    # Time Complexity: O(n log k), where n is the number of items
+    # Explanation: Building the bounded heap costs O(n log k) and draining its k items O(k log k).
+
     def _upheap(self, index):
         """
         Maintain the heap property going up.
-        
+
         :param index: The index of the item to be moved up.
         """
         while index > 0:
             parent_index = (index - 1) // 2  # Calculate the parent index
-            if self.heaplist[index][0] > self.heaplist[parent_index][0]:  # Compare the item with its parent
+            if self._higher(self.heaplist[index], self.heaplist[parent_index]):  # Compare the item with its parent
                 self.heaplist[index], self.heaplist[parent_index] = self.heaplist[parent_index], self.heaplist[index]  # Swap if the item is greater
                 index = parent_index  # Move to the parent index
             else:
@@ -52,12 +196,12 @@ class MaxHeap:
     def _downheap(self, index):
         """
         Maintain the heap property going down.
-        
+
         :param index: The index of the item to be moved down.
         """
         while (index * 2) + 1 < self.currsize:
             max_child_index = self._max_child(index)  # Get the index of the maximum child
-            if self.heaplist[index][0] < self.heaplist[max_child_index][0]:  # Compare the item with its maximum child
+            if self._higher(self.heaplist[max_child_index], self.heaplist[index]):  # Compare the item with its maximum child
                 self.heaplist[index], self.heaplist[max_child_index] = self.heaplist[max_child_index], self.heaplist[index]  # Swap if the item is less
                 index = max_child_index  # Move to the maximum child index
             else:
@@ -68,13 +212,13 @@ class MaxHeap:
     def _max_child(self, index):
         """
         Return the index of the maximum child.
-        
+
         :param index: The index of the parent item.
         :return: The index of the maximum child.
         """
         if (index * 2) + 2 >= self.currsize:  # If there is no right child
             return (index * 2) + 1  # Return the left child index
-        if self.heaplist[(index * 2) + 1][0] > self.heaplist[(index * 2) + 2][0]:  # Compare the left and right children
+        if self._higher(self.heaplist[(index * 2) + 1], self.heaplist[(index * 2) + 2]):  # Compare the left and right children
             return (index * 2) + 1  # Return the left child index if it is greater
         else:
             return (index * 2) + 2  # Return the right child index if it is greater
@@ -84,7 +228,7 @@ class MaxHeap:
     def is_empty(self):
         """
         Check if the heap is empty.
-        
+
         :return: True if the heap is empty, False otherwise.
         """
         return self.currsize == 0
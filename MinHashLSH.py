@@ -0,0 +1,137 @@
+import random
+from hashlib import blake2b
+
+_MERSENNE_PRIME = (1 << 61) - 1  # Modulus of the universal hash family
+_MAX_HASH = (1 << 61) - 1  # Initial signature value, above every hash value
+
+
+def _stable_hash(value):
+    """
+    Hashes a product ID to a 64-bit integer that is the same in every process.
+
+    The built-in hash() of strings is salted per process, which would make signatures differ between runs.
+
+    :param value: The value to be hashed.
+    :return: A 64-bit integer.
+    """
+    return int.from_bytes(blake2b(repr(value).encode(), digest_size=8).digest(), "little")
+# Time Complexity: O(m), where m is the length of the value's representation
+
+
+class MinHashLSH:
+    def __init__(self, num_permutations=64, bands=32, max_candidates=200, seed=0):
+        """
+        Initializes an approximate user-neighbor index based on MinHash signatures and banded LSH.
+
+        Every user has a signature of num_permutations minimum hash values over the products they interacted with;
+        two signatures agree in each position with probability equal to the Jaccard similarity of the product sets.
+        The signature is split into bands of num_permutations / bands rows, and users whose band values are
+        identical share a bucket. More bands (fewer rows each) find more neighbors at a higher cost.
+
+        :param num_permutations: The signature length.
+        :param bands: The number of bands; must divide num_permutations.
+        :param max_candidates: The number of neighbors returned per query, the most similar first.
+        :param seed: The seed of the hash family, so signatures are reproducible.
+        """
+        if num_permutations <= 0 or bands <= 0 or num_permutations % bands:
+            raise ValueError("bands must be a positive divisor of num_permutations.")
+        if max_candidates <= 0:
+            raise ValueError("max_candidates must be a positive integer.")
+        self.num_permutations = num_permutations
+        self.bands = bands
+        self.rows = num_permutations // bands  # Signature positions per band
+        self.max_candidates = max_candidates
+        rng = random.Random(seed)
+        self.permutations = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(_MERSENNE_PRIME)) for _ in range(num_permutations)]  # (a, b) of a * x + b mod p
+        self.product_hashes = {}  # Maps product IDs to their num_permutations hash values
+        self.signatures = {}  # Maps user IDs to their signatures (lists of minimum hash values)
+        self.buckets = [{} for _ in range(bands)]  # Per band, maps band values to insertion-ordered dicts of user IDs
+    # Time Complexity: O(h) for initialization, where h is num_permutations
+
+    def _hashes(self, product_id):
+        """
+        Returns the hash values of a product under every permutation.
+
+        :param product_id: The ID of the product.
+        :return: A tuple of num_permutations hash values.
+        """
+        hashes = self.product_hashes.get(product_id)
+        if hashes is None:
+            base = _stable_hash(product_id)
+            hashes = tuple((a * base + b) % _MERSENNE_PRIME for a, b in self.permutations)
+            self.product_hashes[product_id] = hashes
+        return hashes
+    # Time Complexity: O(h) the first time a product is seen, O(1) afterwards
+
+    def add(self, user_id, product_ids):
+        """
+        Folds new products of a user into the user's signature and moves the user between buckets.
+
+        Signatures only depend on the set of products, so repeated interactions with a product need not be added.
+
+        :param user_id: The ID of the user.
+        :param product_ids: An iterable of products the user has newly interacted with.
+        """
+        previous = self.signatures.get(user_id)
+        signature = list(previous) if previous is not None else [_MAX_HASH] * self.num_permutations
+        for product_id in product_ids:
+            signature = [low if low < value else value for low, value in zip(signature, self._hashes(product_id))]
+        if signature == previous:
+            return
+        self.signatures[user_id] = signature
+        rows = self.rows
+        for band, buckets in enumerate(self.buckets):
+            start = band * rows
+            key = tuple(signature[start:start + rows])
+            if previous is not None:
+                old_key = tuple(previous[start:start + rows])
+                if old_key == key:
+                    continue  # The user stays in the same bucket of this band
+                members = buckets[old_key]
+                members.pop(user_id, None)
+                if not members:
+                    del buckets[old_key]
+            buckets.setdefault(key, {})[user_id] = None
+    # Time Complexity: O(n * h), where n is the number of new products and h is num_permutations
+
+    def estimate_similarity(self, user_id, other_user):
+        """
+        Estimates the Jaccard similarity of two users' product sets.
+
+        :param user_id: The ID of the first user.
+        :param other_user: The ID of the second user.
+        :return: The fraction of signature positions on which the users agree, or 0 for an unknown user.
+        """
+        signature = self.signatures.get(user_id)
+        other_signature = self.signatures.get(other_user)
+        if signature is None or other_signature is None:
+            return 0
+        return sum(value == other_value for value, other_value in zip(signature, other_signature)) / self.num_permutations
+    # Time Complexity: O(h)
+
+    def candidates(self, user_id, limit=None):
+        """
+        Returns the users that share at least one band bucket with a user, the most similar first.
+
+        Candidates are ordered by the number of bands they share with the user, which grows with their
+        Jaccard similarity; ties keep the order in which the candidates were found.
+
+        :param user_id: The ID of the user.
+        :param limit: The maximum number of candidates (defaults to max_candidates; 0 means all of them).
+        :return: A list of user IDs, excluding the user.
+        """
+        signature = self.signatures.get(user_id)
+        if signature is None:
+            return []
+        shared = {}
+        rows = self.rows
+        for band, buckets in enumerate(self.buckets):
+            start = band * rows
+            for other_user in buckets.get(tuple(signature[start:start + rows]), ()):
+                shared[other_user] = shared.get(other_user, 0) + 1
+        shared.pop(user_id, None)
+        ranked = sorted(shared, key=shared.get, reverse=True)
+        if limit == 0:
+            return ranked
+        return ranked[:limit if limit is not None else self.max_candidates]
+    # Time Complexity: O(c log c), where c is the number of users sharing a bucket with the user
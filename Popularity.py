@@ -0,0 +1,183 @@
+from MaxHeap import MaxHeap
+
+
+class Leaderboard:
+    def __init__(self, size):
+        """
+        Initializes a top-N list of products under monotonically growing values.
+
+        The members are kept in a min-heap (the weakest member at the root), for admission, and in a max-heap
+        (the strongest at the root), for ranking. A member whose value grows gets a new entry in both and its
+        old entries turn stale; stale entries are skipped when they reach a root and a heap is rebuilt once
+        they outnumber the members.
+
+        :param size: The number of products kept.
+        """
+        if size <= 0:
+            raise ValueError("size must be a positive integer.")
+        self.size = size
+        self.members = {}  # Maps member product IDs to their current values
+        self.heap = MaxHeap(reverse=True)  # (value, product ID) entries, the weakest at the root; some may be stale
+        self.ranking = MaxHeap()  # (value, product ID) entries, the strongest at the root; some may be stale
+        self._ranked = None  # The strongest members found by the last top call, or None once an update invalidated them
+    # Time Complexity: O(1) for initialization
+
+    def _weakest(self):
+        """
+        Returns the weakest current member, discarding stale entries from the root.
+
+        :return: The (value, product ID) entry of the weakest member, or None if the board is empty.
+        """
+        heap = self.heap
+        while not heap.is_empty():
+            value, product_id = heap.peek()
+            if self.members.get(product_id) == value:
+                return value, product_id
+            heap.pop()  # Stale: the product was evicted or has a newer entry
+        return None
+    # Time Complexity: O(log N) amortized
+
+    def update(self, product_id, value):
+        """
+        Offers a product's new value to the board.
+
+        :param product_id: The ID of the product.
+        :param value: The product's new value; values are expected to only grow.
+        """
+        if product_id in self.members:
+            self.members[product_id] = value
+        elif len(self.members) < self.size:
+            self.members[product_id] = value
+        else:
+            weakest = self._weakest()
+            if not (value > weakest[0] or (value == weakest[0] and product_id < weakest[1])):
+                return  # Not strong enough to enter the board
+            del self.members[weakest[1]]
+            self.heap.pop()
+            self.members[product_id] = value
+        self.heap.push((value, product_id))
+        self.ranking.push((value, product_id))
+        self._ranked = None
+        for heap in (self.heap, self.ranking):
+            if heap.currsize > 2 * self.size + 16:
+                heap.heapify((member_value, member_id) for member_id, member_value in self.members.items())  # Drop stale entries
+    # Time Complexity: O(log N) amortized, where N is the board size
+
+    def top(self, k):
+        """
+        Returns the k strongest members.
+
+        :param k: The number of products to return.
+        :return: A list of (product ID, value) tuples, highest value first (ties by the smaller product ID).
+        """
+        ranked = self._ranked
+        if ranked is None or (len(ranked) < k and len(ranked) < len(self.members)):
+            ranked = self._ranked = self._strongest(k)
+        return ranked[:k]
+    # Time Complexity: O(k) while the board is unchanged, O(k log N) amortized after an update
+
+    def _strongest(self, k):
+        """
+        Pops the k strongest current members off the ranking heap, discarding stale entries, and pushes them back.
+
+        :param k: The number of members to find.
+        :return: A list of (product ID, value) tuples, highest value first.
+        """
+        ranking, members = self.ranking, self.members
+        ranked = []
+        while len(ranked) < k and not ranking.is_empty():
+            value, product_id = ranking.pop()
+            if members.get(product_id) == value and (not ranked or ranked[-1][0] != product_id):  # Equal entries pop together
+                ranked.append((product_id, value))
+        for product_id, value in ranked:
+            ranking.push((value, product_id))
+        return ranked
+    # Time Complexity: O((k + s) log N), where s is the number of stale entries discarded
+
+    def rescale(self, scale):
+        """
+        Multiplies every value by a positive constant; the ranking does not change.
+
+        :param scale: The factor to multiply by.
+        """
+        self.members = {product_id: value * scale for product_id, value in self.members.items()}
+        self.heap.heapify((value, product_id) for product_id, value in self.members.items())
+        self.ranking.heapify((value, product_id) for product_id, value in self.members.items())
+        self._ranked = None
+    # Time Complexity: O(N)
+
+
+class Popularity:
+    def __init__(self, size=100):
+        """
+        Initializes global and per-category popularity leaderboards.
+
+        A product's popularity is the sum of its decayed interaction scores relative to the system's reference
+        epoch. Decaying every product by the same factor preserves their order, so the leaderboards stay valid
+        as time passes and only grow as interactions arrive. Scores are assumed to be non-negative.
+
+        :param size: The number of products kept per leaderboard.
+        """
+        self.size = size
+        self.totals = {}  # Maps product IDs to their decayed score sums
+        self.categories = {}  # Maps product IDs to the categories they are listed under
+        self.overall = Leaderboard(size)  # The global leaderboard
+        self.by_category = {}  # Maps categories to their leaderboards
+    # Time Complexity: O(1) for initialization
+
+    def add(self, product_id, decayed):
+        """
+        Adds decayed score to a product and updates its leaderboards.
+
+        :param product_id: The ID of the product.
+        :param decayed: The decayed score to add, relative to the system's reference epoch.
+        """
+        total = self.totals.get(product_id, 0.0) + decayed
+        self.totals[product_id] = total
+        self.overall.update(product_id, total)
+        for category in self.categories.get(product_id, ()):
+            self.by_category[category].update(product_id, total)
+    # Time Complexity: O(c log N), where c is the number of categories of the product and N the board size
+
+    def categorize(self, product_id, category):
+        """
+        Lists a product under a category, mirroring category_to_products.
+
+        :param product_id: The ID of the product.
+        :param category: The category.
+        """
+        categories = self.categories.setdefault(product_id, [])
+        if category in categories:
+            return
+        categories.append(category)
+        board = self.by_category.get(category)
+        if board is None:
+            board = self.by_category[category] = Leaderboard(self.size)
+        total = self.totals.get(product_id)
+        if total is not None:
+            board.update(product_id, total)  # Interactions recorded before the product was added
+    # Time Complexity: O(log N)
+
+    def top(self, k, category=None):
+        """
+        Returns the most popular products.
+
+        :param k: The number of products to return (at most the board size).
+        :param category: Restrict to this category (None means all products).
+        :return: A list of (product ID, decayed score relative to the epoch) tuples, most popular first.
+        """
+        board = self.overall if category is None else self.by_category.get(category)
+        return board.top(k) if board is not None else []
+    # Time Complexity: O(k) while the board is unchanged
+
+    def rescale(self, scale):
+        """
+        Multiplies every popularity by a positive constant, following a move of the reference epoch.
+
+        :param scale: The factor to multiply by.
+        """
+        self.totals = {product_id: total * scale for product_id, total in self.totals.items()}
+        self.overall.rescale(scale)
+        for board in self.by_category.values():
+            board.rescale(scale)
+    # Time Complexity: O(p + c * N), where p is the number of products and c the number of categories
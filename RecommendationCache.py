@@ -0,0 +1,118 @@
+import time
+from collections import OrderedDict
+
+
+class RecommendationCache:
+    def __init__(self, max_entries=1024, max_age=None):
+        """
+        Initializes a size-bounded LRU cache for recommendation results.
+
+        Every user and product has a version stamp that is bumped when its interactions change, and every
+        category one that is bumped when a product is listed under it. An entry remembers the stamps of the
+        users, products and categories its result was computed from, and is only served while all of them are
+        unchanged and the entry is younger than max_age.
+
+        :param max_entries: The maximum number of cached results; the least recently used one is evicted first.
+        :param max_age: The maximum staleness of an entry in seconds (None means entries never expire by age).
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer.")
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.entries = OrderedDict()  # Maps cache keys to (recommendations, created_at, user, product and category stamps)
+        self.user_versions = {}  # Maps user IDs to their version stamps
+        self.product_versions = {}  # Maps product IDs to their version stamps
+        self.category_versions = {}  # Maps categories to their version stamps
+        self.hits = 0  # Lookups answered from the cache
+        self.misses = 0  # Lookups that found no usable entry
+        self.evictions = 0  # Entries dropped to stay within max_entries
+        self.invalidations = 0  # Entries dropped because they were stale
+    # Time Complexity: O(1) for initialization
+
+    def bump_user(self, user_id):
+        """
+        Marks every entry that depends on a user as stale.
+
+        :param user_id: The ID of the user whose interactions changed.
+        """
+        self.user_versions[user_id] = self.user_versions.get(user_id, 0) + 1
+    # Time Complexity: O(1) on average
+
+    def bump_product(self, product_id):
+        """
+        Marks every entry that depends on a product as stale.
+
+        :param product_id: The ID of the product whose interactions or details changed.
+        """
+        self.product_versions[product_id] = self.product_versions.get(product_id, 0) + 1
+    # Time Complexity: O(1) on average
+
+    def bump_category(self, category):
+        """
+        Marks every entry restricted to a category as stale.
+
+        :param category: The category whose set of products changed.
+        """
+        self.category_versions[category] = self.category_versions.get(category, 0) + 1
+    # Time Complexity: O(1) on average
+
+    def get(self, key):
+        """
+        Returns a cached result if it is still valid.
+
+        :param key: The cache key.
+        :return: The cached recommendations, or None on a miss.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        recommendations, created_at, user_stamps, product_stamps, category_stamps = entry
+        if (self.max_age is not None and time.time() - created_at > self.max_age) \
+                or any(self.user_versions.get(user_id, 0) != version for user_id, version in user_stamps) \
+                or any(self.product_versions.get(product_id, 0) != version for product_id, version in product_stamps) \
+                or any(self.category_versions.get(category, 0) != version for category, version in category_stamps):
+            del self.entries[key]  # Drop the stale entry
+            self.invalidations += 1
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)  # Mark as most recently used
+        self.hits += 1
+        return recommendations
+    # Time Complexity: O(d), where d is the number of users, products and categories the entry depends on
+    # Explanation: Every recorded version stamp is compared with the current one.
+
+    def put(self, key, recommendations, user_ids, product_ids, categories=()):
+        """
+        Stores a result together with the current stamps of what it was computed from.
+
+        :param key: The cache key.
+        :param recommendations: The recommendations to cache.
+        :param user_ids: The users the result depends on.
+        :param product_ids: The products the result depends on.
+        :param categories: The categories the result was restricted to.
+        """
+        user_stamps = tuple((user_id, self.user_versions.get(user_id, 0)) for user_id in user_ids)
+        product_stamps = tuple((product_id, self.product_versions.get(product_id, 0)) for product_id in product_ids)
+        category_stamps = tuple((category, self.category_versions.get(category, 0)) for category in categories)
+        self.entries[key] = (recommendations, time.time(), user_stamps, product_stamps, category_stamps)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)  # Evict the least recently used entry
+            self.evictions += 1
+    # Time Complexity: O(d), where d is the number of users, products and categories the entry depends on
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        :return: A dictionary with the hit, miss, eviction and invalidation counts and the current size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self.entries),
+        }
+    # Time Complexity: O(1)
@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from DurableRecommendationSystem import DurableRecommendationSystem
+from RecomendationSystem import RecommendationSystem
+
+
+class RecommendationServer:
+    def __init__(self, system, max_in_flight=64, executor=None):
+        """
+        Initializes a JSON-lines request server around a recommendation system.
+
+        Every request is one JSON object per line with an "op" ("recommend", "search", "add_product",
+        "add_interaction" or "ping") and an optional "id" that is echoed back; every response is one line
+        {"id": ..., "ok": true, "result": ...} or {"id": ..., "ok": false, "error": "..."}. Responses on a
+        connection may arrive out of order.
+
+        System calls run in the executor so the event loop stays responsive while scoring. The default executor
+        has a single thread, which also serializes every access to a plain RecommendationSystem; pass a
+        ConcurrentRecommendationSystem and a larger executor to serve reads concurrently.
+
+        :param system: The RecommendationSystem (or ConcurrentRecommendationSystem) to serve.
+        :param max_in_flight: The maximum number of requests being processed or answered at once; beyond it the
+                              server stops reading from its connections, so clients are slowed down by TCP flow
+                              control.
+        :param executor: The concurrent.futures executor that runs system calls (defaults to a single thread).
+        """
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be a positive integer.")
+        self.system = system
+        self.max_in_flight = max_in_flight
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)  # One thread: a plain system is not thread-safe
+        self.in_flight = {}  # Maps recommendation request keys to the future computing them
+        self.requests = 0  # Requests received
+        self.coalesced = 0  # Recommendation requests answered by an identical request already in flight
+        self.errors = 0  # Requests answered with an error
+        self.active = 0  # Requests currently being processed or answered
+        self._slots = None  # Semaphore bounding the requests in flight, created on the server's event loop
+    # Time Complexity: O(1) for initialization
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """
+        Starts listening on a TCP port, or on a Unix socket if a path is given.
+
+        :param host: The TCP host to bind.
+        :param port: The TCP port to bind (0 picks a free port).
+        :param path: The Unix socket path; if given, host and port are ignored.
+        :return: The asyncio.Server.
+        """
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        if path is not None:
+            return await asyncio.start_unix_server(self._serve_connection, path)
+        return await asyncio.start_server(self._serve_connection, host, port)
+    # Time Complexity: O(1)
+
+    async def _serve_connection(self, reader, writer):
+        """
+        Reads requests from a connection and answers each one as soon as it is done.
+
+        :param reader: The connection's asyncio.StreamReader.
+        :param writer: The connection's asyncio.StreamWriter.
+        """
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # Longer than the stream limit; the rest of it cannot be told from the next request
+                    self.requests += 1
+                    self.errors += 1
+                    await self._respond({"id": None, "ok": False, "error": "ValueError: The request line is too long."},
+                                        writer, write_lock)
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await self._slots.acquire()  # Backpressure: stop reading while the server is saturated
+                self.active += 1
+                task = asyncio.ensure_future(self._answer(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(self._release)  # Also runs for a task cancelled before it started
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in list(tasks):
+                task.cancel()  # Requests still running when the connection fails or the server stops
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass  # Closing a reset connection reports the reset again
+    # Time Complexity: O(r), where r is the number of requests on the connection
+
+    async def _answer(self, line, writer, write_lock):
+        """
+        Handles one request line and writes its response.
+
+        :param line: The raw request line.
+        :param writer: The connection's asyncio.StreamWriter.
+        :param write_lock: The connection's lock, so responses are not interleaved.
+        """
+        request_id = None
+        try:
+            self.requests += 1
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object.")
+            request_id = request.get("id")
+            response = {"id": request_id, "ok": True, "result": await self.handle(request)}
+        except Exception as error:  # Any failure is reported to the client rather than dropping the connection
+            self.errors += 1
+            response = {"id": request_id, "ok": False, "error": f"{type(error).__name__}: {error}"}
+        await self._respond(response, writer, write_lock)
+    # Time Complexity: O(1) plus the cost of the request
+
+    async def _respond(self, response, writer, write_lock):
+        """
+        Writes one response line, unless the client is gone.
+
+        :param response: The response dictionary.
+        :param writer: The connection's asyncio.StreamWriter.
+        :param write_lock: The connection's lock, so responses are not interleaved.
+        """
+        async with write_lock:
+            if writer.is_closing():
+                return  # The client is gone; the response has nowhere to go
+            try:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()  # Backpressure: wait while the client is not reading its responses
+            except ConnectionError:
+                pass  # The client disconnected while the response was being written
+    # Time Complexity: O(1)
+
+    def _release(self, task):
+        """
+        Frees the slot of a finished request, however it finished.
+
+        :param task: The finished request task.
+        """
+        self.active -= 1
+        self._slots.release()
+    # Time Complexity: O(1)
+
+    async def handle(self, request):
+        """
+        Executes a decoded request.
+
+        :param request: The request dictionary.
+        :return: The JSON-serializable result.
+        """
+        loop = asyncio.get_running_loop()
+        op = request.get("op")
+        if op == "recommend":
+            key = (request["user_id"], request.get("k", 10), request.get("decay_factor"), request.get("strategy", "user"),
+                   request.get("category"))
+            future = self.in_flight.get(key)
+            if future is None:
+                future = loop.run_in_executor(self.executor, self.system.get_recommendations, *key)
+                self.in_flight[key] = future
+                future.add_done_callback(lambda done: self._forget(key, done))
+            else:
+                self.coalesced += 1  # Share the result of the identical request already being computed
+            recommendations = await asyncio.shield(future)  # A cancelled waiter must not cancel the shared computation
+            return [[product_id, score] for product_id, score in recommendations]
+        if op == "search":
+            results = await loop.run_in_executor(self.executor, self.system.search_products, request["query"],
+                                                 request.get("search_by", "name"), request.get("limit"),
+                                                 request.get("rank_by"), request.get("max_distance", 1))
+            return [[product_id, product_name] for product_id, product_name in results]
+        if op == "add_product":
+            await loop.run_in_executor(self.executor, self.system.add_product, request["product_id"],
+                                       request["product_name"], request["category"])
+            return None
+        if op == "add_interaction":
+            await loop.run_in_executor(self.executor, self.system.add_interaction, request["user_id"], request["product_id"],
+                                       request["score"], request["interaction_type"], request.get("timestamp"))
+            return None
+        if op == "ping":
+            return {"requests": self.requests, "coalesced": self.coalesced, "errors": self.errors, "active": self.active}
+        raise ValueError(f"Unknown op: {op}")
+    # Time Complexity: O(1) plus the cost of the system call
+
+    def _forget(self, key, future):
+        """
+        Removes a finished recommendation computation from the in-flight table.
+
+        :param key: The request key.
+        :param future: The finished future.
+        """
+        if self.in_flight.get(key) is future:
+            del self.in_flight[key]
+    # Time Complexity: O(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recommendations over JSON lines.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host to bind")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to bind")
+    parser.add_argument("--unix", help="serve on this Unix socket path instead of TCP")
+    parser.add_argument("--snapshot", help="load the system from this snapshot file")
+    parser.add_argument("--wal", help="recover from and log every write to this directory (replaces --snapshot)")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="requests processed at once before reading pauses")
+    args = parser.parse_args(argv)
+
+    if args.wal:
+        system = DurableRecommendationSystem(args.wal)
+    else:
+        system = RecommendationSystem.load_snapshot(args.snapshot) if args.snapshot else RecommendationSystem()
+
+    async def serve():
+        server = await RecommendationServer(system, args.max_in_flight).start(args.host, args.port, args.unix)
+        print(f"Serving on {args.unix or '%s:%d' % server.sockets[0].getsockname()[:2]}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.wal:
+            system.close()
+
+
+if __name__ == "__main__":
+    main()
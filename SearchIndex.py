@@ -0,0 +1,252 @@
+import re
+from array import array
+from bisect import bisect_left
+from heapq import merge
+
+from MaxHeap import MaxHeap
+from Trie import Trie
+
+_TOKEN_PATTERN = re.compile(r"\w+")  # A token is a run of letters, digits or underscores
+_BOUNDARY = "\x00"  # Pads indexed names so names shorter than an n-gram still produce n-grams
+
+
+def normalize(text):
+    """
+    Normalizes text for case-insensitive matching.
+
+    :param text: The text to be normalized.
+    :return: The case-folded text.
+    """
+    return text.casefold()
+# Time Complexity: O(m), where m is the length of the text
+
+
+def tokenize(text):
+    """
+    Splits text into normalized word tokens.
+
+    :param text: The text to be tokenized.
+    :return: A list of tokens, in order of appearance.
+    """
+    return _TOKEN_PATTERN.findall(normalize(text))
+# Time Complexity: O(m), where m is the length of the text
+
+
+def intersect(postings_lists):
+    """
+    Intersects sorted posting lists, starting with the smallest one.
+
+    Each surviving document ID is looked up in the next list with a binary search that resumes
+    from the previous position, so the cost is driven by the shortest list.
+
+    :param postings_lists: A list of sorted sequences of document IDs.
+    :return: A sorted array of the document IDs present in every list.
+    """
+    postings_lists = sorted(postings_lists, key=len)
+    result = postings_lists[0]
+    for postings in postings_lists[1:]:
+        matched = array('q')
+        position = 0
+        for document in result:
+            position = bisect_left(postings, document, position)
+            if position == len(postings):
+                break
+            if postings[position] == document:
+                matched.append(document)
+        result = matched
+        if not result:
+            break
+    return result
+# Time Complexity: O(s * t * log L), where s is the length of the shortest list, t the number of lists and L the longest list
+
+
+def union(postings_lists):
+    """
+    Lazily merges sorted posting lists into one sorted stream without duplicates.
+
+    :param postings_lists: A list of sorted sequences of document IDs.
+    :return: An iterator over the document IDs present in any list, in increasing order.
+    """
+    previous = None
+    for document in merge(*postings_lists):
+        if document != previous:
+            yield document
+            previous = document
+# Time Complexity: O(t + r log t), where t is the number of lists and r the number of IDs consumed
+
+
+class SearchIndex:
+    def __init__(self, ngram_size=None):
+        """
+        Initializes a normalized, tokenized product-name index.
+
+        Every word of a product name gets a posting list of document IDs. Document IDs are handed out
+        in increasing order, so posting lists stay sorted by simply appending to them.
+        For infix matching, names are padded with ngram_size - 1 boundary characters on each side before
+        their n-grams are taken, so that every non-empty name is reachable through its n-grams.
+
+        :param ngram_size: The length of the character n-grams indexed for infix matching (None disables infix matching).
+        """
+        if ngram_size is not None and ngram_size <= 0:
+            raise ValueError("ngram_size must be a positive integer.")
+        self.ngram_size = ngram_size
+        self.postings = {}  # Maps tokens to sorted arrays of document IDs
+        self.ngram_postings = {}  # Maps character n-grams to sorted arrays of document IDs
+        self.ngram_extensions = {}  # Maps proper prefixes of the indexed n-grams to the n-grams starting with them
+        self.documents = []  # Maps document IDs to (product ID, normalized name), or None once superseded
+        self.document_of = {}  # Maps product IDs to their current document ID
+        self.token_trie = Trie()  # Radix tree of the name tokens, for typo-tolerant search per word
+    # Time Complexity: O(1) for initialization
+
+    def _ngrams(self, text):
+        """
+        Returns the distinct character n-grams of a normalized text.
+
+        :param text: The normalized text.
+        :return: A set of n-grams.
+        """
+        size = self.ngram_size
+        return {text[index:index + size] for index in range(len(text) - size + 1)}
+    # Time Complexity: O(m), where m is the length of the text
+
+    def add(self, product_id, product_name):
+        """
+        Indexes a product name. Re-adding a product replaces its previous name.
+
+        :param product_id: The ID of the product.
+        :param product_name: The name of the product.
+        """
+        previous = self.document_of.get(product_id)
+        if previous is not None:
+            for token in set(tokenize(self.documents[previous][1])):
+                self.token_trie.remove(token, product_id)
+            self.documents[previous] = None  # Stale postings are skipped at query time
+        document = len(self.documents)
+        normalized = normalize(product_name)
+        self.documents.append((product_id, normalized))
+        self.document_of[product_id] = document
+        for token in set(tokenize(product_name)):
+            self.postings.setdefault(token, array('q')).append(document)
+            self.token_trie.insert(token, product_id)
+        if self.ngram_size is not None:
+            padding = _BOUNDARY * (self.ngram_size - 1)
+            for ngram in self._ngrams(padding + normalized + padding):  # Boundary n-grams cover short names
+                postings = self.ngram_postings.get(ngram)
+                if postings is None:
+                    postings = self.ngram_postings[ngram] = array('q')
+                    for length in range(1, self.ngram_size):
+                        self.ngram_extensions.setdefault(ngram[:length], []).append(ngram)
+                postings.append(document)
+    # Time Complexity: O(m), where m is the length of the product name (times the n-gram size for new n-grams)
+    # Explanation: Each token and n-gram is appended to its posting list in O(1) amortized time.
+
+    def search(self, query, limit=None):
+        """
+        Finds the products whose names contain every word of the query.
+
+        :param query: The search query.
+        :param limit: The maximum number of product IDs to return (None means all of them).
+        :return: A list of product IDs, in the order the products were indexed.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        postings_lists = []
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                return []  # A term that matches nothing empties the AND
+            postings_lists.append(postings)
+        return self._resolve(intersect(postings_lists), limit)
+    # Time Complexity: O(q + s * t * log L), where q is the length of the query and s, t, L are as in intersect
+    # Explanation: The shortest posting list bounds the work, independent of the catalog size.
+
+    def search_infix(self, query, limit=None):
+        """
+        Finds the products whose normalized names contain the query as a substring.
+
+        :param query: The search query.
+        :param limit: The maximum number of product IDs to return (None means all of them).
+        :return: A list of product IDs, in the order the products were indexed.
+        """
+        if self.ngram_size is None:
+            raise ValueError("Infix search requires an index built with ngram_size.")
+        needle = normalize(query)
+        if not needle:
+            return []
+        if len(needle) >= self.ngram_size:
+            postings_lists = []
+            for ngram in self._ngrams(needle):
+                postings = self.ngram_postings.get(ngram)
+                if postings is None:
+                    return []
+                postings_lists.append(postings)
+            candidates = intersect(postings_lists)
+        else:
+            # The query is shorter than an n-gram, and each of its occurrences starts an n-gram of the padded name:
+            # merge the postings of those n-grams lazily, so a limit stops the merge early
+            candidates = union([self.ngram_postings[ngram] for ngram in self.ngram_extensions.get(needle, ())])
+        matched = []
+        for document in candidates:
+            entry = self.documents[document]
+            if entry is not None and needle in entry[1]:  # Shared n-grams do not guarantee a contiguous match
+                matched.append(entry[0])
+                if limit is not None and len(matched) >= limit:
+                    break
+        return matched
+    # Time Complexity: O(q + c * m), where q is the length of the query, c the number of candidates and m the name length
+    # (plus O(g + c log g) for a query shorter than an n-gram, where g is the number of n-grams it starts)
+    # Explanation: The n-gram intersection narrows the candidates, which are then verified with a substring check.
+
+    def search_fuzzy(self, query, max_distance=1, limit=None, rank_by=None, max_nodes=10000):
+        """
+        Finds the products whose names contain a word close to every word of the query.
+
+        Each query word is matched against the words of the names within max_distance edits (at most one edit
+        per letter beyond the first, so one-letter words must match exactly). The last word is matched as a
+        prefix, since it may still be being typed, unless the query ends with whitespace; "lapt" and
+        "gamng laptop" both find "Gaming Laptop".
+
+        :param query: The (possibly misspelled, possibly partial) query.
+        :param max_distance: The maximum edit distance per word.
+        :param limit: The maximum number of product IDs to return (None means all of them).
+        :param rank_by: Optional function mapping a product ID to a score, used to break ties between equal distances.
+        :param max_nodes: A cap on the number of Trie nodes visited per query word.
+        :return: A list of product IDs, smallest total distance first, then by rank_by score, then by product ID.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        totals = None
+        for index, term in enumerate(terms):
+            prefix = index == len(terms) - 1 and not query[-1].isspace()
+            distances = self.token_trie.fuzzy_distances(term, min(max_distance, len(term) - 1), prefix, max_nodes)
+            if totals is None:
+                totals = distances
+            else:
+                totals = {product_id: distance + distances[product_id] for product_id, distance in totals.items() if product_id in distances}
+            if not totals:
+                return []  # A word that matches nothing empties the AND
+        ranked = (((-distance, rank_by(product_id) if rank_by is not None else 0), product_id)
+                  for product_id, distance in totals.items())
+        return [product_id for _, product_id in MaxHeap.top_k(ranked, limit if limit is not None else float("inf"))]
+    # Time Complexity: O(t * v * q + r log l), where t is the number of query words, v the nodes visited per word
+    # (at most max_nodes), q the word length, r the number of matches and l the limit
+
+    def _resolve(self, documents, limit):
+        """
+        Maps document IDs to product IDs, skipping superseded documents.
+
+        :param documents: A sorted sequence of document IDs.
+        :param limit: The maximum number of product IDs to return (None means all of them).
+        :return: A list of product IDs.
+        """
+        matched = []
+        for document in documents:
+            entry = self.documents[document]
+            if entry is not None:
+                matched.append(entry[0])
+                if limit is not None and len(matched) >= limit:
+                    break
+        return matched
+    # Time Complexity: O(n), where n is the number of documents
@@ -0,0 +1,353 @@
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+
+from Trienode import TrieNode
+
+MAGIC = b"PDSNAP\x00\x00"  # Identifies a snapshot file
+FORMAT_VERSION = 3  # Bumped whenever the layout changes
+_HEADER = struct.Struct("<8sIIII")  # magic, format version, section count, CRC-32 of the rest of the file, reserved
+_SECTION = struct.Struct("<8sQQ")  # section name, offset, length
+_META = struct.Struct("<dd")  # decay reference epoch, decay factor
+
+
+def _pad(length):
+    """
+    Returns the padding that aligns a length to 8 bytes, so every section can be cast in place.
+
+    :param length: The length in bytes.
+    :return: The padding bytes.
+    """
+    return b"\x00" * (-length % 8)
+# Time Complexity: O(1)
+
+
+def _encode_strings(strings):
+    """
+    Encodes a string table: a count, count + 1 offsets and the concatenated UTF-8 bytes.
+
+    :param strings: A list of strings.
+    :return: The encoded table.
+    """
+    offsets = array('Q', [0])
+    blob = bytearray()
+    for string in strings:
+        if not isinstance(string, str):
+            raise TypeError(f"Snapshots only store string IDs, names and categories, got {type(string).__name__}.")
+        blob += string.encode("utf-8")
+        offsets.append(len(blob))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return struct.pack("<Q", len(strings)) + offsets.tobytes() + bytes(blob)
+# Time Complexity: O(n), where n is the total length of the strings
+
+
+def _decode_strings(view):
+    """
+    Decodes a string table.
+
+    :param view: A memoryview over the encoded table.
+    :return: A list of strings.
+    """
+    count = struct.unpack_from("<Q", view)[0]
+    offsets = _column(view[8:8 + 8 * (count + 1)], 'Q')
+    blob = view[8 + 8 * (count + 1):]
+    return [str(blob[offsets[index]:offsets[index + 1]], "utf-8") for index in range(count)]
+# Time Complexity: O(n), where n is the total length of the strings
+
+
+def _column(view, typecode):
+    """
+    Returns a typed view over a little-endian column without copying it (on little-endian machines).
+
+    :param view: A memoryview over the column bytes.
+    :param typecode: The array typecode of the column.
+    :return: A sequence of the column values.
+    """
+    if sys.byteorder == "little":
+        return view.cast(typecode)
+    values = array(typecode, view.tobytes())
+    values.byteswap()
+    return values
+# Time Complexity: O(1) on little-endian machines, O(n) otherwise
+
+
+def _encode_column(typecode, values):
+    """
+    Encodes a column as little-endian bytes.
+
+    :param typecode: The array typecode of the column.
+    :param values: An iterable of the column values.
+    :return: The encoded column.
+    """
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+# Time Complexity: O(n), where n is the number of values
+
+
+def _encode_trie(trie, product_codes):
+    """
+    Serializes a Trie in preorder.
+
+    Each node is written as label index, child count, product count and then the product codes.
+
+    :param trie: The Trie to be serialized.
+    :param product_codes: Maps product IDs to their index in the product table.
+    :return: A tuple (labels, nodes) with the label strings and the encoded node records.
+    """
+    labels = []
+    nodes = array('I')
+    stack = [trie.root]
+    while stack:
+        node = stack.pop()
+        product_ids = node.product_ids or ()
+        nodes.extend((len(labels), len(node.children), len(product_ids)))
+        nodes.extend(product_codes[product_id] for product_id in product_ids)
+        labels.append(node.label)
+        stack.extend(reversed(list(node.children.values())))
+    if sys.byteorder != "little":
+        nodes.byteswap()
+    return labels, nodes.tobytes()
+# Time Complexity: O(n + p), where n is the number of nodes and p the number of stored product IDs
+
+
+def _decode_trie(trie, labels, nodes, product_ids):
+    """
+    Rebuilds a Trie from its preorder serialization.
+
+    :param trie: The (empty) Trie to be filled.
+    :param labels: The label strings.
+    :param nodes: The node records.
+    :param product_ids: The product table.
+    """
+    position = 0
+
+    def read_node():
+        nonlocal position
+        label_index, child_count, product_count = nodes[position], nodes[position + 1], nodes[position + 2]
+        position += 3
+        node = TrieNode(labels[label_index])
+        if product_count:
+            node.product_ids = {product_ids[code] for code in nodes[position:position + product_count]}
+            node.is_end_of_word = True
+            position += product_count
+        return node, child_count
+
+    trie.root, child_count = read_node()
+    stack = [(trie.root, child_count)]  # Nodes whose children are still being read
+    while stack:
+        parent, remaining = stack.pop()
+        if not remaining:
+            continue
+        stack.append((parent, remaining - 1))
+        child, child_count = read_node()
+        parent.children[child.label[0]] = child
+        stack.append((child, child_count))
+# Time Complexity: O(n + p), where n is the number of nodes and p the number of stored product IDs
+
+
+def save_snapshot(system, path):
+    """
+    Writes the products, interactions and Trie of a RecommendationSystem to a binary snapshot.
+
+    Product IDs, names and categories are interned into string tables. The interaction store is written as it
+    is held in memory: its user, product and interaction-type tables and its little-endian columns (user,
+    product, score, interaction type, timestamp, decayed score), in row order. Every section is 8-byte aligned
+    so it can be read in place through mmap. The file ends up with a format version and a CRC-32 of its contents.
+
+    :param system: The RecommendationSystem to be saved.
+    :param path: The path of the snapshot file.
+    """
+    product_codes = {}
+    product_ids = []
+    category_codes = {}
+    names = []
+    categories = []
+    for product_id, (product_name, category) in system.product_details.items():
+        product_codes[product_id] = len(product_ids)
+        product_ids.append(product_id)
+        names.append(product_name)
+        categories.append(category_codes.setdefault(category, len(category_codes)))
+
+    store = system.interactions
+    trie_labels, trie_nodes = _encode_trie(system.trie, product_codes)
+    sections = [
+        (b"META", _META.pack(system.decay_epoch, system.decay_factor)),
+        (b"PRODUCTS", _encode_strings(product_ids)),
+        (b"NAMES", _encode_strings(names)),
+        (b"CATEGORY", _encode_strings(list(category_codes))),
+        (b"PCAT", _encode_column('I', categories)),
+        (b"IUSERS", _encode_strings(store.user_ids)),
+        (b"IPRODS", _encode_strings(store.product_ids)),
+        (b"ITYPES", _encode_strings(store.type_names)),
+        (b"IUSER", _encode_column('I', store.users)),
+        (b"IPRODUCT", _encode_column('I', store.products)),
+        (b"ISCORE", _encode_column('d', store.scores)),
+        (b"ITYPE", _encode_column('H', store.types)),
+        (b"ITIME", _encode_column('d', store.timestamps)),
+        (b"IDECAY", _encode_column('d', store.decayed)),
+        (b"TLABELS", _encode_strings(trie_labels)),
+        (b"TNODES", trie_nodes),
+    ]
+
+    table_size = _SECTION.size * len(sections)
+    offset = _HEADER.size + table_size + len(_pad(_HEADER.size + table_size))
+    table = bytearray()
+    body = bytearray()
+    for name, data in sections:
+        table += _SECTION.pack(name, offset + len(body), len(data))
+        body += data + _pad(len(data))
+    rest = bytes(table) + _pad(_HEADER.size + table_size) + bytes(body)
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), zlib.crc32(rest), 0))
+        snapshot_file.write(rest)
+# Time Complexity: O(p + i + n), where p is the number of products, i the number of interactions and n the number of Trie nodes
+
+
+class SnapshotReader:
+    def __init__(self, path, verify=True):
+        """
+        Opens a snapshot through a read-only memory map.
+
+        The columns are exposed as typed memoryviews over the mapped file, so reading them copies nothing.
+        Every view handed out is tracked and released by close(), which must happen before the map is closed,
+        unless the views were handed over with detach().
+
+        :param path: The path of the snapshot file.
+        :param verify: Whether to check the CRC-32 of the file.
+        """
+        with open(path, "rb") as snapshot_file:
+            self._map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._views = []  # Views derived from the map, released on close
+        self._detached = False  # Whether the views own the map, see detach
+        self.sections = {}  # Maps section names to memoryviews over their bytes
+        magic, version, section_count, checksum, _ = _HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot file.")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot format version {version} (expected {FORMAT_VERSION}).")
+        if verify and zlib.crc32(self._view[_HEADER.size:]) != checksum:
+            self.close()
+            raise ValueError(f"{path} is corrupt (checksum mismatch).")
+        for index in range(section_count):
+            name, offset, length = _SECTION.unpack_from(self._view, _HEADER.size + index * _SECTION.size)
+            self.sections[name.rstrip(b"\x00").decode("ascii")] = self._track(self._view[offset:offset + length])
+    # Time Complexity: O(s) without verification, where s is the number of sections; O(file size) with it
+
+    def _track(self, view):
+        """
+        Records a view derived from the map so that close() can release it.
+
+        :param view: A memoryview (or, on big-endian machines, a copied array).
+        :return: The view.
+        """
+        if isinstance(view, memoryview):
+            self._views.append(view)
+        return view
+    # Time Complexity: O(1) amortized
+
+    def strings(self, name):
+        """
+        Decodes a string table section.
+
+        :param name: The section name.
+        :return: A list of strings.
+        """
+        return _decode_strings(self.sections[name])
+
+    def column(self, name, typecode):
+        """
+        Returns a zero-copy typed view over a column section.
+
+        :param name: The section name.
+        :param typecode: The array typecode of the column.
+        :return: A sequence of the column values.
+        """
+        return self._track(_column(self.sections[name], typecode))
+
+    def detach(self):
+        """
+        Hands the map over to the views handed out so far: close() leaves them usable, and the file is unmapped
+        once the last of them is garbage collected.
+        """
+        self._views = []
+        self._detached = True
+
+    def close(self):
+        """
+        Releases every view handed out and then the memory map. Views returned earlier must not be used afterwards,
+        unless they were handed over with detach().
+        """
+        self.sections = {}
+        if self._detached:
+            self._view.release()  # The views derived from it keep the map alive
+            return
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.close()
+        except BufferError:
+            if exc_type is None:
+                raise
+            # An untracked view is still referenced (e.g. by the traceback); the map is unmapped once it is
+            # collected, and the original exception is the one worth reporting
+
+
+def load_snapshot(system, path, verify=True, mapped=True):
+    """
+    Fills an empty RecommendationSystem from a snapshot.
+
+    The Trie is restored from its serialized form and the products are added from their tables. The
+    interaction store reads its columns in place from the map, so processes loading the same snapshot share
+    its pages, and copies them into private arrays on its first write; with mapped unset they are copied in
+    bulk right away and the file is closed. Only the derived indexes are built from the columns; interactions
+    are not replayed. A snapshot saved with a different decay factor is the exception: its pairs are re-added
+    from their summed scores and latest timestamps, so the aggregates match the new factor.
+
+    :param system: The (empty) RecommendationSystem to be filled.
+    :param path: The path of the snapshot file.
+    :param verify: Whether to check the CRC-32 of the file.
+    :param mapped: Whether the store keeps reading the columns from the map.
+    :return: The filled system.
+    """
+    with SnapshotReader(path, verify) as reader:
+        product_ids = reader.strings("PRODUCTS")
+        names = reader.strings("NAMES")
+        category_names = reader.strings("CATEGORY")
+        categories = reader.column("PCAT", 'I')
+        for code, category in enumerate(categories):
+            system._add_product_details(product_ids[code], names[code], category_names[category])
+        _decode_trie(system.trie, reader.strings("TLABELS"), reader.column("TNODES", 'I'), product_ids)
+
+        epoch, decay_factor = _META.unpack_from(reader.sections["META"])
+        user_ids = reader.strings("IUSERS")
+        interaction_products = reader.strings("IPRODS")
+        interaction_types = reader.strings("ITYPES")
+        columns = [reader.column(name, typecode) for name, typecode in
+                   (("IUSER", 'I'), ("IPRODUCT", 'I'), ("ISCORE", 'd'), ("ITYPE", 'H'), ("ITIME", 'd'), ("IDECAY", 'd'))]
+        if decay_factor == system.decay_factor:
+            system._set_decay_epoch(epoch)  # The stored aggregates can be used as they are
+            system.interactions.load_columns(user_ids, interaction_products, interaction_types, *columns, mapped=mapped)
+            system._index_interactions()
+            if mapped:
+                reader.detach()
+        else:  # Different decay factor: aggregates are rebuilt from the summed score and latest timestamp
+            system.add_interactions_bulk((user_ids[user], interaction_products[product], score, interaction_types[interaction_type], timestamp)
+                                         for user, product, score, interaction_type, timestamp, _ in zip(*columns))
+    return system
+# Time Complexity: O(p + i + n), where p is the number of products, i the number of interactions and n the number of Trie nodes
@@ -1,7 +1,24 @@
 
+from MaxHeap import MaxHeap
 from Trienode import TrieNode
 
 
+def _common_prefix_length(first, second):
+    """
+    Returns the length of the longest common prefix of two strings.
+
+    :param first: The first string.
+    :param second: The second string.
+    :return: The number of leading characters the strings share.
+    """
+    length = min(len(first), len(second))
+    index = 0
+    while index < length and first[index] == second[index]:
+        index += 1
+    return index
+# Time Complexity: O(m), where m is the length of the shorter string
+
+
 class Trie:
     def __init__(self):
         self.root = TrieNode()  # Initialize the root node of the Trie
@@ -10,32 +27,183 @@ class Trie:
     def insert(self, product_name, product_id):
         """
         Inserts a product name and its associated product ID into the Trie.
-        
+
+        The Trie is a compressed radix tree: chains of single-child nodes are merged into one edge label,
+        and product IDs are only stored at the node where a name ends.
+
         :param product_name: The name of the product to be inserted.
         :param product_id: The ID of the product to be inserted.
         """
         node = self.root
-        for char in product_name:
-            if char not in node.children:
-                node.children[char] = TrieNode()  # Create a new TrieNode if the character is not already a child
-            node = node.children[char]  # Move to the child node
-            node.product_ids.add(product_id)  # Add the product ID to the current node's product_ids set
+        rest = product_name
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                child = TrieNode(rest)  # Create a leaf holding the whole remaining suffix
+                node.children[rest[0]] = child
+                node = child
+                break
+            shared = _common_prefix_length(child.label, rest)
+            if shared < len(child.label):
+                middle = TrieNode(child.label[:shared])  # Split the edge where the labels diverge
+                child.label = child.label[shared:]
+                middle.children[child.label[0]] = child
+                node.children[rest[0]] = middle
+                child = middle
+            node = child  # Move to the child node
+            rest = rest[shared:]
         node.is_end_of_word = True  # Mark the last node as the end of a word
+        if node.product_ids is None:
+            node.product_ids = set()
+        node.product_ids.add(product_id)  # Add the product ID to the terminal node's product_ids set
+    # Time Complexity: O(m), where m is the length of the product_name
+    # Explanation: The method walks at most m characters of edge labels, splitting at most one edge.
+
+    def remove(self, product_name, product_id):
+        """
+        Removes a product ID from the node where its name ends.
+
+        :param product_name: The name the product was inserted with.
+        :param product_id: The ID of the product to be removed.
+        """
+        node = self._find(product_name)
+        if node is None or node[1] or node[0].product_ids is None:
+            return
+        node = node[0]
+        node.product_ids.discard(product_id)
+        if not node.product_ids:
+            node.product_ids = None
+            node.is_end_of_word = False
     # Time Complexity: O(m), where m is the length of the product_name
-    # Explanation: The method iterates over each character in the product_name, performing constant-time operations for each character.
+    # Explanation: Empty nodes are left in place; they are harmless and are reused by later inserts.
 
-    def search(self, prefix):
+    def _find(self, prefix):
         """
-        Searches for a prefix in the Trie and returns the list of product IDs associated with the prefix.
-        
+        Finds the node that covers a prefix.
+
         :param prefix: The prefix to be searched in the Trie.
-        :return: A list of product IDs associated with the prefix.
+        :return: A tuple (node, partial) where partial is True if the prefix ends inside the node's edge label,
+                 or None if no name starts with the prefix.
         """
         node = self.root
-        for char in prefix:
-            if char not in node.children:
-                return []  # Return an empty list if the prefix is not found
-            node = node.children[char]  # Move to the child node
-        return list(node.product_ids)  # Return the list of product IDs associated with the last node of the prefix
+        rest = prefix
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                return None  # No child continues the prefix
+            shared = _common_prefix_length(child.label, rest)
+            if shared == len(rest):
+                return child, shared < len(child.label)  # The prefix ends on this edge
+            if shared < len(child.label):
+                return None  # The prefix diverges from the edge label
+            node = child  # Move to the child node
+            rest = rest[shared:]
+        return node, False
     # Time Complexity: O(m), where m is the length of the prefix
-    # Explanation: The method iterates over each character in the prefix, performing constant-time operations for each character.
\ No newline at end of file
+
+    def _iter_product_ids(self, node):
+        """
+        Yields every product ID stored in the subtree of a node, in depth-first order.
+
+        :param node: The root of the subtree.
+        """
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.product_ids:
+                yield from node.product_ids
+            stack.extend(reversed(list(node.children.values())))
+    # Time Complexity: O(s), where s is the size of the subtree
+
+    def search(self, prefix, limit=None, rank_by=None):
+        """
+        Searches for a prefix in the Trie and returns the product IDs whose names start with it.
+
+        :param prefix: The prefix to be searched in the Trie.
+        :param limit: The maximum number of product IDs to return (None means all of them).
+        :param rank_by: Optional function mapping a product ID to a score; the highest-scoring products are
+                        returned first, selected with a heap bounded to limit items.
+        :return: A list of product IDs associated with the prefix.
+        """
+        found = self._find(prefix)
+        if found is None:
+            return []  # Return an empty list if the prefix is not found
+        product_ids = self._iter_product_ids(found[0])
+        if rank_by is not None:
+            ranked = ((rank_by(product_id), product_id) for product_id in product_ids)
+            return [product_id for _, product_id in MaxHeap.top_k(ranked, limit if limit is not None else float("inf"))]
+        if limit is not None:
+            return [product_id for _, product_id in zip(range(limit), product_ids)]  # Stop the walk after limit IDs
+        return list(product_ids)
+    # Time Complexity: O(m + s log l), where m is the length of the prefix, s the size of the matching subtree and l the limit
+    # Explanation: Unranked searches with a limit stop after l IDs; ranked searches walk the subtree and keep the best l in a bounded heap.
+
+    def fuzzy_search(self, word, max_distance=1, prefix=False, limit=None, rank_by=None, max_nodes=10000):
+        """
+        Searches for product names within a given edit distance of a word.
+
+        :param word: The (possibly misspelled) query.
+        :param max_distance: The maximum edit distance of a match.
+        :param prefix: If True, the word only has to match some prefix of the name; otherwise the whole name.
+        :param limit: The maximum number of product IDs to return (None means all of them).
+        :param rank_by: Optional function mapping a product ID to a score, used to break ties between equal distances.
+        :param max_nodes: A hard cap on the number of Trie nodes visited, which bounds worst-case latency.
+        :return: A list of product IDs, closest first, then by rank_by score, then by product ID.
+        """
+        distances = self.fuzzy_distances(word, max_distance, prefix, max_nodes)
+        ranked = (((-distance, rank_by(product_id) if rank_by is not None else 0), product_id)
+                  for product_id, distance in distances.items())
+        return [product_id for _, product_id in MaxHeap.top_k(ranked, limit if limit is not None else float("inf"))]
+    # Time Complexity: O(v * q + r log l), where v is the number of visited nodes (at most max_nodes), q the length of the word, r the number of matches and l the limit
+
+    def fuzzy_distances(self, word, max_distance=1, prefix=False, max_nodes=10000):
+        """
+        Finds the product IDs whose names are within a given edit distance of a word, with their distances.
+
+        The Trie is walked depth-first while one row of the Levenshtein table is computed per character of
+        the edge labels. A branch is abandoned as soon as the smallest value in its row exceeds max_distance,
+        because no name below it can come back within the bound.
+
+        :param word: The (possibly misspelled) query.
+        :param max_distance: The maximum edit distance of a match.
+        :param prefix: If True, the word only has to match some prefix of the name; otherwise the whole name.
+        :param max_nodes: A hard cap on the number of Trie nodes visited, which bounds worst-case latency.
+        :return: A dictionary mapping the matched product IDs to their smallest edit distance.
+        """
+        distances = {}  # Maps matched product IDs to their best edit distance
+        visited = 0
+        stack = [(self.root, list(range(len(word) + 1)), len(word))]  # (node, row after its label, best prefix distance)
+        while stack and visited < max_nodes:
+            node, row, best = stack.pop()
+            visited += 1
+            if node.product_ids and (row[-1] <= max_distance or (prefix and best <= max_distance)):
+                distance = min(best, row[-1]) if prefix else row[-1]
+                for product_id in node.product_ids:
+                    if distance < distances.get(product_id, max_distance + 1):
+                        distances[product_id] = distance
+            for child in node.children.values():
+                child_row, child_best = row, best
+                for char in child.label:
+                    previous = child_row
+                    child_row = [previous[0] + 1]
+                    for index in range(1, len(previous)):
+                        child_row.append(min(previous[index] + 1, child_row[index - 1] + 1,
+                                             previous[index - 1] + (word[index - 1] != char)))
+                    child_best = min(child_best, child_row[-1])
+                    if min(child_row) > max_distance:
+                        break  # No extension of this path can get back within max_distance
+                if min(child_row) <= max_distance:
+                    stack.append((child, child_row, child_best))
+                elif prefix and child_best <= max_distance:
+                    # A prefix of this path already matched: everything below matches at that distance
+                    subtree = [child]
+                    while subtree and visited < max_nodes:
+                        below = subtree.pop()
+                        visited += 1
+                        for product_id in below.product_ids or ():
+                            if child_best < distances.get(product_id, max_distance + 1):
+                                distances[product_id] = child_best
+                        subtree.extend(below.children.values())
+        return distances
+    # Time Complexity: O(v * q), where v is the number of visited nodes (at most max_nodes) and q the length of the word
+    # Explanation: Each visited character costs one DP row of length q + 1, and pruning keeps v far below the catalog size for small distances.
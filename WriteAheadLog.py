@@ -0,0 +1,409 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+MAGIC = b"PDWAL\x00\x00\x00"  # Identifies a log segment
+FORMAT_VERSION = 1  # Bumped whenever the record layout changes
+_SEGMENT_HEADER = struct.Struct("<8sII")  # magic, format version, reserved
+_RECORD = struct.Struct("<II")  # payload length, CRC-32 of the payload
+_STRING = struct.Struct("<I")  # length of a UTF-8 string
+_INTERACTION = struct.Struct("<dd")  # score, timestamp
+PRODUCT = 1  # Record kind of add_product
+INTERACTION = 2  # Record kind of add_interaction
+_SYNC_POLICIES = ("always", "interval", "never")
+
+
+def segment_name(sequence):
+    """
+    Returns the file name of a log segment; names sort in sequence order.
+
+    :param sequence: The sequence number of the segment.
+    :return: The file name.
+    """
+    return f"{sequence:020d}.wal"
+# Time Complexity: O(1)
+
+
+def _encode_string(string):
+    """
+    Encodes a length-prefixed UTF-8 string.
+
+    :param string: The string.
+    :return: The encoded bytes.
+    """
+    if not isinstance(string, str):
+        raise TypeError(f"The log only stores string IDs, names, categories and types, got {type(string).__name__}.")
+    data = string.encode("utf-8")
+    return _STRING.pack(len(data)) + data
+# Time Complexity: O(m), where m is the length of the string
+
+
+def _decode_strings(payload, offset, count):
+    """
+    Decodes consecutive length-prefixed UTF-8 strings.
+
+    :param payload: The record payload.
+    :param offset: The offset of the first string.
+    :param count: The number of strings.
+    :return: A list of strings.
+    """
+    strings = []
+    for _ in range(count):
+        length = _STRING.unpack_from(payload, offset)[0]
+        offset += _STRING.size
+        strings.append(str(payload[offset:offset + length], "utf-8"))
+        offset += length
+    return strings
+# Time Complexity: O(m), where m is the total length of the strings
+
+
+def encode_product(product_id, product_name, category):
+    """
+    Encodes an add_product call as a framed record.
+
+    :param product_id: The ID of the product.
+    :param product_name: The name of the product.
+    :param category: The category of the product.
+    :return: The record bytes: payload length, CRC-32, then the payload.
+    """
+    payload = bytes([PRODUCT]) + _encode_string(product_id) + _encode_string(product_name) + _encode_string(category)
+    return _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+# Time Complexity: O(m), where m is the total length of the strings
+
+
+def encode_interaction(user_id, product_id, score, interaction_type, timestamp):
+    """
+    Encodes an add_interaction call as a framed record.
+
+    :param user_id: The ID of the user.
+    :param product_id: The ID of the product.
+    :param score: The score of the interaction.
+    :param interaction_type: The type of interaction.
+    :param timestamp: The resolved time of the interaction, so a replay stores the same values.
+    :return: The record bytes: payload length, CRC-32, then the payload.
+    """
+    payload = (bytes([INTERACTION]) + _INTERACTION.pack(score, timestamp) + _encode_string(user_id)
+               + _encode_string(product_id) + _encode_string(interaction_type))
+    return _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+# Time Complexity: O(m), where m is the total length of the strings
+
+
+def decode_record(payload):
+    """
+    Decodes a record payload.
+
+    :param payload: The payload bytes (without the length and CRC).
+    :return: (PRODUCT, (product_id, product_name, category)) or
+             (INTERACTION, (user_id, product_id, score, interaction_type, timestamp)).
+    """
+    kind = payload[0]
+    if kind == PRODUCT:
+        return PRODUCT, tuple(_decode_strings(payload, 1, 3))
+    if kind == INTERACTION:
+        score, timestamp = _INTERACTION.unpack_from(payload, 1)
+        user_id, product_id, interaction_type = _decode_strings(payload, 1 + _INTERACTION.size, 3)
+        return INTERACTION, (user_id, product_id, score, interaction_type, timestamp)
+    raise ValueError(f"Unknown log record kind {kind}.")
+# Time Complexity: O(m), where m is the length of the payload
+
+
+def read_segment(path):
+    """
+    Streams the records of a segment up to its last complete, intact record.
+
+    :param path: The path of the segment.
+    :return: A generator of (kind, record, end offset) tuples; the end offset is where the valid prefix of the
+             segment stops after that record.
+    """
+    with open(path, "rb") as segment_file:
+        header = segment_file.read(_SEGMENT_HEADER.size)
+        if len(header) < _SEGMENT_HEADER.size:
+            return  # Created but never written
+        magic, version, _ = _SEGMENT_HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a log segment.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported log format version {version} (expected {FORMAT_VERSION}).")
+        offset = _SEGMENT_HEADER.size
+        while True:
+            frame = segment_file.read(_RECORD.size)
+            if len(frame) < _RECORD.size:
+                return
+            length, checksum = _RECORD.unpack(frame)
+            payload = segment_file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                return  # Torn or corrupt write: nothing after it was acknowledged
+            offset += _RECORD.size + length
+            kind, record = decode_record(payload)
+            yield kind, record, offset
+# Time Complexity: O(s), where s is the size of the segment; memory is O(1) per record
+
+
+def valid_length(path):
+    """
+    Returns the length of the valid prefix of a segment.
+
+    :param path: The path of the segment.
+    :return: The offset after the last intact record (0 if not even the header was written).
+    """
+    if os.path.getsize(path) < _SEGMENT_HEADER.size:
+        return 0
+    end = _SEGMENT_HEADER.size
+    for _, _, end in read_segment(path):
+        pass
+    return end
+# Time Complexity: O(s), where s is the size of the segment
+
+
+def sync_directory(directory):
+    """
+    Flushes a directory entry to disk, so created, renamed and deleted files survive a crash.
+
+    :param directory: The directory.
+    """
+    if os.name != "posix":
+        return  # Directories cannot be opened for fsync elsewhere
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+# Time Complexity: O(1) plus the cost of the fsync
+
+
+class WriteAheadLog:
+    def __init__(self, directory, sync="always", group_size=256, commit_interval=0.05, sync_interval=1.0,
+                 segment_bytes=64 << 20):
+        """
+        Opens an append-only log of add_product and add_interaction calls, split into numbered segments.
+
+        Every segment starts with a magic and a format version; every record is framed by its payload length and
+        the CRC-32 of the payload, so a torn write at the end of the log is detected and cut off. Records are
+        buffered and written in groups (group commit): one write, and at most one fsync, per group_size records
+        or per commit_interval seconds, whichever comes first, or on an explicit commit(). A crash can lose the
+        records of the group being built, but never the records of a committed group under sync="always".
+
+        Opening the log repairs the torn tail of the last segment and starts a new segment; existing segments
+        are never appended to.
+
+        :param directory: The directory holding the segments.
+        :param sync: The fsync policy of a commit: "always" (every commit is durable when it returns),
+                     "interval" (at most one fsync per sync_interval seconds) or "never" (left to the OS).
+        :param group_size: The number of buffered records that triggers a commit.
+        :param commit_interval: The age in seconds of the oldest buffered record that triggers a commit on append.
+        :param sync_interval: The minimum time in seconds between two fsyncs under sync="interval".
+        :param segment_bytes: The size after which the active segment is closed and a new one started.
+        """
+        if sync not in _SYNC_POLICIES:
+            raise ValueError(f"Unknown sync policy: {sync}")
+        if group_size <= 0 or segment_bytes <= 0:
+            raise ValueError("group_size and segment_bytes must be positive integers.")
+        self.directory = directory
+        self.sync = sync
+        self.group_size = group_size
+        self.commit_interval = commit_interval
+        self.sync_interval = sync_interval
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()  # Serializes appends, commits and rotations
+        self._buffer = bytearray()  # Encoded records of the group being built
+        self._buffered = 0  # The number of records in the buffer
+        self._oldest = None  # The time the oldest buffered record was appended
+        self._last_sync = time.monotonic()  # The time of the last fsync
+        self._unsynced = False  # Whether committed records of the active segment await an fsync
+        self._file = None  # The active segment, opened for appending
+        self._size = 0  # The size of the active segment
+        os.makedirs(directory, exist_ok=True)
+        sequences = self.sequences()
+        if sequences:
+            last = self.path(sequences[-1])
+            length = valid_length(last)
+            if length < os.path.getsize(last):
+                with open(last, "r+b") as segment_file:
+                    segment_file.truncate(length)  # Cut off the torn tail
+                    os.fsync(segment_file.fileno())
+        self.sequence = sequences[-1] + 1 if sequences else 1  # The sequence number of the active segment
+        self._open_segment()
+    # Time Complexity: O(s), where s is the size of the last segment
+
+    def path(self, sequence):
+        """
+        Returns the path of a segment.
+
+        :param sequence: The sequence number of the segment.
+        :return: The path.
+        """
+        return os.path.join(self.directory, segment_name(sequence))
+
+    def sequences(self):
+        """
+        Lists the segments on disk.
+
+        :return: The sorted sequence numbers of the segments.
+        """
+        return sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith(".wal") and name[:-4].isdigit())
+    # Time Complexity: O(f log f), where f is the number of files in the directory
+
+    def _open_segment(self):
+        """
+        Creates the active segment and writes its header.
+        """
+        self._file = open(self.path(self.sequence), "xb")
+        self._file.write(_SEGMENT_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+        self._size = _SEGMENT_HEADER.size
+        sync_directory(self.directory)
+    # Time Complexity: O(1)
+
+    def append_product(self, product_id, product_name, category):
+        """
+        Buffers an add_product record.
+
+        :param product_id: The ID of the product.
+        :param product_name: The name of the product.
+        :param category: The category of the product.
+        """
+        self._append(encode_product(product_id, product_name, category))
+    # Time Complexity: O(m) amortized, where m is the record size
+
+    def append_interaction(self, user_id, product_id, score, interaction_type, timestamp):
+        """
+        Buffers an add_interaction record.
+
+        :param user_id: The ID of the user.
+        :param product_id: The ID of the product.
+        :param score: The score of the interaction.
+        :param interaction_type: The type of interaction.
+        :param timestamp: The resolved time of the interaction.
+        """
+        self._append(encode_interaction(user_id, product_id, score, interaction_type, timestamp))
+    # Time Complexity: O(m) amortized, where m is the record size
+
+    def _append(self, record):
+        """
+        Buffers an encoded record and commits the group once it is full or old enough.
+
+        :param record: The framed record bytes.
+        """
+        with self._lock:
+            if self._file is None:
+                raise ValueError("The log is closed.")
+            self._buffer += record
+            self._buffered += 1
+            now = time.monotonic()
+            if self._oldest is None:
+                self._oldest = now
+            if self._buffered >= self.group_size or now - self._oldest >= self.commit_interval:
+                self._commit(False)
+    # Time Complexity: O(m) amortized, where m is the record size
+
+    def commit(self, force_sync=False):
+        """
+        Writes the buffered records to the active segment and syncs them according to the policy.
+
+        :param force_sync: Whether to fsync regardless of the policy.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._commit(force_sync)
+    # Time Complexity: O(b), where b is the size of the buffered records
+
+    def _commit(self, force_sync):
+        """
+        Helper function for commit; the caller holds the lock.
+
+        :param force_sync: Whether to fsync regardless of the policy.
+        """
+        if self._buffered:
+            self._file.write(self._buffer)
+            self._file.flush()  # Hand the group to the OS in one write
+            self._size += len(self._buffer)
+            self._buffer = bytearray()
+            self._buffered = 0
+            self._oldest = None
+            self._unsynced = True
+        now = time.monotonic()
+        if self._unsynced and (force_sync or self.sync == "always" or
+                               (self.sync == "interval" and now - self._last_sync >= self.sync_interval)):
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+            self._unsynced = False
+        if self._size >= self.segment_bytes:
+            self._rotate()
+    # Time Complexity: O(b), where b is the size of the buffered records
+
+    def rotate(self):
+        """
+        Commits the buffered records, closes the active segment and starts a new one.
+
+        :return: The sequence number of the new active segment; every segment below it is closed.
+        """
+        with self._lock:
+            self._commit(True)
+            if self._size > _SEGMENT_HEADER.size:
+                self._rotate()  # An empty active segment is kept
+            return self.sequence
+    # Time Complexity: O(b), where b is the size of the buffered records
+
+    def _rotate(self):
+        """
+        Helper function that closes the (committed) active segment and starts the next one; the caller holds the lock.
+        """
+        os.fsync(self._file.fileno())  # A closed segment is always durable
+        self._unsynced = False
+        self._file.close()
+        self.sequence += 1
+        self._open_segment()
+    # Time Complexity: O(1) plus the cost of the fsync
+
+    def replay(self, start=0, stop=None):
+        """
+        Streams the records of a range of segments in log order.
+
+        The active segment is only read up to its last commit. A damaged record in any segment but the last
+        one means that acknowledged records are missing, which is an error.
+
+        :param start: The first sequence number to read.
+        :param stop: The sequence number to stop before (None reads up to the active segment).
+        :return: A generator of (kind, record) tuples.
+        """
+        sequences = [sequence for sequence in self.sequences() if sequence >= start and (stop is None or sequence < stop)]
+        for index, sequence in enumerate(sequences):
+            path = self.path(sequence)
+            end = _SEGMENT_HEADER.size
+            for kind, record, end in read_segment(path):
+                yield kind, record
+            if index < len(sequences) - 1 and sequence != self.sequence and end < os.path.getsize(path):
+                raise ValueError(f"{path} is corrupt: a damaged record is followed by more of the log.")
+    # Time Complexity: O(s), where s is the total size of the segments read
+
+    def remove(self, stop):
+        """
+        Deletes the closed segments below a sequence number, once a base snapshot covers them.
+
+        :param stop: The first sequence number to keep; it is capped at the active segment.
+        """
+        stop = min(stop, self.sequence)
+        for sequence in self.sequences():
+            if sequence < stop:
+                os.remove(self.path(sequence))
+        sync_directory(self.directory)
+    # Time Complexity: O(f), where f is the number of segments
+
+    def close(self):
+        """
+        Commits and syncs the buffered records and closes the active segment.
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            self._commit(True)
+            self._file.close()
+            self._file = None
+    # Time Complexity: O(b), where b is the size of the buffered records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
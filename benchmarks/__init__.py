@@ -0,0 +1,9 @@
+"""
+Benchmarks for the recommendation system.
+
+workload.py generates seeded synthetic catalogs and interaction streams, and harness.py measures
+throughput, latency percentiles and peak memory, writing JSON results that can be compared with a
+stored baseline. Run it from the repository root:
+
+    python -m benchmarks --interactions 100000 --output results.json --baseline baseline.json
+"""
@@ -0,0 +1,126 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # The modules live at the repository root
+
+from ConcurrentRecommendationSystem import ConcurrentRecommendationSystem  # noqa: E402
+
+from benchmarks.harness import percentile  # noqa: E402
+from benchmarks.workload import Workload  # noqa: E402
+
+_PROBE_USER = "probe"  # The writer gives this user one new product per probe write, so its product count identifies the state
+
+
+def writer(system, workload, probe_every, published, stop):
+    """
+    Streams the workload into the system, interleaving probe writes and recording when each version was published.
+
+    :param system: The ConcurrentRecommendationSystem.
+    :param workload: The Workload to replay.
+    :param probe_every: One in probe_every writes is a probe write.
+    :param published: A dictionary filled with version -> (probe count, perf_counter time the version became visible).
+    :param stop: An Event set when the writer is done.
+    """
+    probes = 0
+    version = system.version
+    for index, interaction in enumerate(workload.generate_interactions()):
+        if index % probe_every == 0:
+            system.add_interaction(_PROBE_USER, f"probe{probes}", 1, "view")
+            probes += 1
+        else:
+            system.add_interaction(*interaction)
+        if system.version != version:  # The write just triggered a publish, which includes it
+            version = system.version
+            published[version] = (probes, time.perf_counter())
+    system.publish()
+    published[system.version] = (probes, time.perf_counter())
+    stop.set()
+# Time Complexity: O(n), where n is the number of interactions
+
+
+def reader(system, users, stop, observations, latencies, violations):
+    """
+    Reads pinned versions in a loop and checks that each one is internally consistent and never goes backwards.
+
+    :param system: The ConcurrentRecommendationSystem.
+    :param users: User IDs to request recommendations for.
+    :param stop: An Event set when the writer is done.
+    :param observations: A list filled with (start time, version, probe count) tuples.
+    :param latencies: A list filled with per-read latencies in seconds.
+    :param violations: A list filled with descriptions of consistency violations.
+    """
+    rng = random.Random(threading.get_ident())
+    last_version = last_count = -1
+    while not stop.is_set():
+        started = time.perf_counter()
+        with system.reader() as view:
+            probe = view.system.user_to_product.get(_PROBE_USER)
+            count = len(probe) if probe is not None else 0
+            view.get_recommendations(rng.choice(users), 10)
+            view.search_products("a", "keyword", 10)
+            probe = view.system.user_to_product.get(_PROBE_USER)
+            if (len(probe) if probe is not None else 0) != count:
+                violations.append(f"version {view.version} changed while pinned")
+            version = view.version
+        latencies.append(time.perf_counter() - started)
+        if version < last_version or count < last_count:
+            violations.append(f"went back from version {last_version} to {version}")
+        last_version, last_count = version, count
+        observations.append((started, version, count))
+# Time Complexity: O(r), where r is the number of reads performed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress concurrent reads against batched writes.")
+    parser.add_argument("--interactions", type=int, default=20000, help="number of interactions written")
+    parser.add_argument("--readers", type=int, default=8, help="number of reader threads")
+    parser.add_argument("--publish-every", type=int, default=500, help="writes per published batch")
+    parser.add_argument("--probe-every", type=int, default=10, help="one in this many writes is a probe write")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    workload = Workload(args.interactions, seed=args.seed)
+    system = ConcurrentRecommendationSystem(publish_every=args.publish_every)
+    for product in workload.generate_products():
+        system.add_product(*product)
+    system.publish()
+    users = workload.sample_users(1000)
+
+    stop = threading.Event()
+    published = {system.version: (0, time.perf_counter())}
+    observations, latencies, violations = [], [], []
+    threads = [threading.Thread(target=reader, args=(system, users, stop, observations, latencies, violations))
+               for _ in range(args.readers)]
+    threads.append(threading.Thread(target=writer, args=(system, workload, args.probe_every, published, stop)))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    for read_started, version, count in observations:
+        expected = published.get(version)
+        if expected is None:
+            violations.append(f"observed unpublished version {version}")
+        elif count != expected[0]:
+            violations.append(f"version {version} showed {count} probe writes instead of {expected[0]}")
+        newer = [newer_version for newer_version, (_, visible_at) in published.items() if visible_at < read_started and newer_version > version]
+        if newer:
+            violations.append(f"read started after version {max(newer)} was published but saw version {version}")
+
+    ordered = sorted(latencies)
+    print(f"{len(observations)} reads across {args.readers} readers, {args.interactions} writes in {len(published) - 1} batches, {elapsed:.2f}s")
+    print(f"read latency p50 {percentile(ordered, 0.50) * 1e3:.2f}ms  p99 {percentile(ordered, 0.99) * 1e3:.2f}ms  max {ordered[-1] * 1e3 if ordered else 0:.2f}ms")
+    for violation in violations[:20]:
+        print(f"VIOLATION {violation}")
+    print("linearizable" if not violations else f"{len(violations)} violations")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # The modules live at the repository root
+
+from HashMap import HashMap  # noqa: E402
+from MaxHeap import MaxHeap  # noqa: E402
+from RecomendationSystem import RecommendationSystem  # noqa: E402
+from Trie import Trie  # noqa: E402
+
+from benchmarks.workload import Workload  # noqa: E402
+
+
+def percentile(sorted_values, fraction):
+    """
+    Returns a percentile of already sorted values (nearest-rank method).
+
+    :param sorted_values: A sorted list of numbers.
+    :param fraction: The percentile as a fraction, e.g. 0.95.
+    :return: The percentile value, or 0 for an empty list.
+    """
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+# Time Complexity: O(1)
+
+
+class Recorder:
+    def __init__(self):
+        """
+        Collects per-call latencies for named operations.
+        """
+        self.latencies = {}  # Maps operation names to lists of latencies in seconds
+        self.throughput = {}  # Maps bulk operation names to their throughput reports
+    # Time Complexity: O(1) for initialization
+
+    def measure(self, name, function, *args, **kwargs):
+        """
+        Calls a function and records how long it took.
+
+        :param name: The operation name.
+        :param function: The function to call.
+        :return: The function's result.
+        """
+        started = time.perf_counter()
+        result = function(*args, **kwargs)
+        self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+        return result
+    # Time Complexity: O(1) overhead per call
+
+    def summary(self):
+        """
+        Summarizes the recorded operations.
+
+        :return: A dictionary mapping operation names to count, ops_per_second and p50/p95/p99 latency in microseconds.
+        """
+        results = {}
+        for name, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            total = sum(ordered)
+            results[name] = {
+                "count": len(ordered),
+                "ops_per_second": len(ordered) / total if total > 0 else float("inf"),
+                "p50_us": percentile(ordered, 0.50) * 1e6,
+                "p95_us": percentile(ordered, 0.95) * 1e6,
+                "p99_us": percentile(ordered, 0.99) * 1e6,
+            }
+        for name, report in self.throughput.items():
+            results[name] = {"count": report["count"], "ops_per_second": report["per_second"]}
+        return results
+    # Time Complexity: O(n log n), where n is the number of recorded calls
+
+
+def bench_system(recorder, workload, samples, options):
+    """
+    Builds a RecommendationSystem from the workload and measures its public operations.
+
+    :param recorder: The Recorder to record into.
+    :param workload: The Workload to replay.
+    :param samples: The number of queries per query operation.
+    :param options: Constructor options for the RecommendationSystem.
+    :return: The built system.
+    """
+    system = RecommendationSystem(**options)
+    products = []
+    for product in workload.generate_products():
+        recorder.measure("add_product", system.add_product, *product)
+        products.append(product)
+    for interaction in workload.generate_interactions():
+        recorder.measure("add_interaction", system.add_interaction, *interaction)
+
+    rng = random.Random(workload.seed + 4)
+    strategies = ["user", "item"] if options.get("item_index") else ["user"]
+    for user_id in workload.sample_users(samples):
+        for strategy in strategies:
+            recorder.measure(f"get_recommendations[{strategy}]", system.get_recommendations, user_id, 10, strategy=strategy)
+    for _ in range(samples):
+        _, name, category = rng.choice(products)
+        recorder.measure("search_products[name]", system.search_products, name[:rng.randint(1, 4)], "name", 10, "popularity")
+        recorder.measure("search_products[category]", system.search_products, category, "category", 10)
+        recorder.measure("search_products[keyword]", system.search_products, rng.choice(name.split()), "keyword", 10)
+    return system
+# Time Complexity: O(p + n + s * q), where q is the cost of one query
+
+
+def bench_primitives(recorder, workload, samples):
+    """
+    Measures the HashMap, Trie and MaxHeap primitives on their own.
+
+    :param recorder: The Recorder to record into.
+    :param workload: The Workload providing keys and names.
+    :param samples: The number of operations per primitive.
+    """
+    rng = random.Random(workload.seed + 5)
+    hash_map = HashMap()
+    keys = [f"key{index}" for index in range(samples)]
+    for key in keys:
+        recorder.measure("HashMap.insert", hash_map.insert, key, key)
+    for _ in range(samples):
+        recorder.measure("HashMap.get", hash_map.get, rng.choice(keys))
+
+    trie = Trie()
+    names = [name for _, name, _ in workload.generate_products()][:samples]
+    for index, name in enumerate(names):
+        recorder.measure("Trie.insert", trie.insert, name, index)
+    for _ in range(samples):
+        recorder.measure("Trie.search", trie.search, rng.choice(names)[:rng.randint(1, 4)], 10)
+
+    heap = MaxHeap()
+    for _ in range(samples):
+        recorder.measure("MaxHeap.push", heap.push, (rng.random(), rng.randrange(samples)))
+    for _ in range(samples):
+        recorder.measure("MaxHeap.pop", heap.pop)
+    items = [(rng.random(), index) for index in range(samples)]
+    for _ in range(max(1, samples // 100)):
+        recorder.measure("MaxHeap.top_k", MaxHeap.top_k, items, 10)
+# Time Complexity: O(s log s), where s is the number of samples
+
+
+def bench_bulk(recorder, workload, options):
+    """
+    Rebuilds the system through the bulk ingestion API and records its throughput.
+
+    :param recorder: The Recorder to record into.
+    :param workload: The Workload to replay.
+    :param options: Constructor options for the RecommendationSystem.
+    """
+    system = RecommendationSystem(**options)
+    recorder.throughput["add_products_bulk"] = system.add_products_bulk(workload.generate_products())
+    recorder.throughput["add_interactions_bulk"] = system.add_interactions_bulk(workload.generate_interactions())
+# Time Complexity: O(p + n), where p is the number of products and n the number of interactions
+
+
+def measure_memory(workload, options):
+    """
+    Rebuilds the system with bulk ingestion under tracemalloc and reports the traced memory.
+
+    Tracing slows allocation down a lot, so this runs separately from the timed passes.
+
+    :param workload: The Workload to replay.
+    :param options: Constructor options for the RecommendationSystem.
+    :return: A dictionary with the peak and the retained memory in bytes, and the interaction store's bytes per pair.
+    """
+    tracemalloc.start()
+    system = RecommendationSystem(**options)
+    system.add_products_bulk(workload.generate_products())
+    system.add_interactions_bulk(workload.generate_interactions())
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"retained_bytes": current, "peak_bytes": peak,
+            "bytes_per_interaction": current / workload.interactions if workload.interactions else 0,
+            "store_bytes_per_pair": system.interaction_memory()["bytes_per_interaction"]}
+# Time Complexity: O(p + n)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Flags operations that got slower than a stored baseline.
+
+    :param results: The current results document.
+    :param baseline: The baseline results document.
+    :param tolerance: The allowed relative slowdown, e.g. 0.2 for 20%.
+    :return: A list of human-readable regression descriptions.
+    """
+    regressions = []
+    for name, current in results["operations"].items():
+        previous = baseline.get("operations", {}).get(name)
+        if previous is None:
+            continue
+        if "p50_us" in current and "p50_us" in previous and current["p50_us"] > previous["p50_us"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {current['p50_us']:.1f}us vs {previous['p50_us']:.1f}us")
+        elif current["ops_per_second"] < previous["ops_per_second"] / (1 + tolerance):
+            regressions.append(f"{name}: {current['ops_per_second']:.0f} ops/s vs {previous['ops_per_second']:.0f} ops/s")
+    current_memory = results.get("memory", {}).get("peak_bytes")
+    previous_memory = baseline.get("memory", {}).get("peak_bytes")
+    if current_memory and previous_memory and current_memory > previous_memory * (1 + tolerance):
+        regressions.append(f"peak memory: {current_memory} bytes vs {previous_memory} bytes")
+    return regressions
+# Time Complexity: O(o), where o is the number of operations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the recommendation system on a synthetic workload.")
+    parser.add_argument("--interactions", type=int, default=10000, help="number of interactions (1K to 10M)")
+    parser.add_argument("--users", type=int, help="number of users (default: interactions / 10)")
+    parser.add_argument("--products", type=int, help="number of products (default: interactions / 20)")
+    parser.add_argument("--exponent", type=float, default=1.1, help="Zipf exponent")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--samples", type=int, default=200, help="queries per query operation")
+    parser.add_argument("--item-index", action="store_true", help="also maintain and measure the item strategy")
+    parser.add_argument("--engine", default="python", choices=["python", "numpy"], help="scoring engine")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="compare against this JSON results file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown before flagging")
+    args = parser.parse_args(argv)
+
+    workload = Workload(args.interactions, args.users, args.products, exponent=args.exponent, seed=args.seed)
+    options = {"engine": args.engine, "item_index": args.item_index}
+    recorder = Recorder()
+    bench_system(recorder, workload, args.samples, options)
+    bench_bulk(recorder, workload, options)
+    bench_primitives(recorder, workload, max(args.samples, 1000))
+    memory = {} if args.no_memory else measure_memory(workload, options)
+
+    results = {
+        "meta": {
+            "interactions": workload.interactions, "users": workload.users, "products": workload.products,
+            "categories": workload.categories, "exponent": workload.exponent, "seed": workload.seed,
+            "options": options, "python": platform.python_version(), "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "operations": recorder.summary(),
+        "memory": memory,
+    }
+    for name, stats in results["operations"].items():
+        latency = f"  p50 {stats['p50_us']:9.1f}us  p95 {stats['p95_us']:9.1f}us  p99 {stats['p99_us']:9.1f}us" if "p50_us" in stats else ""
+        print(f"{name:32} {stats['ops_per_second']:12.0f} ops/s{latency}")
+    if memory:
+        print(f"{'peak memory':32} {memory['peak_bytes'] / 2 ** 20:12.1f} MiB  ({memory['bytes_per_interaction']:.0f} bytes/interaction retained, "
+              f"{memory['store_bytes_per_pair']:.0f} bytes/pair in the interaction store)")
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
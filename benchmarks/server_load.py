@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # The modules live at the repository root
+
+from RecomendationSystem import RecommendationSystem  # noqa: E402
+from RecommendationServer import RecommendationServer  # noqa: E402
+
+from benchmarks.harness import percentile  # noqa: E402
+from benchmarks.workload import Workload  # noqa: E402
+
+
+async def client(host, port, requests, pipeline, latencies, failures):
+    """
+    Sends requests over one connection, keeping up to pipeline of them outstanding.
+
+    :param host: The server host.
+    :param port: The server port.
+    :param requests: A list of request dictionaries.
+    :param pipeline: The number of outstanding requests.
+    :param latencies: A list filled with per-request latencies in seconds.
+    :param failures: A list filled with error responses.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    sent_at = {}
+    window = asyncio.Semaphore(pipeline)
+
+    async def receive():
+        for _ in requests:
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent_at.pop(response["id"]))
+            if not response["ok"]:
+                failures.append(response["error"])
+            window.release()
+
+    receiving = asyncio.ensure_future(receive())
+    for request in requests:
+        await window.acquire()
+        sent_at[request["id"]] = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+    await receiving
+    writer.close()
+# Time Complexity: O(r), where r is the number of requests
+
+
+def build_requests(workload, count, write_fraction, rng, prefix):
+    """
+    Builds a mixed request stream: recommendations for Zipf-popular users, searches and interaction writes.
+
+    :param workload: The Workload to draw IDs from.
+    :param count: The number of requests.
+    :param write_fraction: The fraction of add_interaction requests.
+    :param rng: A random.Random instance.
+    :param prefix: A prefix that makes the request IDs unique per client.
+    :return: A list of request dictionaries.
+    """
+    users = workload.sample_users(count)
+    requests = []
+    for index in range(count):
+        roll = rng.random()
+        if roll < write_fraction:
+            request = {"op": "add_interaction", "user_id": users[index], "product_id": workload.product_id(rng.randrange(workload.products)),
+                       "score": rng.randint(1, 5), "interaction_type": "view"}
+        elif roll < write_fraction + 0.1:
+            request = {"op": "search", "query": workload.product_id(rng.randrange(workload.products))[:2], "search_by": "name", "limit": 10}
+        else:
+            request = {"op": "recommend", "user_id": users[index], "k": 10}
+        request["id"] = f"{prefix}-{index}"
+        requests.append(request)
+    return requests
+# Time Complexity: O(n), where n is the number of requests
+
+
+async def run(args):
+    workload = Workload(args.interactions, seed=args.seed)
+    system = RecommendationSystem()
+    system.add_products_bulk(workload.generate_products())
+    system.add_interactions_bulk(workload.generate_interactions())
+    recommendation_server = RecommendationServer(system, args.max_in_flight)
+    server = await recommendation_server.start("127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+
+    rng = random.Random(args.seed)
+    latencies, failures = [], []
+    streams = [build_requests(workload, args.requests // args.clients, args.write_fraction, rng, f"c{index}") for index in range(args.clients)]
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, stream, args.pipeline, latencies, failures) for stream in streams))
+    elapsed = time.perf_counter() - started
+    server.close()
+    await server.wait_closed()
+
+    ordered = sorted(latencies)
+    print(f"{len(ordered)} requests from {args.clients} clients in {elapsed:.2f}s ({len(ordered) / elapsed:.0f} req/s)")
+    print(f"latency p50 {percentile(ordered, 0.50) * 1e3:.2f}ms  p95 {percentile(ordered, 0.95) * 1e3:.2f}ms  p99 {percentile(ordered, 0.99) * 1e3:.2f}ms")
+    print(f"coalesced {recommendation_server.coalesced}  errors {recommendation_server.errors}")
+    for failure in failures[:5]:
+        print(f"ERROR {failure}")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the JSON-lines recommendation server on one box.")
+    parser.add_argument("--interactions", type=int, default=20000, help="number of interactions preloaded")
+    parser.add_argument("--requests", type=int, default=5000, help="total number of requests")
+    parser.add_argument("--clients", type=int, default=16, help="number of concurrent connections")
+    parser.add_argument("--pipeline", type=int, default=8, help="outstanding requests per connection")
+    parser.add_argument("--write-fraction", type=float, default=0.1, help="fraction of add_interaction requests")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="server-side in-flight limit")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    return asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import random
+import time
+from bisect import bisect_left
+from itertools import accumulate
+
+_SYLLABLES = ["ka", "lo", "mi", "ne", "ro", "su", "ta", "vi", "po", "de", "ga", "zu", "be", "fi", "ha", "ji"]
+_INTERACTION_TYPES = ["view", "like", "purchase"]
+_INTERACTION_WEIGHTS = [0.80, 0.15, 0.05]
+
+
+class ZipfSampler:
+    def __init__(self, n, exponent, rng):
+        """
+        Initializes a sampler that draws ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** exponent.
+
+        :param n: The number of ranks.
+        :param exponent: The Zipf exponent (larger means more skewed).
+        :param rng: The random.Random instance to draw from.
+        """
+        self.cumulative = list(accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+        self.total = self.cumulative[-1]
+        self.rng = rng
+    # Time Complexity: O(n)
+
+    def sample(self):
+        """
+        Draws one rank.
+
+        :return: A rank in 0..n-1.
+        """
+        return bisect_left(self.cumulative, self.rng.random() * self.total)
+    # Time Complexity: O(log n)
+
+
+class Workload:
+    def __init__(self, interactions, users=None, products=None, categories=None, exponent=1.1, seed=0, span_days=90):
+        """
+        Describes a seeded synthetic workload; products and interactions are generated lazily.
+
+        Users, products, categories and name words are all drawn from Zipf distributions, so a few hot
+        items dominate as in real traffic. The defaults scale with the number of interactions, so the same
+        generator covers 1K to 10M interactions.
+
+        :param interactions: The number of interactions to generate.
+        :param users: The number of users (defaults to interactions / 10).
+        :param products: The number of products (defaults to interactions / 20).
+        :param categories: The number of categories (defaults to the square root of the product count).
+        :param exponent: The Zipf exponent used for every distribution.
+        :param seed: The random seed; the same seed always yields the same workload.
+        :param span_days: The interaction timestamps are spread over this many days, ending now.
+        """
+        self.interactions = interactions
+        self.users = users or max(1, interactions // 10)
+        self.products = products or max(1, interactions // 20)
+        self.categories = categories or max(1, int(self.products ** 0.5))
+        self.exponent = exponent
+        self.seed = seed
+        self.span_days = span_days
+        self.end_time = time.time()
+        self.vocabulary = self._vocabulary(max(16, self.products // 4))
+    # Time Complexity: O(v), where v is the vocabulary size
+
+    def _vocabulary(self, size):
+        """
+        Builds a deterministic vocabulary of pronounceable words.
+
+        :param size: The number of words.
+        :return: A list of distinct words.
+        """
+        rng = random.Random(self.seed)
+        words = set()
+        while len(words) < size:
+            words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+        return sorted(words)
+    # Time Complexity: O(v), where v is the vocabulary size
+
+    def product_id(self, rank):
+        return f"p{rank}"
+
+    def user_id(self, rank):
+        return f"u{rank}"
+
+    def generate_products(self):
+        """
+        Generates the catalog.
+
+        :return: A generator of (product_id, product_name, category) tuples.
+        """
+        rng = random.Random(self.seed + 1)
+        words = ZipfSampler(len(self.vocabulary), self.exponent, rng)
+        categories = ZipfSampler(self.categories, self.exponent, rng)
+        for rank in range(self.products):
+            name = " ".join(self.vocabulary[words.sample()] for _ in range(rng.randint(1, 3)))
+            yield self.product_id(rank), name, f"category{categories.sample()}"
+    # Time Complexity: O(p log v), where p is the number of products
+
+    def generate_interactions(self):
+        """
+        Generates the interaction stream in timestamp order.
+
+        :return: A generator of (user_id, product_id, score, interaction_type, timestamp) tuples.
+        """
+        rng = random.Random(self.seed + 2)
+        users = ZipfSampler(self.users, self.exponent, rng)
+        products = ZipfSampler(self.products, self.exponent, rng)
+        start = self.end_time - self.span_days * 24 * 60 * 60
+        step = (self.end_time - start) / max(1, self.interactions)
+        for index in range(self.interactions):
+            interaction_type = rng.choices(_INTERACTION_TYPES, _INTERACTION_WEIGHTS)[0]
+            yield (self.user_id(users.sample()), self.product_id(products.sample()), rng.randint(1, 5),
+                   interaction_type, start + index * step)
+    # Time Complexity: O(n log (u + p)), where n is the number of interactions
+
+    def sample_users(self, count):
+        """
+        Draws active users the way requests would arrive (Zipf-weighted).
+
+        :param count: The number of users to draw.
+        :return: A list of user IDs.
+        """
+        rng = random.Random(self.seed + 3)
+        users = ZipfSampler(self.users, self.exponent, rng)
+        return [self.user_id(users.sample()) for _ in range(count)]
+    # Time Complexity: O(u + c log u)
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from ConcurrentRecommendationSystem import ConcurrentRecommendationSystem
+
+NOW = time.time()
+
+
+def recommended(view, user_id="u1"):
+    return [product_id for product_id, _ in view.get_recommendations(user_id, 5)]
+
+
+def seed(system):
+    system.add_interaction("u1", "p1", 3, "view", NOW)
+    system.add_interaction("u2", "p1", 3, "view", NOW)
+    system.add_interaction("u2", "p2", 3, "view", NOW)
+
+
+def test_writes_become_visible_when_published():
+    system = ConcurrentRecommendationSystem(publish_every=100)
+    seed(system)
+    assert recommended(system) == [] and system.version == 0
+    assert system.publish() == 1
+    assert recommended(system) == ["p2"]
+    assert system.publish() == 1  # Nothing buffered: no new version
+    system.add_product("p3", "desk lamp", "home")
+    assert system.search_products("desk") == []
+    system.publish()
+    assert system.search_products("desk") == [("p3", "desk lamp")]
+
+
+def test_publish_every_triggers_a_publish():
+    system = ConcurrentRecommendationSystem(publish_every=3)
+    seed(system)
+    assert system.version == 1 and recommended(system) == ["p2"]
+
+
+def test_pinned_reader_keeps_its_version_and_the_replicas_converge():
+    system = ConcurrentRecommendationSystem(publish_every=100)
+    seed(system)
+    system.publish()
+    with system.reader() as pinned:
+        system.add_interaction("u2", "p3", 5, "view", NOW)
+        system.publish()
+        assert recommended(pinned) == ["p2"] and pinned.version == 1  # Unchanged while it is open
+        assert recommended(system) == ["p3", "p2"] and system.version == 2
+        assert system._lagging is not None  # The pinned replica still misses the batch
+    system.add_interaction("u3", "p4", 1, "view", NOW)
+    system.publish()
+    first, second = system._replicas
+    assert system._versions == [3, 3] and system._lagging is None
+    assert list(first.interactions.users) == list(second.interactions.users)
+    assert list(first.interactions.decayed) == list(second.interactions.decayed)
+
+
+def test_writer_waits_for_readers_of_the_replica_it_updates():
+    system = ConcurrentRecommendationSystem(publish_every=100)
+    seed(system)
+    system.publish()
+    pinned = system.reader()
+    system.add_interaction("u2", "p3", 5, "view", NOW)
+    system.publish()  # Leaves the batch lagging behind the pinned replica
+    system.add_interaction("u2", "p4", 5, "view", NOW)
+    publisher = threading.Thread(target=system.publish)
+    publisher.start()
+    publisher.join(0.2)
+    assert publisher.is_alive()  # Blocked until the pinned reader leaves
+    assert recommended(pinned) == ["p2"]
+    pinned.close()
+    publisher.join(5)
+    assert not publisher.is_alive()
+    assert recommended(system) == ["p3", "p4", "p2"]
+
+
+def test_rejects_invalid_options():
+    with pytest.raises(ValueError):
+        ConcurrentRecommendationSystem(publish_every=0)
+    with pytest.raises(ValueError):
+        ConcurrentRecommendationSystem(cache_size=10)
+
+
+@pytest.mark.parametrize("write", [("u3", "p1", "3", "view", NOW), ("u3", ["p1"], 3, "view", NOW), ("u3", "p1", 3, "view", "now"),
+                                   ("u3", "p1", 3, "view", float("nan")), ("u3", "p1", 3, "view", float("inf"))])
+def test_invalid_write_is_rejected_before_it_can_fail_a_publish(write):
+    system = ConcurrentRecommendationSystem(publish_every=100)
+    seed(system)
+    system.add_interaction("u3", "p2", 1, "view", NOW)
+    with pytest.raises((TypeError, ValueError)):
+        system.add_interaction(*write)  # Would raise halfway through applying the batch to one replica
+    with pytest.raises(TypeError):
+        system.add_product("p5", None, "home")
+    assert len(system._pending_interactions) == 4  # The valid writes are kept
+    assert system.publish() == 1
+    first, second = system._replicas
+    assert system._versions == [1, 1]
+    assert list(first.interactions.users) == list(second.interactions.users)
+    assert list(first.interactions.decayed) == list(second.interactions.decayed)
+    assert recommended(system, "u3") == ["p1"]
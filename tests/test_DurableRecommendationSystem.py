@@ -0,0 +1,85 @@
+import os
+import time
+
+from DurableRecommendationSystem import DurableRecommendationSystem, _base_name
+
+NOW = time.time()
+
+
+def fill(system, users=range(3)):
+    system.add_product("p1", "desk lamp", "home")
+    system.add_product("p2", "oak desk", "home")
+    for user in users:
+        system.add_interaction(f"u{user}", "p1", 2, "view", NOW)
+        system.add_interaction(f"u{user}", f"p{2 + user % 2}", 3, "view", NOW)
+
+
+def state(system):
+    store = system.system.interactions
+    return [(store.user_ids[user], store.product_ids[product], score)
+            for user, product, score in zip(store.users, store.products, store.scores)]
+
+
+def test_reopening_replays_the_log(tmp_path):
+    with DurableRecommendationSystem(tmp_path, background=False) as system:
+        fill(system)
+        system.add_interactions_bulk([("u9", "p2", 1, "view")])  # Stamped when logged
+        expected = state(system)
+        recommendations = [product_id for product_id, _ in system.get_recommendations("u0", 3)]
+    with DurableRecommendationSystem(tmp_path, background=False) as system:
+        assert system.recovered == 9
+        assert state(system) == expected
+        assert [product_id for product_id, _ in system.get_recommendations("u0", 3)] == recommendations
+        assert system.search_products("desk") == [("p1", "desk lamp")]
+
+
+def test_uncommitted_group_is_lost_but_commit_makes_it_durable(tmp_path):
+    system = DurableRecommendationSystem(tmp_path, group_size=100, commit_interval=60, background=False)
+    system.add_interaction("u1", "p1", 1, "view", NOW)
+    system.commit()
+    system.add_interaction("u2", "p1", 1, "view", NOW)  # Never committed: the process "crashes" here
+    with DurableRecommendationSystem(tmp_path, background=False) as recovered:
+        assert state(recovered) == [("u1", "p1", 1.0)]
+    system.log._file.close()
+
+
+def test_compaction_folds_segments_into_a_base(tmp_path):
+    with DurableRecommendationSystem(tmp_path, background=False) as system:
+        fill(system)
+        stop = system.compact(rotate=True)
+        assert stop is not None and system.compact() is None  # Nothing left to fold
+        assert sorted(os.listdir(tmp_path)) == [f"{stop:020d}.wal", _base_name(stop)]
+        fill(system, users=range(3, 5))
+        expected = state(system)
+        second = system.compact(rotate=True)
+        assert os.listdir(tmp_path).count(_base_name(stop)) == 0  # The previous base is superseded
+    with DurableRecommendationSystem(tmp_path, background=False) as system:
+        assert system.recovered == 0
+        assert sorted(state(system)) == sorted(expected)
+        assert system._base == second
+
+
+def test_leftovers_of_an_interrupted_compaction_are_cleaned_up(tmp_path):
+    with DurableRecommendationSystem(tmp_path, background=False) as system:
+        fill(system)
+        stop = system.compact(rotate=True)
+        system.add_interaction("u7", "p2", 4, "view", NOW)
+        expected = state(system)
+    (tmp_path / "base-00000000000000000001.snap").write_bytes(b"older base")
+    (tmp_path / (_base_name(stop + 5) + ".tmp")).write_bytes(b"never renamed")
+    with DurableRecommendationSystem(tmp_path, background=False) as system:
+        assert state(system) == expected
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith("base-")) == [_base_name(stop)]
+
+
+def test_background_thread_compacts_closed_segments(tmp_path):
+    with DurableRecommendationSystem(tmp_path, group_size=1, segment_bytes=200, compact_segments=2,
+                                     commit_interval=0.01) as system:
+        fill(system, users=range(20))
+        deadline = time.time() + 5
+        while system._base == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert system._base > 0 and system.background_error is None
+        expected = state(system)
+    with DurableRecommendationSystem(tmp_path, background=False) as system:
+        assert state(system) == expected
@@ -0,0 +1,76 @@
+import pytest
+
+from HashMap import HashMap
+
+
+class Collider:
+    def __init__(self, name):
+        self.name = name
+
+    def __hash__(self):
+        return 42  # Every key probes the same sequence
+
+    def __eq__(self, other):
+        return isinstance(other, Collider) and other.name == self.name
+
+
+def test_grows_past_the_load_factor_and_keeps_every_entry():
+    hash_map = HashMap()
+    for index in range(1000):
+        hash_map.insert(f"k{index}", index)
+        assert len(hash_map._keys) <= hash_map.size * hash_map.load_factor
+    assert len(hash_map) == 1000
+    assert hash_map.size >= 1000 / hash_map.load_factor
+    assert all(hash_map.get(f"k{index}") == index for index in range(1000))
+    assert hash_map.get("missing", "default") == "default"
+
+
+def test_update_remove_and_insertion_order():
+    hash_map = HashMap()
+    for key in "abcde":
+        hash_map.insert(key, key.upper())
+    hash_map.insert("b", "B2")
+    hash_map.remove("c")
+    hash_map.remove("missing")
+    assert list(hash_map.keys()) == ["a", "b", "d", "e"]
+    assert list(hash_map.values()) == ["A", "B2", "D", "E"]
+    assert list(reversed(hash_map)) == ["e", "d", "b", "a"]
+    assert "c" not in hash_map and hash_map.contains("d")
+    assert len(hash_map) == 4
+
+
+def test_tombstones_are_reused_and_dropped_on_resize():
+    hash_map = HashMap()
+    for round_number in range(200):
+        hash_map.insert(round_number, round_number)
+        hash_map.remove(round_number)  # Churn leaves a tombstone behind every time
+    assert len(hash_map) == 0
+    assert hash_map.size == 8  # Resizing compacts the tombstones instead of growing
+    hash_map.insert("kept", 1)
+    assert list(hash_map.items()) == [("kept", 1)]
+
+
+def test_colliding_keys_probe_past_each_other():
+    hash_map = HashMap()
+    keys = [Collider(str(index)) for index in range(20)]
+    for index, key in enumerate(keys):
+        hash_map.insert(key, index)
+    hash_map.remove(keys[3])
+    assert hash_map.get(Collider("3")) is None
+    assert [hash_map.get(Collider(str(index))) for index in range(4, 20)] == list(range(4, 20))
+    hash_map.insert(Collider("3"), "again")
+    assert hash_map.get(keys[3]) == "again"
+
+
+def test_iteration_tolerates_mutation():
+    hash_map = HashMap()
+    for index in range(10):
+        hash_map.insert(index, index)
+    for key in hash_map.keys():
+        hash_map.insert(key + 100, key)  # The iterators walk a copy of the dense arrays
+    assert len(hash_map) == 20
+
+
+def test_rejects_invalid_load_factor():
+    with pytest.raises(ValueError):
+        HashMap(load_factor=1)
@@ -0,0 +1,46 @@
+import json
+import time
+
+import pytest
+
+from Ingest import read_interactions_csv, read_interactions_jsonl, read_products_csv, read_products_jsonl
+from RecomendationSystem import RecommendationSystem
+
+NOW = time.time()
+
+
+def test_csv_readers(tmp_path):
+    products = tmp_path / "products.csv"
+    products.write_text("product_id,product_name,category\np1,gaming laptop,electronics\np2,\"desk, oak\",furniture\n")
+    interactions = tmp_path / "interactions.csv"
+    interactions.write_text("user_id,product_id,score,interaction_type,timestamp\nu1,p1,4,view,100.5\nu2,p2,2.5,cart,\n")
+    assert list(read_products_csv(products)) == [("p1", "gaming laptop", "electronics"), ("p2", "desk, oak", "furniture")]
+    assert list(read_interactions_csv(interactions)) == [("u1", "p1", 4.0, "view", 100.5), ("u2", "p2", 2.5, "cart", None)]
+
+
+def test_jsonl_readers_skip_blank_lines(tmp_path):
+    products = tmp_path / "products.jsonl"
+    products.write_text(json.dumps({"product_id": "p1", "product_name": "lamp", "category": "home"}) + "\n\n")
+    interactions = tmp_path / "interactions.jsonl"
+    interactions.write_text(json.dumps({"user_id": "u1", "product_id": "p1", "score": 3, "interaction_type": "view"}) + "\n")
+    assert list(read_products_jsonl(products)) == [("p1", "lamp", "home")]
+    assert list(read_interactions_jsonl(interactions)) == [("u1", "p1", 3, "view", None)]
+
+
+def test_bulk_apis_stream_in_batches():
+    system = RecommendationSystem()
+    reports = []
+    products = ((f"p{index}", f"product {index}", "even" if index % 2 == 0 else "odd") for index in range(25))
+    report = system.add_products_bulk(products, batch_size=10, on_batch=reports.append)
+    assert report["count"] == 25 and [entry["count"] for entry in reports] == [10, 20, 25]
+    assert sorted(system.search_products("product 1")) == sorted(
+        [("p1", "product 1")] + [(f"p{index}", f"product {index}") for index in range(10, 20)])
+    assert len(system.category_to_products.get("even")) == 13
+
+    interactions = ((f"u{index % 4}", f"p{index}", 1 + index % 3, "view", NOW) for index in range(25))
+    assert system.add_interactions_bulk(interactions, batch_size=7)["count"] == 25
+    assert len(system.interactions.users) == 25
+    assert system.add_interactions_bulk([("u9", "p1", 1, "view")])["count"] == 1  # No timestamp: stamped now
+    assert system.interactions.timestamps[-1] >= NOW
+    with pytest.raises(ValueError):
+        system.add_interactions_bulk([], batch_size=0)
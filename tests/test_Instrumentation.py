@@ -0,0 +1,85 @@
+import pickle
+import sys
+import threading
+
+from Instrumentation import Instrumentation, _bucket, _histogram_percentile
+
+
+def test_buckets_and_percentiles():
+    assert _bucket(0.5e-6) == 0
+    assert _bucket(1e-6) == 1
+    assert _bucket(3e-6) == 2
+    histogram = {1: 50, 4: 45, 10: 5}
+    assert _histogram_percentile(histogram, 100, 0.50) == 2e-6
+    assert _histogram_percentile(histogram, 100, 0.95) == 16e-6
+    assert _histogram_percentile(histogram, 100, 0.99) == 1024e-6
+
+
+def test_stages_counters_and_hook():
+    records = []
+    instrumentation = Instrumentation(hook=lambda operation, record: records.append((operation, record)))
+    for _ in range(3):
+        trace = instrumentation.start("op")
+        trace.mark("first")
+        trace.count("items", 2)
+        trace.mark("second")
+        instrumentation.finish(trace)
+    stats = instrumentation.stats()["op"]
+    assert stats["calls"] == 3
+    assert stats["counters"] == {"items": 6}
+    assert set(stats["stages"]) == {"first", "second"}
+    assert sum(stats["histogram"].values()) == 3
+    assert [operation for operation, _ in records] == ["op"] * 3
+    instrumentation.reset()
+    assert instrumentation.stats() == {}
+
+
+def test_concurrent_finish_and_stats():
+    instrumentation = Instrumentation()
+    threads_count, calls = 8, 2000
+    stop = threading.Event()
+    errors = []
+
+    def work(thread):
+        for _ in range(calls):
+            trace = instrumentation.start(f"op{thread % 2}")
+            trace.mark(f"stage{thread}")
+            trace.count("items")
+            instrumentation.finish(trace)
+
+    def read():
+        while not stop.is_set():
+            try:
+                instrumentation.stats()  # Must not fail while other threads add operations and stages
+            except RuntimeError as error:
+                errors.append(error)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often, so unguarded updates would collide
+    try:
+        reader = threading.Thread(target=read)
+        reader.start()
+        workers = [threading.Thread(target=work, args=(thread,)) for thread in range(threads_count)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        stop.set()
+        reader.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+    stats = instrumentation.stats()
+    assert sum(operation["calls"] for operation in stats.values()) == threads_count * calls
+    assert sum(operation["counters"]["items"] for operation in stats.values()) == threads_count * calls
+
+
+def test_pickling_drops_and_rebuilds_the_lock():
+    instrumentation = Instrumentation()
+    trace = instrumentation.start("op")
+    trace.count("items")
+    instrumentation.finish(trace)
+    copy = pickle.loads(pickle.dumps(instrumentation))
+    assert copy.stats()["op"]["counters"] == {"items": 1}
+    copy.finish(copy.start("op"))  # The rebuilt lock works
+    assert copy.stats()["op"]["calls"] == 2 and instrumentation.stats()["op"]["calls"] == 1
@@ -0,0 +1,67 @@
+import pytest
+
+from InteractionStore import _LOOKUP_THRESHOLD, InteractionStore
+
+
+def test_pairs_accumulate_onto_one_row():
+    store = InteractionStore()
+    assert store.add("u1", "p1", 2, "view", 10.0, 2.0) == (0, None)
+    assert store.add("u1", "p2", 1, "view", 11.0, 1.0) == (1, None)
+    assert store.add("u1", "p1", 3, "purchase", 5.0, 3.0) == (0, 2.0)
+    assert len(store) == 2
+    assert store.details(0) == (5.0, "purchase", 10.0, 5.0)  # Latest type, but the latest timestamp is kept
+    assert store.type_names == ["view", "purchase"] and store.user_ids == ["u1"]
+
+
+def test_views_have_the_hash_map_interface_in_both_directions():
+    store = InteractionStore()
+    for user_id, product_id in (("u1", "p1"), ("u2", "p1"), ("u1", "p2")):
+        store.add(user_id, product_id, 1, "view", 0.0, 1.0)
+    assert list(store.by_user.keys()) == ["u1", "u2"]
+    assert list(store.by_user.get("u1").keys()) == ["p1", "p2"]
+    assert list(reversed(store.by_product.get("p1"))) == ["u2", "u1"]
+    assert store.by_user.get("u1").get("p2") == (1.0, "view", 0.0, 1.0)
+    assert store.by_user.get("u1").get("p3", "none") == "none"
+    assert "p1" in store.by_user.get("u2") and not store.by_product.get("p2").contains("u2")
+    assert store.by_user.get("missing") is None and not store.by_user.contains("missing")
+    assert len(store.by_product) == 2 and len(store.by_product.get("p1")) == 2
+    assert list(store.rows_of_user("missing")) == [] and list(store.rows_of_product("p1")) == [0, 1]
+
+
+def test_heavy_users_get_a_lookup_that_matches_the_scan():
+    store = InteractionStore()
+    for index in range(_LOOKUP_THRESHOLD + 5):
+        store.add("heavy", f"p{index}", 1, "view", 0.0, 1.0)
+    user_code = store.user_codes["heavy"]
+    assert user_code in store.user_lookup
+    for index in range(_LOOKUP_THRESHOLD + 5):
+        assert store.find(user_code, store.product_codes[f"p{index}"]) == index
+    store.add("heavy", "p3", 1, "view", 0.0, 1.0)
+    assert len(store) == _LOOKUP_THRESHOLD + 5 and store.scores[3] == 2
+
+
+def test_load_columns_rebuilds_rows_and_lookups():
+    source = InteractionStore()
+    for index in range(_LOOKUP_THRESHOLD + 3):
+        source.add(f"u{index % 2}", f"p{index}", index, "view" if index % 3 else "like", float(index), index / 2)
+    copy = InteractionStore()
+    copy.load_columns(source.user_ids, source.product_ids, source.type_names, source.users, source.products,
+                      source.scores, source.types, source.timestamps, source.decayed)
+    def listing(store):
+        return [(key, list(rows.items())) for key, rows in store.by_user.items()]
+
+    assert listing(copy) == listing(source)
+    assert copy.user_rows == source.user_rows and copy.product_rows == source.product_rows
+    assert copy.user_lookup == source.user_lookup
+    with pytest.raises(ValueError):
+        copy.load_columns([], [], [], [], [], [], [], [], [])
+
+
+def test_rescale_and_memory_accounting():
+    store = InteractionStore()
+    assert store.bytes_per_interaction() == 0
+    store.add("u1", "p1", 2, "view", 0.0, 4.0)
+    view = store.by_user.get("u1")
+    store.rescale(0.5)
+    assert view.get("p1")[3] == 2.0  # Views read through the store, so they see the new column
+    assert store.nbytes() > 0 and store.bytes_per_interaction() == store.nbytes()
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from ItemIndex import ItemIndex
+from RecomendationSystem import RecommendationSystem
+
+NOW = time.time()
+
+
+def test_pairs_are_counted_once_per_user_in_both_directions():
+    system = RecommendationSystem(item_index=True)
+    system.add_interaction("u1", "p1", 2, "view", NOW)
+    system.add_interaction("u1", "p2", 4, "view", NOW)
+    system.add_interaction("u2", "p1", 1, "view", NOW)
+    system.add_interaction("u2", "p2", 3, "view", NOW)
+    index = system.item_index
+    assert dict(index.neighbors_of("p1")) == {"p2": [2, 5.0]}  # (2 + 4) / 2 + (1 + 3) / 2
+    assert dict(index.neighbors_of("p2")) == {"p1": [2, 5.0]}
+    assert index.similarity("p1", "p2") == 2.5
+    assert index.similarity("p1", "p3") == 0
+    assert list(index.neighbors_of("missing")) == []
+
+
+def test_repeated_interaction_moves_only_the_score():
+    system = RecommendationSystem(item_index=True)
+    system.add_interaction("u1", "p1", 2, "view", NOW)
+    system.add_interaction("u1", "p2", 4, "view", NOW)
+    system.add_interaction("u1", "p1", 2, "purchase", NOW)  # The stored score of (u1, p1) becomes 4
+    assert dict(system.item_index.neighbors_of("p1")) == {"p2": [1, 4.0]}
+    assert system.item_index.similarity("p2", "p1") == 4.0
+
+
+def test_pruning_keeps_the_strongest_neighbors():
+    index = ItemIndex(max_neighbors=2)
+    user_products = {}
+    for number in range(5):
+        user_products[f"q{number}"] = (number + 1,)
+        index.add(user_products, f"q{number}", number + 1)
+    # q0 now has 2 * max_neighbors neighbors; a fifth one prunes it back to the strongest two
+    assert len(dict(index.neighbors_of("q0"))) == 4
+    user_products["q5"] = (10,)
+    index.add(user_products, "q5", 10)
+    assert set(dict(index.neighbors_of("q0"))) == {"q5", "q4"}
+
+
+def test_item_strategy_ranks_co_occurring_products():
+    system = RecommendationSystem(item_index=True)
+    for user_id, product_ids in (("u1", ["p1", "p2"]), ("u2", ["p1", "p2"]), ("u3", ["p1", "p3"]), ("u4", ["p1"])):
+        for product_id in product_ids:
+            system.add_interaction(user_id, product_id, 3, "view", NOW)
+    assert [product_id for product_id, _ in system.get_recommendations("u4", 5, strategy="item")] == ["p2", "p3"]
+    with pytest.raises(ValueError):
+        RecommendationSystem().get_recommendations("u1", 5, strategy="item")
+    with pytest.raises(ValueError):
+        ItemIndex(max_neighbors=0)
@@ -0,0 +1,44 @@
+import random
+
+from MaxHeap import MaxHeap
+
+
+def reference(items, k):
+    return sorted(items, key=lambda item: (-item[0], item[1]))[:k]
+
+
+def test_top_k_matches_a_full_sort_with_ties():
+    generator = random.Random(7)
+    items = [(generator.randint(0, 5), f"p{index:03d}") for index in range(300)]  # Many equal scores
+    for k in (0, 1, 5, 50, 300, 400):
+        assert MaxHeap.top_k(items, k) == reference(items, k)
+
+
+def test_ties_prefer_the_smaller_id_regardless_of_input_order():
+    items = [(1.0, "c"), (1.0, "a"), (1.0, "b"), (0.5, "aa")]
+    assert MaxHeap.top_k(items, 2) == [(1.0, "a"), (1.0, "b")]
+    assert MaxHeap.top_k(reversed(items), 2) == [(1.0, "a"), (1.0, "b")]
+
+
+def test_bounded_keeps_at_most_k_items():
+    bounded = MaxHeap.bounded(((index % 7, index) for index in range(100)), 3)
+    assert bounded.currsize == 3
+    assert bounded.peek() == (6, 20)  # The weakest of the top 3 sits at the root
+    assert bounded.drain() == [(6, 6), (6, 13), (6, 20)]
+
+
+def test_heapify_push_pop():
+    heap = MaxHeap([(3, "c"), (1, "a"), (5, "e"), (2, "b")])
+    heap.push((4, "d"))
+    assert heap.peek() == (5, "e")
+    assert [heap.pop() for _ in range(5)] == [(5, "e"), (4, "d"), (3, "c"), (2, "b"), (1, "a")]
+    assert heap.pop() is None and heap.is_empty()
+
+
+def test_pushpop_and_replace():
+    heap = MaxHeap([(2, "b"), (1, "a")])
+    assert heap.pushpop((3, "c")) == (3, "c")  # Would be the root, returned straight away
+    assert heap.pushpop((0, "z")) == (2, "b")
+    assert heap.replace((5, "e")) == (1, "a")
+    assert heap.drain() == [(5, "e"), (0, "z")]
+    assert MaxHeap().replace((1, "a")) is None
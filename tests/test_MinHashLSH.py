@@ -0,0 +1,38 @@
+import time
+
+from MinHashLSH import MinHashLSH
+from RecomendationSystem import RecommendationSystem
+
+NOW = time.time()
+
+
+def test_identical_and_disjoint_users():
+    index = MinHashLSH(num_permutations=32, bands=16)
+    index.add("a", ["p1", "p2", "p3"])
+    index.add("b", ["p3", "p2", "p1"])
+    index.add("c", ["q1", "q2"])
+    assert index.estimate_similarity("a", "b") == 1
+    assert index.estimate_similarity("a", "c") == 0
+    assert index.estimate_similarity("a", "nobody") == 0
+    assert index.candidates("a") == ["b"]
+    assert index.candidates("nobody") == []
+
+
+def test_candidates_rank_by_shared_bands_and_honor_limit():
+    index = MinHashLSH(num_permutations=64, bands=32, max_candidates=1)
+    index.add("a", [f"p{i}" for i in range(10)])
+    index.add("close", [f"p{i}" for i in range(9)])
+    index.add("far", [f"p{i}" for i in range(2)] + [f"q{i}" for i in range(8)])
+    assert index.candidates("a") == ["close"]
+    assert index.candidates("a", limit=0)[0] == "close"
+
+
+def test_zero_overlap_candidates_are_skipped():
+    system = RecommendationSystem(approximate_neighbors=True)
+    for user_id, product_ids in (("u1", ["p1", "p2"]), ("u2", ["p1", "p3"]), ("u3", ["p4", "p5"])):
+        for product_id in product_ids:
+            system.add_interaction(user_id, product_id, 3, "view", NOW)
+    candidates = system.neighbor_index.candidates
+    system.neighbor_index.candidates = lambda user_id, limit=None: candidates(user_id, limit) + ["u3"]  # A bucket collision
+    assert list(system._candidate_neighbors("u1", {"p1", "p2"})) == ["u2"]
+    assert [product_id for product_id, _ in system.get_recommendations("u1", 5)] == ["p3"]
@@ -0,0 +1,110 @@
+import random
+import sys
+import time
+
+from Popularity import Leaderboard, Popularity
+from RecomendationSystem import RecommendationSystem
+
+NOW = time.time()
+
+
+def ids(recommendations):
+    return [product_id for product_id, _ in recommendations]
+
+
+def build(**options):
+    system = RecommendationSystem(**options)
+    system._set_decay_epoch(NOW)
+    system.add_product("p1", "Laptop", "tech")
+    system.add_product("p2", "Mouse", "tech")
+    system.add_product("p4", "Novel", "books")
+    system.add_interaction("alice", "p1", 5, "purchase", NOW)
+    system.add_interaction("bob", "p1", 4, "purchase", NOW)
+    system.add_interaction("bob", "p2", 3, "view", NOW)
+    system.add_interaction("bob", "p4", 1, "view", NOW)
+    system.add_interaction("carol", "p3", 2, "view", NOW)  # p3 has no details yet
+    system.add_interaction("carol", "p1", 1, "view", NOW)
+    return system
+
+
+def test_leaderboard_matches_brute_force():
+    board = Leaderboard(3)
+    totals = {}
+    for step, product_id in enumerate("abcadbeacfbbd"):
+        totals[product_id] = totals.get(product_id, 0) + step
+        board.update(product_id, totals[product_id])
+        expected = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:3]
+        assert board.top(3) == expected
+
+
+def test_leaderboard_matches_brute_force_under_random_updates():
+    board = Leaderboard(8)
+    totals = {}
+    generator = random.Random(7)
+    for _ in range(2000):
+        product_id = f"p{generator.randrange(30)}"
+        totals[product_id] = totals.get(product_id, 0) + generator.choice((0, 1, 2, 5))  # Zero repeats a value
+        board.update(product_id, totals[product_id])
+        k = generator.randrange(1, 10)
+        expected = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:min(k, 8)]
+        assert board.top(k) == expected
+
+
+def test_leaderboard_top_after_an_update_does_not_rank_every_member(monkeypatch):
+    board = Leaderboard(1000)
+    for product in range(1000):
+        board.update(f"p{product:04}", float(product))
+    board.top(3)
+    comparisons = []
+    real = sys.modules["MaxHeap"]._ranks_above
+
+    def counting(item, other):
+        comparisons.append(1)
+        return real(item, other)
+
+    monkeypatch.setattr(sys.modules["MaxHeap"], "_ranks_above", counting)
+    board.update("p0500", 2000.0)
+    assert board.top(3) == [("p0500", 2000.0), ("p0999", 999.0), ("p0998", 998.0)]
+    assert len(comparisons) < 200  # O(k log N), not O(N log N)
+
+
+def test_leaderboard_rescale_keeps_order():
+    board = Leaderboard(2)
+    for product_id, value in (("a", 1.0), ("b", 3.0), ("c", 2.0)):
+        board.update(product_id, value)
+    board.rescale(0.5)
+    assert board.top(2) == [("b", 1.5), ("c", 1.0)]
+
+
+def test_popularity_categorizes_products_seen_before_their_details():
+    popularity = Popularity(size=5)
+    popularity.add("p1", 2.0)
+    popularity.categorize("p1", "tech")
+    popularity.add("p2", 1.0)
+    assert popularity.top(5, "tech") == [("p1", 2.0)]
+    assert popularity.top(5) == [("p1", 2.0), ("p2", 1.0)]
+    assert popularity.top(5, "unknown") == []
+
+
+def test_cold_start_users_get_popular_products():
+    system = build()
+    assert ids(system.get_recommendations("nobody", 2)) == ["p1", "p2"]
+    assert ids(system.get_recommendations("nobody", 5, category="books")) == ["p4"]
+    assert RecommendationSystem(popularity_size=0).get_recommendations("nobody", 2) == []
+
+
+def test_category_filter_equals_filtered_ranking():
+    system = build()
+    full = system.get_recommendations("alice", 10)
+    tech = system.get_recommendations("alice", 10, category="tech")
+    assert ids(tech) == [product_id for product_id in ids(full) if product_id in {"p1", "p2"}]
+    assert system.get_recommendations("alice", 10, category="unknown") == []
+
+
+def test_cached_category_result_sees_new_products_of_the_category():
+    cached, uncached = build(cache_size=10), build()
+    for system in (cached, uncached):
+        assert ids(system.get_recommendations("alice", 5, category="tech")) == ["p2"]
+        system.add_product("p3", "Keyboard", "tech")  # p3 already has interactions
+    assert ids(cached.get_recommendations("alice", 5, category="tech")) == ["p2", "p3"]
+    assert ids(uncached.get_recommendations("alice", 5, category="tech")) == ["p2", "p3"]
@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+from RecomendationSystem import RecommendationSystem, _batch_start_method
+
+NOW = time.time()
+
+
+def build(**options):
+    system = RecommendationSystem(**options)
+    for index in range(12):
+        system.add_product(f"p{index}", f"Product {index}", "even" if index % 2 == 0 else "odd")
+    for user in range(30):
+        for step in range(4):
+            system.add_interaction(f"u{user}", f"p{(user * 7 + step * 3) % 12}", 1 + (user + step) % 5, "view", NOW - step * 3600)
+    return system
+
+
+def test_batch_matches_single_calls():
+    system = build()
+    users = [f"u{user}" for user in range(30)] + ["nobody"]
+    expected = [(user_id, system.get_recommendations(user_id, 3)) for user_id in users]
+    chunks = list(system.get_recommendations_batch(iter(users), 3, workers=1, chunk_size=7))
+    assert [len(chunk) for chunk in chunks] == [7, 7, 7, 7, 3]
+    assert [user_id for chunk in chunks for user_id, _ in chunk] == users
+    for (user_id, recommendations), (_, single) in zip((entry for chunk in chunks for entry in chunk), expected):
+        assert [product_id for product_id, _ in recommendations] == [product_id for product_id, _ in single]
+
+
+@pytest.mark.parametrize("options", [{}, {"instrumentation": True}])
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_batch_across_processes(start_method, options):
+    system = build(**options)
+    users = [f"u{user}" for user in range(30)]
+    expected = {user_id: [product_id for product_id, _ in system.get_recommendations(user_id, 3, category="odd")] for user_id in users}
+    results = [entry for chunk in system.get_recommendations_batch(users, 3, workers=2, chunk_size=4, category="odd",
+                                                                     start_method=start_method) for entry in chunk]
+    assert [user_id for user_id, _ in results] == users
+    assert {user_id: [product_id for product_id, _ in recommendations] for user_id, recommendations in results} == expected
+
+
+@pytest.mark.parametrize("arguments", [{"k": -1}, {"k": 2.5}, {"workers": 0}, {"chunk_size": 0}, {"strategy": "other"},
+                                       {"strategy": "item"}, {"start_method": "teleport"}])
+def test_batch_arguments_are_checked_eagerly(arguments):
+    system = build()
+    call = dict({"user_ids": ["u1"], "k": 3}, **arguments)
+    with pytest.raises(ValueError):
+        system.get_recommendations_batch(**call)  # Raised before the iterator is consumed
+
+
+def test_batch_does_not_fork_while_threads_run():
+    assert _batch_start_method() in ("fork", "forkserver", "spawn")
+    release = threading.Event()
+    thread = threading.Thread(target=release.wait)
+    thread.start()
+    try:
+        assert _batch_start_method() != "fork"
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_numpy_engine_rejects_unsupported_options():
+    pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        RecommendationSystem(engine="numpy", approximate_neighbors=True)
+    with pytest.raises(ValueError):
+        RecommendationSystem(engine="numpy", max_neighbors_per_product=5)
+
+
+def test_numpy_engine_matches_python_engine_with_category():
+    pytest.importorskip("numpy")
+    python_system, numpy_system = build(), build(engine="numpy")
+    for user in range(30):
+        for category in (None, "even", "odd", "missing"):
+            expected = python_system.get_recommendations(f"u{user}", 4, category=category)
+            actual = numpy_system.get_recommendations(f"u{user}", 4, category=category)
+            assert [product_id for product_id, _ in actual] == [product_id for product_id, _ in expected]
+            assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+
+def test_bulk_ingestion_stores_rows_in_input_order():
+    records = [("u1", "p1", 2, "view", NOW), ("u2", "p2", 3, "view", NOW), ("u1", "p2", 4, "cart", NOW),
+               ("u3", "p1", 1, "view", NOW), ("u2", "p1", 5, "purchase", NOW), ("u1", "p1", 1, "view", NOW)]
+    one_by_one, bulk = RecommendationSystem(), RecommendationSystem()
+    for record in records:
+        one_by_one.add_interaction(*record)
+    assert bulk.add_interactions_bulk(iter(records), batch_size=4)["count"] == len(records)
+    for column in ("users", "products", "scores", "types", "timestamps"):
+        assert list(getattr(bulk.interactions, column)) == list(getattr(one_by_one.interactions, column))
+    assert list(bulk.interactions.decayed) == pytest.approx(list(one_by_one.interactions.decayed))
+
+    def listing(system):  # What display_interactions prints, without the epoch-relative decayed aggregate
+        return [(key, [(other, details[:3]) for other, details in entries.items()])
+                for view in (system.user_to_product, system.product_to_user) for key, entries in view.items()]
+
+    assert listing(bulk) == listing(one_by_one)
+
+
+def test_candidate_neighbors_share_a_product():
+    system = build()
+    user_products = system._get_user_interacted_products("u0")
+    neighbors = system._candidate_neighbors("u0", user_products)
+    assert "u0" not in neighbors
+    expected = {f"u{user}" for user in range(1, 30) if system._get_user_interacted_products(f"u{user}") & user_products}
+    assert set(neighbors) == expected
+
+
+def test_candidate_neighbors_match_a_scan_of_every_user():
+    system = build()
+    for user in range(30):
+        user_id = f"u{user}"
+        user_products = system._get_user_interacted_products(user_id)
+        scanned, candidates = {}, {}
+        every_user = {other: None for other in system.user_to_product.keys() if other != user_id}
+        system._populate_similar_products(user_id, user_products, system.decay_factor, scanned, neighbors=every_user)
+        system._populate_similar_products(user_id, user_products, system.decay_factor, candidates)
+        scanned = {product_id: score for product_id, score in scanned.items() if score > 0}  # Users sharing nothing add zeros
+        assert candidates.keys() == scanned.keys()
+        assert [candidates[product_id] for product_id in scanned] == pytest.approx(list(scanned.values()))
+
+
+def test_max_neighbors_per_product_keeps_the_latest_users():
+    system = RecommendationSystem(max_neighbors_per_product=2)
+    for user in range(5):
+        system.add_interaction(f"u{user}", "p0", 1, "view", NOW)
+    assert list(system._candidate_neighbors("u0", {"p0"})) == ["u4", "u3"]
+
+
+DAY = 60 * 60 * 24
+
+
+def current_decayed(system, now):
+    multiplier = system._decay_multiplier(system.decay_factor, now)
+    return [value * multiplier for value in system.interactions.decayed]
+
+
+def test_decayed_aggregates_match_per_interaction_decay():
+    system = RecommendationSystem(decay_factor=0.9)
+    system.add_interaction("u1", "p1", 4, "view", NOW - 3 * DAY)
+    system.add_interaction("u1", "p1", 2, "view", NOW - DAY)  # Accumulates into the same row
+    system.add_interaction("u1", "p2", 5, "view", NOW)
+    expected = [4 * 0.9 ** 3 + 2 * 0.9, 5]
+    assert current_decayed(system, NOW) == pytest.approx(expected)
+    assert system._decay_multiplier(0.5, NOW) is None  # Other factors decay from the latest timestamp instead
+
+
+def test_renormalization_moves_the_epoch_without_changing_decayed_values():
+    system = RecommendationSystem(decay_factor=0.5, popularity_size=10)
+    system.add_interaction("u1", "p1", 4, "view", NOW)
+    system.add_interaction("u2", "p1", 2, "view", NOW)
+    later = system._renormalize_after + DAY  # Far enough ahead that the stored growth would exceed the bound
+    epoch = system.decay_epoch
+    system.add_interaction("u1", "p2", 1, "view", later)
+    assert system.decay_epoch == later > epoch
+    decay = 0.5 ** ((later - NOW) / DAY)
+    assert current_decayed(system, later) == pytest.approx([4 * decay, 2 * decay, 1], rel=1e-9)
+    assert max(system.interactions.decayed) <= 1  # Rescaled, not grown
+    system.add_interactions_bulk([("u3", "p3", 3, "view", later + system._renormalize_after - epoch)])
+    assert system.interactions.decayed[-1] == pytest.approx(3)
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+import RecommendationCache as cache_module
+from RecomendationSystem import RecommendationSystem
+from RecommendationCache import RecommendationCache
+
+NOW = time.time()
+
+
+def test_entries_are_served_until_a_stamp_changes():
+    cache = RecommendationCache()
+    cache.put("key", [("p3", 1.0)], ["u1", "u2"], ["p1", "p3"], ["books"])
+    assert cache.get("key") == [("p3", 1.0)]
+    cache.bump_user("u9")
+    cache.bump_product("p9")
+    cache.bump_category("toys")
+    assert cache.get("key") == [("p3", 1.0)]  # Unrelated stamps do not matter
+    for bump, value in ((cache.bump_user, "u2"), (cache.bump_product, "p1"), (cache.bump_category, "books")):
+        cache.put("key", [("p3", 1.0)], ["u1", "u2"], ["p1", "p3"], ["books"])
+        bump(value)
+        assert cache.get("key") is None
+    assert cache.stats() == {"hits": 2, "misses": 3, "evictions": 0, "invalidations": 3, "size": 0}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = RecommendationCache(max_entries=2)
+    cache.put("a", [], [], [])
+    cache.put("b", [], [], [])
+    cache.get("a")
+    cache.put("c", [], [], [])
+    assert cache.get("b") is None
+    assert cache.get("a") == [] and cache.get("c") == []
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_max_age(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    cache = RecommendationCache(max_age=10)
+    cache.put("key", [], [], [])
+    clock[0] += 10
+    assert cache.get("key") == []
+    clock[0] += 1
+    assert cache.get("key") is None
+    with pytest.raises(ValueError):
+        RecommendationCache(max_entries=0)
+
+
+def test_system_invalidates_on_neighbor_interactions():
+    system = RecommendationSystem(cache_size=16)
+    for user_id, product_ids in (("u1", ["p1"]), ("u2", ["p1", "p2"])):
+        for product_id in product_ids:
+            system.add_interaction(user_id, product_id, 3, "view", NOW)
+    assert [product_id for product_id, _ in system.get_recommendations("u1", 5)] == ["p2"]
+    assert [product_id for product_id, _ in system.get_recommendations("u1", 5)] == ["p2"]
+    assert system.cache.hits == 1
+    system.add_interaction("u2", "p3", 5, "view", NOW)  # A neighbor's new product changes the result
+    assert [product_id for product_id, _ in system.get_recommendations("u1", 5)] == ["p3", "p2"]
+    system.add_interaction("u3", "p4", 5, "view", NOW)  # An unrelated user leaves the entry valid
+    system.get_recommendations("u1", 5)
+    assert system.cache.hits == 2
+
+
+def test_cache_miss_collects_the_neighbors_once(monkeypatch):
+    system = RecommendationSystem(cache_size=16, approximate_neighbors=True)
+    for user_id, product_ids in (("u1", ["p1"]), ("u2", ["p1", "p2"]), ("u3", ["p1", "p3"])):
+        for product_id in product_ids:
+            system.add_interaction(user_id, product_id, 3, "view", NOW)
+    calls = []
+    candidate_neighbors = system._candidate_neighbors
+    monkeypatch.setattr(system, "_candidate_neighbors", lambda *args: calls.append(args) or candidate_neighbors(*args))
+    assert [product_id for product_id, _ in system.get_recommendations("u1", 5)] == ["p2", "p3"]
+    assert len(calls) == 1
+    system.add_interaction("u3", "p4", 1, "view", NOW)  # A neighbor recorded with the entry invalidates it
+    assert [product_id for product_id, _ in system.get_recommendations("u1", 5)] == ["p2", "p3", "p4"]
+    assert len(calls) == 2
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import threading
+import time
+
+from RecomendationSystem import RecommendationSystem
+from RecommendationServer import RecommendationServer
+
+NOW = time.time()
+
+
+def build():
+    system = RecommendationSystem()
+    for index in range(4):
+        system.add_product(f"p{index}", f"Product {index}", "all")
+    for user_id, product_ids in (("u1", ["p0", "p1"]), ("u2", ["p0", "p2"])):
+        for product_id in product_ids:
+            system.add_interaction(user_id, product_id, 3, "view", NOW)
+    return system
+
+
+async def request(reader, writer, payload):
+    writer.write(json.dumps(payload).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def test_requests_and_errors():
+    async def scenario():
+        server = RecommendationServer(build())
+        listener = await server.start(port=0)
+        reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+        recommended = await request(reader, writer, {"id": 1, "op": "recommend", "user_id": "u1", "k": 2})
+        unknown = await request(reader, writer, {"id": 2, "op": "nope"})
+        malformed = await request(reader, writer, [1])
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return server, recommended, unknown, malformed
+
+    server, recommended, unknown, malformed = asyncio.run(scenario())
+    assert recommended["id"] == 1 and recommended["ok"] and [entry[0] for entry in recommended["result"]] == ["p2"]
+    assert unknown == {"id": 2, "ok": False, "error": "ValueError: Unknown op: nope"}
+    assert not malformed["ok"]
+    assert server.errors == 2
+
+
+class SlowSystem:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def get_recommendations(self, user_id, k, decay_factor, strategy, category):
+        self.release.wait(5)
+        return [("p1", 1.0)]
+
+
+def test_client_disconnect_frees_slots():
+    async def scenario():
+        system = SlowSystem()
+        server = RecommendationServer(system, max_in_flight=2)
+        listener = await server.start(port=0)
+        reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+        for request_id in range(2):
+            writer.write(json.dumps({"id": request_id, "op": "recommend", "user_id": "u1"}).encode() + b"\n")
+        await writer.drain()
+        while server.active < 2:
+            await asyncio.sleep(0.01)
+        writer.transport.abort()  # The client goes away before its responses are written
+        await asyncio.sleep(0.05)
+        system.release.set()
+        for _ in range(200):
+            if server.active == 0:
+                break
+            await asyncio.sleep(0.01)
+        listener.close()
+        await listener.wait_closed()
+        return server
+
+    server = asyncio.run(scenario())
+    assert server.active == 0
+    assert server._slots._value == 2
+
+
+class BrokenWriter:
+    def __init__(self):
+        self.closed = False
+
+    def is_closing(self):
+        return self.closed
+
+    def write(self, data):
+        raise ConnectionResetError("reset by peer")
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        assert self.closed
+        self.waited = True
+        raise ConnectionResetError("reset by peer")
+
+
+class FailingReader:
+    def __init__(self, lines):
+        self.lines = list(lines)
+
+    async def readline(self):
+        await asyncio.sleep(0)
+        if self.lines:
+            return self.lines.pop(0)
+        raise ConnectionResetError("reset by peer")
+
+
+def test_write_to_disconnected_client_is_dropped():
+    async def scenario():
+        server = RecommendationServer(build())
+        server._slots = asyncio.Semaphore(1)
+        await server._answer(b'{"op": "ping"}\n', BrokenWriter(), asyncio.Lock())  # Must not raise
+
+    asyncio.run(scenario())
+
+
+def test_failed_connection_cancels_its_requests():
+    async def scenario():
+        system = SlowSystem()
+        server = RecommendationServer(system, max_in_flight=4)
+        server._slots = asyncio.Semaphore(4)
+        lines = [json.dumps({"id": request_id, "op": "recommend", "user_id": f"u{request_id}"}).encode() + b"\n"
+                 for request_id in range(2)]
+        writer = BrokenWriter()
+        await server._serve_connection(FailingReader(lines), writer)
+        await asyncio.sleep(0.05)
+        active = server.active
+        system.release.set()
+        return writer, active
+
+    writer, active = asyncio.run(scenario())
+    assert writer.closed and writer.waited
+    assert active == 0
+
+
+def test_overlong_request_line_gets_an_error_response():
+    async def scenario():
+        server = RecommendationServer(build())
+        listener = await server.start(port=0)
+        reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+        pong = await request(reader, writer, {"id": 1, "op": "ping"})
+        writer.write(b'{"op": "search", "query": "' + b"x" * 100000 + b'"}\n')
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        closed = await reader.read()  # The server stops reading and closes the connection
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return server, pong, response, closed
+
+    server, pong, response, closed = asyncio.run(scenario())
+    assert pong["ok"]
+    assert response == {"id": None, "ok": False, "error": "ValueError: The request line is too long."}
+    assert closed == b""
+    assert server.errors == 1
@@ -0,0 +1,106 @@
+from RecomendationSystem import RecommendationSystem
+from SearchIndex import SearchIndex, intersect
+
+
+def build():
+    index = SearchIndex(ngram_size=3)
+    for product_id, product_name in (("p1", "TV"), ("p2", "TV stand"), ("p3", "Gaming Laptop"), ("p4", "Laptop Bag"), ("p5", "X")):
+        index.add(product_id, product_name)
+    return index
+
+
+def test_intersect():
+    assert list(intersect([[1, 3, 5, 7], [3, 4, 5], [0, 3, 5, 9]])) == [3, 5]
+    assert list(intersect([[1, 2], [3]])) == []
+
+
+def test_keyword_search_requires_every_word():
+    index = build()
+    assert index.search("laptop") == ["p3", "p4"]
+    assert index.search("LAPTOP gaming") == ["p3"]
+    assert index.search("laptop phone") == []
+    assert index.search("laptop", limit=1) == ["p3"]
+
+
+def test_readding_a_product_replaces_its_name():
+    index = build()
+    index.add("p3", "Desktop")
+    assert index.search("laptop") == ["p4"]
+    assert index.search_infix("sktop") == ["p3"]
+
+
+def test_infix_search_matches_inside_words():
+    index = build()
+    assert index.search_infix("apto") == ["p3", "p4"]
+    assert index.search_infix("ming la") == ["p3"]
+    assert index.search_infix("aptx") == []
+
+
+def test_infix_search_finds_names_shorter_than_an_ngram():
+    index = build()
+    assert index.search_infix("tv") == ["p1", "p2"]
+    assert index.search_infix("x") == ["p5"]
+    assert index.search_infix("tv ") == ["p2"]
+
+
+def test_search_products_infix():
+    system = RecommendationSystem(infix_search=True)
+    system.add_product("p1", "TV", "tech")
+    system.add_product("p2", "TV stand", "furniture")
+    assert sorted(product_id for product_id, _ in system.search_products("tv", search_by="substring")) == ["p1", "p2"]
+
+
+def test_fuzzy_search_matches_each_word_and_partial_last_word():
+    index = build()
+    assert index.search_fuzzy("lapt") == ["p3", "p4"]
+    assert index.search_fuzzy("gamng laptop") == ["p3"]
+    assert index.search_fuzzy("gamng lap") == ["p3"]
+    assert index.search_fuzzy("laptp bag") == ["p4"]
+    assert index.search_fuzzy("lpatop bag", 2) == ["p4", "p3"]  # "bag" is 2 edits from a prefix of "gaming"
+    assert index.search_fuzzy("gaming ") == ["p3"]
+    assert index.search_fuzzy("laptop phone") == []
+
+
+def test_fuzzy_search_ranks_by_total_distance():
+    index = build()
+    index.add("p6", "Laptob")
+    assert index.search_fuzzy("laptop ") == ["p3", "p4", "p6"]
+    assert index.search_fuzzy("laptob ", rank_by={"p3": 1, "p4": 2}.get) == ["p6", "p4", "p3"]
+
+
+def test_fuzzy_search_forgets_replaced_names():
+    index = build()
+    index.add("p3", "Desktop")
+    assert index.search_fuzzy("gaming") == []
+    assert index.search_fuzzy("deskop") == ["p3"]
+
+
+def test_search_products_fuzzy():
+    system = RecommendationSystem()
+    system.add_product("p1", "Gaming Laptop", "tech")
+    system.add_product("p2", "Laptop Bag", "bags")
+    system.add_product("p3", "Gaming Chair", "furniture")
+    assert [product_id for product_id, _ in system.search_products("gamng laptop", search_by="fuzzy")] == ["p1"]
+    assert sorted(product_id for product_id, _ in system.search_products("lapt", search_by="fuzzy")) == ["p1", "p2"]
+
+
+class CountingPostings(list):
+    consumed = 0
+
+    def __iter__(self):
+        for document in super().__iter__():
+            CountingPostings.consumed += 1
+            yield document
+
+
+def test_short_infix_query_stops_at_the_limit():
+    index = SearchIndex(ngram_size=3)
+    for product in range(1000):
+        index.add(f"p{product}", f"Lamp {product}")
+    index.add("q", "Bag")
+    index.ngram_postings = {ngram: CountingPostings(postings) for ngram, postings in index.ngram_postings.items()}
+    CountingPostings.consumed = 0
+    assert index.search_infix("am", limit=3) == ["p0", "p1", "p2"]
+    assert CountingPostings.consumed <= 6  # One lookahead per merged list, not the whole catalog
+    assert index.search_infix("ba") == ["q"]
+    assert index.search_infix("7", limit=2) == ["p7", "p17"]
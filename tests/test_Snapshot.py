@@ -0,0 +1,127 @@
+import pickle
+import sys
+import time
+from array import array
+
+import pytest
+
+from RecomendationSystem import RecommendationSystem
+from Snapshot import SnapshotReader
+
+NOW = time.time()
+
+
+def build(**options):
+    system = RecommendationSystem(**options)
+    system.add_product("p1", "Laptop", "tech")
+    system.add_product("p2", "Laptop Bag", "tech")
+    system.add_product("p3", "Novel", "books")
+    system.add_interaction("alice", "p1", 5, "purchase", NOW)
+    system.add_interaction("bob", "p1", 4, "view", NOW - 86400)
+    system.add_interaction("bob", "p2", 3, "view", NOW)
+    system.add_interaction("bob", "p9", 2, "view", NOW)  # A product without details
+    system.add_interaction("carol", "p3", 1, "view", NOW)
+    system.add_interaction("carol", "p2", 2, "purchase", NOW)
+    system.add_interaction("bob", "p1", 1, "purchase", NOW)  # Accumulates onto an existing pair
+    return system
+
+
+def same(recommendations, expected):
+    assert [product_id for product_id, _ in recommendations] == [product_id for product_id, _ in expected]
+    assert [score for _, score in recommendations] == pytest.approx([score for _, score in expected])
+
+
+def rows(system):
+    return [(user_id, list(products.items())) for user_id, products in system.user_to_product.items()]
+
+
+def test_round_trip(tmp_path):
+    system = build()
+    path = tmp_path / "catalog.snap"
+    system.save_snapshot(path)
+    restored = RecommendationSystem.load_snapshot(path)
+    assert rows(restored) == rows(system)
+    assert list(restored.interactions.users) == list(system.interactions.users)
+    assert restored.decay_epoch == system.decay_epoch
+    assert restored.search_products("lap") == system.search_products("lap")
+    assert restored.search_products("tech", search_by="category") == system.search_products("tech", search_by="category")
+    same(restored.get_recommendations("alice", 5), system.get_recommendations("alice", 5))
+    same(restored.get_recommendations("nobody", 5), system.get_recommendations("nobody", 5))
+    restored.add_interaction("alice", "p2", 1, "view", NOW)  # The loaded columns stay writable
+    assert restored.user_to_product.get("alice").contains("p2")
+
+
+@pytest.mark.parametrize("options", [{"item_index": True}, {"approximate_neighbors": True}])
+def test_round_trip_rebuilds_optional_indexes(tmp_path, options):
+    system = build(**options)
+    path = tmp_path / "catalog.snap"
+    system.save_snapshot(path)
+    restored = RecommendationSystem.load_snapshot(path, **options)
+    strategy = "item" if "item_index" in options else "user"
+    same(restored.get_recommendations("alice", 5, strategy=strategy), system.get_recommendations("alice", 5, strategy=strategy))
+
+
+def test_other_decay_factor_rebuilds_aggregates(tmp_path):
+    path = tmp_path / "catalog.snap"
+    build().save_snapshot(path)
+    restored = RecommendationSystem.load_snapshot(path, decay_factor=0.5)
+    assert restored.user_to_product.get("bob").get("p1")[0] == 5
+
+
+def test_checksum_mismatch_is_detected(tmp_path):
+    path = tmp_path / "catalog.snap"
+    build().save_snapshot(path)
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="checksum"):
+        RecommendationSystem.load_snapshot(path)
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "catalog.snap"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="not a snapshot"):
+        RecommendationSystem.load_snapshot(path)
+
+
+def test_error_while_loading_is_not_masked(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.snap"
+    build().save_snapshot(path)
+
+    def fail(self):
+        raise RuntimeError("index build failed")
+
+    monkeypatch.setattr(RecommendationSystem, "_index_interactions", fail)
+    with pytest.raises(RuntimeError, match="index build failed"):
+        RecommendationSystem.load_snapshot(path)
+
+
+def test_close_releases_handed_out_views(tmp_path):
+    path = tmp_path / "catalog.snap"
+    build().save_snapshot(path)
+    reader = SnapshotReader(path)
+    column = reader.column("ISCORE", 'd')
+    assert len(column) == 6
+    reader.close()
+    with pytest.raises(ValueError):
+        column[0]  # Released
+
+
+@pytest.mark.skipif(sys.byteorder != "little", reason="columns are copied on big-endian machines")
+def test_loaded_columns_read_the_map_until_the_first_write(tmp_path):
+    system = build()
+    path = tmp_path / "catalog.snap"
+    system.save_snapshot(path)
+    restored = RecommendationSystem.load_snapshot(path)
+    store = restored.interactions
+    assert store.mapped and isinstance(store.scores, memoryview) and store.scores.readonly
+    copy = pickle.loads(pickle.dumps(restored))  # Spawned batch workers get private arrays
+    assert isinstance(copy.interactions.scores, array) and rows(copy) == rows(system)
+    restored.save_snapshot(tmp_path / "again.snap")
+    assert rows(RecommendationSystem.load_snapshot(tmp_path / "again.snap")) == rows(system)
+    restored.add_interaction("bob", "p1", 1, "view", NOW)
+    assert not store.mapped and isinstance(store.scores, array)
+    assert restored.user_to_product.get("bob").get("p1")[0] == 6
+    assert rows(restored)[0] == rows(system)[0]
+    assert not RecommendationSystem.load_snapshot(path, mapped=False).interactions.mapped
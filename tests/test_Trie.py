@@ -0,0 +1,76 @@
+from Trie import Trie
+
+
+def build():
+    trie = Trie()
+    for product_id, product_name in (("p1", "laptop"), ("p2", "laptops"), ("p3", "lamp"), ("p4", "tablet")):
+        trie.insert(product_name, product_id)
+    return trie
+
+
+def test_fuzzy_search_whole_names():
+    trie = build()
+    assert trie.fuzzy_search("laptpo", 2) == ["p1", "p2"]
+    assert trie.fuzzy_search("lapton") == ["p1"]
+    assert trie.fuzzy_search("lapton", 0) == []
+
+
+def test_fuzzy_search_prefixes():
+    trie = build()
+    assert trie.fuzzy_search("lapt", 0) == []
+    assert sorted(trie.fuzzy_search("lapt", 0, prefix=True)) == ["p1", "p2"]
+    assert sorted(trie.fuzzy_search("lpt", 1, prefix=True)) == ["p1", "p2"]
+
+
+def test_fuzzy_distances_and_ranking():
+    trie = build()
+    assert trie.fuzzy_distances("lamp", 1) == {"p3": 0}
+    assert trie.fuzzy_distances("laptop", 1) == {"p1": 0, "p2": 1}
+    assert trie.fuzzy_search("laptop", 1, rank_by={"p1": 0, "p2": 5}.get) == ["p1", "p2"]
+    assert trie.fuzzy_search("laptop", 1, limit=1) == ["p1"]
+
+
+def test_inserts_split_edges_where_labels_diverge():
+    trie = Trie()
+    trie.insert("laptop", "p1")
+    assert [child.label for child in trie.root.children.values()] == ["laptop"]  # One edge for a single name
+    trie.insert("lamp", "p2")
+    middle = trie.root.children["l"]
+    assert middle.label == "la" and middle.product_ids is None
+    assert sorted(child.label for child in middle.children.values()) == ["mp", "ptop"]
+    trie.insert("la", "p3")  # Ends exactly on the split node
+    assert middle.product_ids == {"p3"}
+    trie.insert("laptop", "p4")
+    assert sorted(trie.search("laptop")) == ["p1", "p4"]
+
+
+def test_prefix_search_inside_and_past_edges():
+    trie = build()
+    assert sorted(trie.search("lap")) == ["p1", "p2"]  # Ends inside the "ptop" edge
+    assert sorted(trie.search("la")) == ["p1", "p2", "p3"]
+    assert trie.search("laptopz") == []
+    assert trie.search("lx") == []
+    assert sorted(trie.search("")) == ["p1", "p2", "p3", "p4"]
+
+
+def test_limit_and_ranking():
+    trie = build()
+    assert len(trie.search("la", limit=2)) == 2
+    assert trie.search("la", limit=0) == []
+    popularity = {"p1": 1, "p2": 3, "p3": 2}.get
+    assert trie.search("la", rank_by=popularity) == ["p2", "p3", "p1"]
+    assert trie.search("la", limit=2, rank_by=popularity) == ["p2", "p3"]
+
+
+def test_remove_keeps_other_products_and_nodes_are_reused():
+    trie = build()
+    trie.insert("laptop", "p5")
+    trie.remove("laptop", "p1")
+    assert sorted(trie.search("laptop")) == ["p2", "p5"]
+    trie.remove("laptop", "p5")
+    trie.remove("lapt", "p2")  # Ends inside an edge: nothing to remove
+    trie.remove("missing", "p2")
+    assert trie.search("laptop") == ["p2"]
+    assert trie.fuzzy_search("laptop", 0) == []
+    trie.insert("laptop", "p6")
+    assert sorted(trie.search("laptop")) == ["p2", "p6"]
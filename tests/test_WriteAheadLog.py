@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from WriteAheadLog import (INTERACTION, PRODUCT, WriteAheadLog, decode_record, encode_interaction, encode_product,
+                           read_segment, valid_length)
+
+
+def test_records_round_trip():
+    product = encode_product("p1", "Lámpara", "home")
+    assert decode_record(product[8:]) == (PRODUCT, ("p1", "Lámpara", "home"))
+    interaction = encode_interaction("u1", "p1", 2.5, "view", 123.25)
+    assert decode_record(interaction[8:]) == (INTERACTION, ("u1", "p1", 2.5, "view", 123.25))
+    with pytest.raises(TypeError):
+        encode_product(1, "name", "category")
+
+
+def test_group_commit_buffers_until_the_group_is_full(tmp_path):
+    log = WriteAheadLog(tmp_path, group_size=3, commit_interval=60)
+    path = log.path(log.sequence)
+    header = os.path.getsize(path)
+    log.append_product("p1", "lamp", "home")
+    log.append_interaction("u1", "p1", 1, "view", 1.0)
+    assert os.path.getsize(path) == header
+    log.append_interaction("u2", "p1", 2, "view", 2.0)
+    assert os.path.getsize(path) > header
+    log.append_interaction("u3", "p1", 3, "view", 3.0)
+    log.commit()
+    assert [record for _, record in log.replay()] == [("p1", "lamp", "home"), ("u1", "p1", 1.0, "view", 1.0),
+                                                       ("u2", "p1", 2.0, "view", 2.0), ("u3", "p1", 3.0, "view", 3.0)]
+    log.close()
+    with pytest.raises(ValueError):
+        log.append_product("p2", "desk", "home")
+
+
+def test_torn_tail_is_cut_off_on_open(tmp_path):
+    with WriteAheadLog(tmp_path) as log:
+        for index in range(3):
+            log.append_interaction(f"u{index}", "p1", 1, "view", float(index))
+        path = log.path(log.sequence)
+    intact = os.path.getsize(path)
+    with open(path, "ab") as segment_file:
+        segment_file.write(encode_interaction("u9", "p1", 1, "view", 9.0)[:-3])  # A write cut short by a crash
+    assert valid_length(path) == intact
+    with WriteAheadLog(tmp_path) as log:
+        assert os.path.getsize(path) == intact
+        assert [record[0] for _, record in log.replay()] == ["u0", "u1", "u2"]
+        assert log.sequence == 2  # Reopening starts a new segment
+
+
+def test_damaged_record_before_more_log_is_an_error(tmp_path):
+    with WriteAheadLog(tmp_path) as log:
+        log.append_interaction("u1", "p1", 1, "view", 1.0)
+        first = log.path(log.sequence)
+        log.rotate()
+        log.append_interaction("u2", "p1", 1, "view", 2.0)
+    with open(first, "r+b") as segment_file:
+        segment_file.seek(-1, os.SEEK_END)
+        last = segment_file.read(1)[0]
+        segment_file.seek(-1, os.SEEK_END)
+        segment_file.write(bytes([last ^ 0xFF]))  # Flip the bits of the last payload byte
+    assert list(read_segment(first)) == []
+    with WriteAheadLog(tmp_path) as log:
+        with pytest.raises(ValueError):
+            list(log.replay())
+
+
+def test_segments_rotate_by_size_and_are_removed_below_a_sequence(tmp_path):
+    with WriteAheadLog(tmp_path, group_size=1, segment_bytes=100) as log:
+        for index in range(10):
+            log.append_interaction(f"u{index}", "p1", 1, "view", float(index))
+        assert len(log.sequences()) > 3
+        records = [record[0] for _, record in log.replay()]
+        assert records == [f"u{index}" for index in range(10)]
+        stop = log.rotate()
+        log.remove(stop)
+        assert log.sequences() == [stop]
+        assert list(log.replay()) == []
+
+
+def test_rejects_invalid_options(tmp_path):
+    with pytest.raises(ValueError):
+        WriteAheadLog(tmp_path, sync="sometimes")
+    with pytest.raises(ValueError):
+        WriteAheadLog(tmp_path, group_size=0)
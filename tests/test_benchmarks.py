@@ -0,0 +1,59 @@
+import json
+import random
+
+from benchmarks.harness import Recorder, compare, main, percentile
+from benchmarks.workload import Workload, ZipfSampler
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 1.0) == 100
+    assert percentile([7], 0.5) == 7
+    assert percentile([], 0.5) == 0
+
+
+def test_recorder_summary():
+    recorder = Recorder()
+    for _ in range(3):
+        assert recorder.measure("double", lambda value: value * 2, 21) == 42
+    recorder.throughput["bulk"] = {"count": 10, "seconds": 0.5, "per_second": 20.0}
+    summary = recorder.summary()
+    assert summary["double"]["count"] == 3 and summary["double"]["p50_us"] <= summary["double"]["p99_us"]
+    assert summary["bulk"] == {"count": 10, "ops_per_second": 20.0}
+
+
+def test_compare_flags_slowdowns_only_beyond_tolerance():
+    baseline = {"operations": {"query": {"p50_us": 100.0, "ops_per_second": 1000}, "bulk": {"ops_per_second": 500}},
+                "memory": {"peak_bytes": 1000}}
+    steady = {"operations": {"query": {"p50_us": 110.0, "ops_per_second": 900}, "bulk": {"ops_per_second": 450},
+                             "new": {"ops_per_second": 1}}, "memory": {"peak_bytes": 1100}}
+    assert compare(steady, baseline, 0.2) == []
+    slower = {"operations": {"query": {"p50_us": 130.0, "ops_per_second": 700}, "bulk": {"ops_per_second": 400}},
+              "memory": {"peak_bytes": 1300}}
+    regressions = compare(slower, baseline, 0.2)
+    assert [regression.split(":")[0] for regression in regressions] == ["query", "bulk", "peak memory"]
+
+
+def test_workload_is_deterministic_and_skewed():
+    first, second = Workload(2000, seed=3), Workload(2000, seed=3)
+    assert list(first.generate_products()) == list(second.generate_products())
+    assert [record[:4] for record in first.generate_interactions()] == [record[:4] for record in second.generate_interactions()]
+    assert first.users == 200 and first.products == 100 and first.categories == 10
+    timestamps = [record[4] for record in first.generate_interactions()]
+    assert timestamps == sorted(timestamps) and timestamps[-1] <= first.end_time
+    sampler = ZipfSampler(100, 1.1, random.Random(0))
+    draws = [sampler.sample() for _ in range(5000)]
+    assert draws.count(0) > draws.count(50) * 10
+
+
+def test_harness_runs_and_compares_against_its_own_output(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    arguments = ["--interactions", "1000", "--samples", "5", "--no-memory", "--output", str(output)]
+    assert main(arguments) == 0
+    results = json.loads(output.read_text())
+    assert results["meta"]["interactions"] == 1000
+    assert "get_recommendations" in " ".join(results["operations"])
+    assert main(arguments[:-2] + ["--baseline", str(output), "--tolerance", "1000"]) == 0
+    capsys.readouterr()